@@ -11,6 +11,7 @@ from .agent import AgentSystem
 from . import utils
 from .plugins.plugin_manager import PluginManager
 from .task_manager import TaskManager
+from .async_task_manager import AsyncTaskManager
 from .modules.module_manager import ModuleManager
 from .tools.tool_manager import ToolManager
 from . import core
@@ -19,6 +20,7 @@ __all__ = [
     'AgentSystem',
     'PluginManager',
     'TaskManager',
+    'AsyncTaskManager',
     'ModuleManager',
     'ToolManager',
     'utils',
@@ -7,46 +7,185 @@
 
 import logging
 from .task_manager import TaskManager
+from .async_task_manager import AsyncTaskManager
+from .result_cache import ResultCache
+from .run_journal import RunJournal
+from .task_tracer import TaskTracer
 from .plugins.plugin_manager import PluginManager
 from .modules.module_manager import ModuleManager
 from .agents.agent_manager import AgentManager
 from .tools.tool_manager import ToolManager
-from .utils import load_json, setup_logging, download_nltk_resources
+from .utils import load_json, setup_logging
 from .config_validator import validate_config
+from .config_cache import config_cache
+from .config_diff import diff_configs
+from .startup_profiler import StartupProfiler
+from .core.model_cache import model_cache
+from contextlib import nullcontext
 from typing import List, Union, Optional
 import os
 
 logger = logging.getLogger(__name__)
 
 class AgentSystem:
-    def __init__(self, config_files: Union[str, List[str]], base_path: Optional[str] = None):
+    def __init__(self, config_files: Union[str, List[str]], base_path: Optional[str] = None,
+                 lazy_loading: Optional[bool] = None, preload: Optional[List[str]] = None,
+                 profile_startup: bool = False, previous: Optional['AgentSystem'] = None):
         """
         Initialize the AgentSystem with configuration, agent manager, plugin manager, and tool manager.
 
         :param config_files: Path(s) to the JSON configuration file(s).
         :param base_path: The base path for resolving local modules. Defaults to the project root.
+        :param lazy_loading: If True, agents, plugins and tools are built on first use instead of at startup.
+                             Defaults to the 'lazy_loading' config key, or False.
+        :param preload: Names of components to build at startup when lazy loading is enabled.
+                        Defaults to the 'preload' config key.
+        :param profile_startup: If True, record wall time and RSS delta for each startup phase and
+                                component in self.profiler (see StartupProfiler). Components are
+                                then built one at a time, ignoring 'load_workers'.
+        :param previous: A running AgentSystem this one replaces. Agents, plugins and tools whose
+                         configuration is unchanged are adopted from it instead of being rebuilt,
+                         and the previous system is left untouched so it can keep serving.
         """
-        setup_logging()
-        download_nltk_resources()
+        self.profiler = StartupProfiler() if profile_startup else None
+
+        with self._measure('setup_logging'):
+            setup_logging()
         self.base_path = base_path or os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
         self.config_files = config_files if isinstance(config_files, list) else [config_files]
-        self.config = self.load_and_merge_configs(config_files)
-
-        # Validate the merged configuration
-        if not validate_config(self.config):
+        # Load, merge and validate the configuration. Unchanged files are served from the config cache.
+        with self._measure('load_and_validate_config'):
+            self.config, valid = config_cache.load(self.config_files, self.load_and_merge_configs, validate_config)
+        if not valid:
             raise ValueError("Configuration validation failed. Please check your config file(s).")
 
-        self.module_manager = ModuleManager(self.config.get('modules', []))
-        self.agent_manager = AgentManager(self.config.get('agents', []), self.module_manager, base_path=self.base_path)
-        self.plugin_manager = PluginManager(self.config.get('plugins', []), base_path=self.base_path)
-        self.tool_manager = ToolManager(self.config.get('tools', []), base_path=self.base_path)
-        self.task_manager = TaskManager(
-            self.agent_manager,
-            self.plugin_manager,
-            self.tool_manager,
-            self.config.get('tasks', [])
-        )
-        logger.info("AgentSystem initialized.")
+        if lazy_loading is None:
+            lazy_loading = self.config.get('lazy_loading', False)
+        self.lazy_loading = lazy_loading
+
+        adopted = {}
+        module_manager = None
+        if previous is not None:
+            diff = diff_configs(previous.config, self.config)
+            adopted = self._adoptable(previous, diff)
+            if not diff['modules_changed']:
+                module_manager = previous.module_manager
+        if 'model_memory_budget_mb' in self.config or 'model_idle_timeout' in self.config:
+            budget_mb = self.config.get('model_memory_budget_mb')
+            model_cache.configure(
+                budget_bytes=int(budget_mb * 1024 * 1024) if budget_mb else None,
+                idle_timeout=self.config.get('model_idle_timeout')
+            )
+        with self._measure('module_manager'):
+            self.module_manager = module_manager or ModuleManager(self.config.get('modules', []))
+        load_options = {
+            # RSS is measured for the whole process, so components built side by side would be
+            # counted in each other's figures; build them one at a time while profiling.
+            'max_workers': 1 if profile_startup else self.config.get('load_workers', 4),
+            'timeout': self.config.get('load_timeout', 120),
+            'retries': self.config.get('load_retries', 3),
+            'retry_delay': self.config.get('load_retry_delay', 30),
+        }
+        with self._measure('agent_manager'):
+            self.agent_manager = AgentManager(self.config.get('agents', []), self.module_manager, base_path=self.base_path,
+                                              lazy=lazy_loading, profiler=self.profiler, load_options=load_options,
+                                              instances=adopted.get('agents'))
+        with self._measure('plugin_manager'):
+            self.plugin_manager = PluginManager(self.config.get('plugins', []), base_path=self.base_path,
+                                                lazy=lazy_loading, profiler=self.profiler, load_options=load_options,
+                                                instances=adopted.get('plugins'))
+        with self._measure('tool_manager'):
+            self.tool_manager = ToolManager(self.config.get('tools', []), base_path=self.base_path,
+                                            lazy=lazy_loading, profiler=self.profiler, load_options=load_options,
+                                            instances=adopted.get('tools'))
+        self.result_cache = self._create_result_cache(self.config.get('task_cache'))
+        self.journal = self._create_journal(self.config.get('run_journal'))
+        if self.config.get('task_engine', 'threads') == 'asyncio':
+            self.task_manager = AsyncTaskManager(
+                self.agent_manager,
+                self.plugin_manager,
+                self.tool_manager,
+                self.config.get('tasks', []),
+                max_concurrency=self.config.get('task_workers'),
+                result_cache=self.result_cache,
+                journal=self.journal,
+                quiet=self.config.get('quiet', False),
+                batch_size=self.config.get('task_batch_size', 16)
+            )
+        else:
+            self.task_manager = TaskManager(
+                self.agent_manager,
+                self.plugin_manager,
+                self.tool_manager,
+                self.config.get('tasks', []),
+                max_workers=self.config.get('task_workers', 4),
+                result_cache=self.result_cache,
+                journal=self.journal,
+                quiet=self.config.get('quiet', False),
+                batch_size=self.config.get('task_batch_size', 16)
+            )
+        if lazy_loading:
+            with self._measure('preload'):
+                self.preload(preload if preload is not None else self.config.get('preload', []))
+        if self.profiler:
+            logger.info(f"AgentSystem initialized in {self.profiler.total_time():.3f}s.")
+        else:
+            logger.info("AgentSystem initialized.")
+
+    @staticmethod
+    def _adoptable(previous: 'AgentSystem', diff: dict) -> dict:
+        """
+        Collect the instances of a previous system that can be reused as they are.
+
+        :param previous: The system being replaced.
+        :param diff: The result of diff_configs(previous.config, new_config).
+        :return: Dictionary mapping 'agents', 'plugins' and 'tools' to {name: instance}.
+        """
+        managers = {
+            'agents': previous.agent_manager,
+            'plugins': previous.plugin_manager,
+            'tools': previous.tool_manager,
+        }
+        adopted = {}
+        for section, manager in managers.items():
+            if section == 'agents' and diff['modules_changed']:
+                # Every agent is constructed with the module manager, so none can be reused.
+                adopted[section] = {}
+                continue
+            instances = manager.registry.instances
+            adopted[section] = {
+                name: instances[name] for name in diff[section]['unchanged'] if name in instances
+            }
+        return adopted
+
+    def instances(self) -> list:
+        """Return every agent, plugin and tool instance that has been built so far."""
+        return [
+            instance
+            for manager in (self.agent_manager, self.plugin_manager, self.tool_manager)
+            for instance in list(manager.registry.instances.values())
+        ]
+
+    def _measure(self, phase: str):
+        """Return a context manager that records the given startup phase when profiling is enabled."""
+        return self.profiler.measure(phase) if self.profiler else nullcontext()
+
+    def preload(self, names: List[str]):
+        """
+        Build the named agents, plugins or tools ahead of their first use.
+
+        :param names: Component names to build. Each name is looked up among agents, plugins and tools.
+        """
+        registries = [
+            self.agent_manager.registry,
+            self.plugin_manager.registry,
+            self.tool_manager.registry
+        ]
+        for name in names:
+            if not any(name in registry for registry in registries):
+                logger.warning(f"Cannot preload '{name}': no agent, plugin or tool with that name is configured.")
+        for registry in registries:
+            registry.preload([name for name in names if name in registry])
 
     def load_and_merge_configs(self, config_files: Union[str, List[str]]) -> dict:
         """
@@ -104,13 +243,64 @@ class AgentSystem:
 
         return agent.chat(prompt)
 
-    def run(self):
+    @staticmethod
+    def _create_result_cache(cache_config):
+        """
+        Build the task result cache from the 'task_cache' config key.
+
+        :param cache_config: True, False/None, or a dictionary with 'path', 'max_size_mb' and 'max_entries'.
+        :return: A ResultCache, or None if caching is disabled.
+        """
+        if not cache_config:
+            return None
+        if cache_config is True:
+            cache_config = {}
+        max_size_mb = cache_config.get('max_size_mb', 256)
+        return ResultCache(
+            cache_config.get('path', os.path.join('.tinyagi', 'task_cache.sqlite')),
+            max_bytes=int(max_size_mb * 1024 * 1024) if max_size_mb else None,
+            max_entries=cache_config.get('max_entries')
+        )
+
+    @staticmethod
+    def _create_journal(journal_config):
+        """
+        Build the run journal from the 'run_journal' config key.
+
+        :param journal_config: True, False/None, or a dictionary with 'path'.
+        :return: A RunJournal, or None if journaling is disabled.
+        """
+        if not journal_config:
+            return None
+        if journal_config is True:
+            journal_config = {}
+        return RunJournal(journal_config.get('path', os.path.join('.tinyagi', 'runs.sqlite')))
+
+    def run(self, force: bool = False, resume: str = None, trace: str = None):
         """
         Execute all tasks assigned to this agent system.
+
+        :param force: If True, re-run tasks whose results are cached and refresh the cache.
+        :param resume: Id of a journaled run to continue; its completed tasks are not run again.
+        :param trace: Path to write a Chrome trace of the run to. Defaults to the 'path' of the
+                      'trace' config key; without either, the run is not traced.
+        :return: The run's TaskTracer, or None if it was not traced.
         """
+        trace_config = self.config.get('trace')
+        if trace is None and trace_config:
+            trace = trace_config.get('path') if isinstance(trace_config, dict) else None
+            trace = trace or os.path.join('.tinyagi', 'trace.json')
+        tracer = TaskTracer() if trace else None
+        self.task_manager.tracer = tracer
+
         logger.info("AgentSystem started.")
-        self.task_manager.execute_tasks()
+        try:
+            self.task_manager.execute_tasks(force=force, resume=resume)
+        finally:
+            if tracer is not None:
+                tracer.to_chrome_trace(trace)
         logger.info("AgentSystem finished execution.")
+        return tracer
 
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
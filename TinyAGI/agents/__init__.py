@@ -5,23 +5,20 @@
 
 # TinyAGI/agents/__init__.py
 
-from .agent_manager import AgentManager
-from .base_agent import BaseAgent
-from .ollama_agent import OllamaAgent
-from .openai_agent import OpenAIAgent
-from .alpaca_x_agent import AlpacaXAgent
-from .llama_cpp_agent import LlamaCppAgent
-from .tabitha_agent import TabithaAgent
+from ..core.lazy_registry import lazy_exports
 
-__all__ = [
-    'AgentManager',
-    'BaseAgent',
-    'OllamaAgent',
-    'OpenAIAgent',
-    'AlpacaXAgent',
-    'LlamaCppAgent',
-    'TabithaAgent'
-]
+_LAZY_EXPORTS = {
+    'AgentManager': '.agent_manager',
+    'BaseAgent': '.base_agent',
+    'OllamaAgent': '.ollama_agent',
+    'OpenAIAgent': '.openai_agent',
+    'AlpacaXAgent': '.alpaca_x_agent',
+    'LlamaCppAgent': '.llama_cpp_agent',
+    'TabithaAgent': '.tabitha_agent'
+}
+
+__all__ = list(_LAZY_EXPORTS)
+__getattr__ = lazy_exports(__name__, _LAZY_EXPORTS)
 
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
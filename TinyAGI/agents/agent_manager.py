@@ -10,54 +10,72 @@ import importlib
 import os
 import sys
 import git  # Requires gitpython
+from ..core.lazy_registry import LazyRegistry
 
 logger = logging.getLogger(__name__)
 
 class AgentManager:
-    def __init__(self, agents_config, module_manager, base_path=None):
+    def __init__(self, agents_config, module_manager, base_path=None, lazy=False, profiler=None, load_options=None,
+                 instances=None):
         """
         Initialize the AgentManager.
 
         :param agents_config: List of agent configurations.
         :param module_manager: Instance of ModuleManager.
         :param base_path: The base path for resolving local modules.
+        :param lazy: If True, agents are only imported and constructed on their first get_agent call.
+        :param profiler: Optional StartupProfiler that records how long each agent takes to build.
+        :param load_options: Optional LazyRegistry settings for building agents (max_workers, timeout, retries, retry_delay).
+        :param instances: Already-built agents to adopt by name instead of constructing them again.
         """
         self.agents_config = agents_config
         self.module_manager = module_manager
         self.base_path = base_path or os.path.dirname(__file__)
-        self.loaded_agents = self.load_agents()
+        self.lazy = lazy
+        self.registry = LazyRegistry('agent', agents_config, self.load_agent, profiler=profiler,
+                                     **(load_options or {}), instances=instances)
+        self.loaded_agents = self.registry.instances
+        if not lazy:
+            self.load_agents()
 
     def load_agents(self):
         """
         Load all agents based on the configuration.
         """
-        loaded_agents = {}
-        for agent_info in self.agents_config:
-            name = agent_info.get('name')
-            module_name = agent_info.get('module')
-            class_name = agent_info.get('class')
-            source = agent_info.get('source', 'local')
-            config = agent_info.get('config', {})
-
-            logger.info(f"Loading agent '{name}' from module '{module_name}' with source '{source}'.")
-
-            if source == 'github':
-                repo_url = agent_info.get('repo_url')
-                if not repo_url:
-                    logger.error(f"Repo URL not provided for agent '{name}'. Skipping.")
-                    continue
-                self.load_agent_from_github(module_name, repo_url)
+        self.registry.preload()
+        return self.loaded_agents
 
-            try:
-                module = importlib.import_module(f'TinyAGI.agents.{module_name}')
-                agent_class = getattr(module, class_name)
-                agent_instance = agent_class(config, self.module_manager)
-                loaded_agents[name] = agent_instance
-                logger.info(f"Successfully loaded agent: {name}")
-            except Exception as e:
-                logger.error(f"Failed to load agent '{name}': {e}", exc_info=True)
+    def load_agent(self, agent_info):
+        """
+        Import and construct a single agent.
+
+        :param agent_info: Dictionary containing the agent configuration.
+        :return: The agent instance, or None if it could not be loaded.
+        """
+        name = agent_info.get('name')
+        module_name = agent_info.get('module')
+        class_name = agent_info.get('class')
+        source = agent_info.get('source', 'local')
+        config = agent_info.get('config', {})
 
-        return loaded_agents
+        logger.info(f"Loading agent '{name}' from module '{module_name}' with source '{source}'.")
+
+        if source == 'github':
+            repo_url = agent_info.get('repo_url')
+            if not repo_url:
+                logger.error(f"Repo URL not provided for agent '{name}'. Skipping.")
+                return None
+            self.load_agent_from_github(module_name, repo_url)
+
+        try:
+            module = importlib.import_module(f'TinyAGI.agents.{module_name}')
+            agent_class = getattr(module, class_name)
+            agent_instance = agent_class(config, self.module_manager)
+            logger.info(f"Successfully loaded agent: {name}")
+            return agent_instance
+        except Exception as e:
+            logger.error(f"Failed to load agent '{name}': {e}", exc_info=True)
+            return None
 
     def load_agent_from_github(self, module_name, repo_url):
         """
@@ -78,9 +96,19 @@ class AgentManager:
 
     def get_agent(self, agent_name):
         """
-        Retrieve a loaded agent by its name.
+        Retrieve an agent by its name, loading it first if it has not been built yet.
+        """
+        return self.registry.get(agent_name)
+
+    def get_agent_names(self):
+        """
+        Retrieve the names of the agents.
+        In lazy mode these are all configured agents, whether built yet or not; otherwise
+        only the agents that loaded successfully.
         """
-        return self.loaded_agents.get(agent_name)
+        if self.lazy:
+            return self.registry.names()
+        return self.registry.loaded_names()
 
     def get_all_agents(self):
         """
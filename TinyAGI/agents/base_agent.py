@@ -6,10 +6,22 @@
 # TinyAGI/agents/base_agent.py
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from ..task_policy import run_in_thread
 
 logger = logging.getLogger(__name__)
 
 class BaseAgent:
+    # Set to True in agents whose generate_batch and embed(list) make one batched backend
+    # call, so plugins may coalesce tasks for them (see BasePlugin.supports_batch).
+    supports_batch_generation = False
+    supports_batch_embedding = False
+    # Defaults of embed_batch: texts per embed call (for agents with supports_batch_embedding,
+    # the provider's per-request limit) and embed calls in flight at once.
+    embed_batch_size = 64
+    embed_concurrency = 4
+
     def __init__(self, model_config):
         """
         Initialize the Base Agent with the given configuration.
@@ -31,6 +43,43 @@ class BaseAgent:
         """
         raise NotImplementedError("generate_text method must be implemented by the agent.")
 
+    async def agenerate_text(self, prompt, stream=False, **kwargs):
+        """
+        Generate text without blocking the event loop. The default runs generate_text
+        in a worker thread; agents with an async SDK should override it.
+
+        :param prompt: The prompt string to send to the model.
+        :param stream: Boolean indicating whether to stream responses.
+        :return: Generated text or, for streaming, an async iterator of chunks.
+        """
+        response = await run_in_thread(self.generate_text, prompt, stream=stream, **kwargs)
+        return aiter_in_thread(response) if stream else response
+
+    async def achat(self, messages, stream=False, **kwargs):
+        """
+        Asynchronous counterpart of chat, for agents that implement it. The default runs
+        chat in a worker thread.
+
+        :param messages: List of {'role', 'content'} messages, the last one being the prompt.
+        :param stream: Boolean indicating whether to stream responses.
+        :return: Generated text or, for streaming, an async iterator of chunks.
+        """
+        chat = getattr(self, 'chat', None)
+        if chat is None:
+            raise NotImplementedError(f"{self.__class__.__name__} does not support chat.")
+        response = await run_in_thread(chat, messages, stream=stream, **kwargs)
+        return aiter_in_thread(response) if stream else response
+
+    def generate_batch(self, prompts):
+        """
+        Generate text for several prompts. The default calls generate_text once per prompt;
+        agents with supports_batch_generation run them as one batch.
+
+        :param prompts: List of prompt strings.
+        :return: List of generated texts, in the order of prompts.
+        """
+        return [self.generate_text(prompt) for prompt in prompts]
+
     def embed(self, input_data):
         """
         Generate embeddings using the model.
@@ -40,6 +89,79 @@ class BaseAgent:
         """
         raise NotImplementedError("embed method must be implemented by the agent.")
 
+    def embed_batch(self, texts, batch_size=None, concurrency=None):
+        """
+        Embed many texts. They are split into sub-batches of at most batch_size texts, one
+        embed call each (one call per text for agents without supports_batch_embedding), and
+        up to concurrency calls run at once.
+
+        :param texts: List of strings.
+        :param batch_size: Texts per call. Defaults to the agent's embed_batch_size.
+        :param concurrency: Calls in flight at once. Defaults to the agent's embed_concurrency.
+        :return: A float32 NumPy matrix with one row per text, in the order of texts.
+        :raises RuntimeError: If a call does not return one vector per text.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        batch_size = max(1, batch_size or self.embed_batch_size) if self.supports_batch_embedding else 1
+        starts = range(0, len(texts), batch_size)
+
+        def embed_chunk(start):
+            chunk = texts[start:start + batch_size]
+            vectors = self.embed(chunk) if self.supports_batch_embedding else [self.embed(chunk[0])]
+            rows = np.asarray(vectors, dtype=np.float32)
+            if rows.ndim != 2 or len(rows) != len(chunk) or rows.shape[1] == 0:
+                raise RuntimeError(f"Embedding texts {start} to {start + len(chunk) - 1} did not return "
+                                   f"one vector per text.")
+            return start, rows
+
+        matrix = None
+        workers = min(max(1, concurrency or self.embed_concurrency), len(starts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for start, rows in executor.map(embed_chunk, starts):
+                if matrix is None:
+                    matrix = np.empty((len(texts), rows.shape[1]), dtype=np.float32)
+                matrix[start:start + len(rows)] = rows
+        return matrix
+
+    async def aembed(self, input_data):
+        """
+        Generate embeddings without blocking the event loop. The default runs embed in a worker thread.
+
+        :param input_data: String or list of strings to embed.
+        :return: Embedding vector(s).
+        """
+        return await run_in_thread(self.embed, input_data)
+
+    def close(self):
+        """
+        Release resources held by the agent (clients, loaded models).
+        Called when a reload replaces the agent. The default does nothing.
+        """
+        pass
+
+async def aiter_in_thread(iterator):
+    """
+    Consume a blocking iterator (e.g. a streaming SDK response) as an async iterator.
+    Each chunk is fetched in a worker thread, so the event loop never waits on the backend.
+
+    :param iterator: The blocking iterator or iterable.
+    :return: An async generator yielding the same chunks.
+    """
+    iterator = iter(iterator)
+    done = object()
+    try:
+        while True:
+            chunk = await run_in_thread(next, iterator, done)
+            if chunk is done:
+                return
+            yield chunk
+    finally:
+        close = getattr(iterator, 'close', None)
+        if callable(close):
+            close()
+
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the "Software"), to deal
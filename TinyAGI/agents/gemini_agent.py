@@ -8,11 +8,15 @@
 import logging
 import os
 import google.generativeai as genai
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, aiter_in_thread
 
 logger = logging.getLogger(__name__)
 
 class GeminiAgent(BaseAgent):
+    # embed_content takes a list of up to 100 texts in one request.
+    supports_batch_embedding = True
+    embed_batch_size = 100
+
     def __init__(self, model_config, module_manager=None):
         super().__init__(model_config)
         api_key = os.getenv('GEMINI_API_KEY')
@@ -60,36 +64,47 @@ class GeminiAgent(BaseAgent):
         # Pass through other kwargs to generate_text
         return self.generate_text(prompt, stream=stream, mode=mode, chat_session=chat_session, **kwargs)
 
-    def generate_text(self, prompt, stream=False, system_prompt=None, chat_session=None, **kwargs):
-        """Generates text using the Gemini model."""
-        try:
-            mode = kwargs.pop('mode', None)
-            mode_config = self.model_config.get('modes', {}).get(mode, {})
+    async def achat(self, messages, stream=False, **kwargs):
+        """Asynchronous version of chat."""
+        mode = kwargs.pop('mode', None)
+        prompt, history = self._format_chat_history(messages)
+        chat_session = self.generation_model.start_chat(history=history)
+        return await self.agenerate_text(prompt, stream=stream, mode=mode, chat_session=chat_session, **kwargs)
+
+    def _generation_request(self, system_prompt, kwargs):
+        """Return the model to call (with the mode's system prompt) and its GenerationConfig."""
+        mode = kwargs.pop('mode', None)
+        mode_config = self.model_config.get('modes', {}).get(mode, {})
 
-            final_system_prompt = mode_config.get('system_prompt', system_prompt)
+        final_system_prompt = mode_config.get('system_prompt', system_prompt)
 
-            model_instance = self.generation_model
-            if final_system_prompt:
-                model_instance = genai.GenerativeModel(
-                    self.generation_model_name,
-                    system_instruction=final_system_prompt
-                )
+        model_instance = self.generation_model
+        if final_system_prompt:
+            model_instance = genai.GenerativeModel(
+                self.generation_model_name,
+                system_instruction=final_system_prompt
+            )
+
+        generation_params = self.parameters.copy()
+        if 'parameters' in mode_config:
+            generation_params.update(mode_config.get('parameters', {}))
+        generation_params.update(kwargs)
 
-            generation_params = self.parameters.copy()
-            if 'parameters' in mode_config:
-                generation_params.update(mode_config.get('parameters', {}))
-            generation_params.update(kwargs)
+        if 'max_tokens' in generation_params:
+            generation_params['max_output_tokens'] = generation_params.pop('max_tokens')
 
-            if 'max_tokens' in generation_params:
-                generation_params['max_output_tokens'] = generation_params.pop('max_tokens')
+        return model_instance, genai.types.GenerationConfig(**generation_params)
+
+    def generate_text(self, prompt, stream=False, system_prompt=None, chat_session=None, **kwargs):
+        """Generates text using the Gemini model."""
+        try:
+            model_instance, generation_config = self._generation_request(system_prompt, kwargs)
 
             # Use the provided chat session if available, otherwise generate directly
-            target = chat_session if chat_session else model_instance
-            response = target.send_message(
-                prompt,
-                stream=stream,
-                generation_config=genai.types.GenerationConfig(**generation_params)
-            )
+            if chat_session:
+                response = chat_session.send_message(prompt, stream=stream, generation_config=generation_config)
+            else:
+                response = model_instance.generate_content(prompt, stream=stream, generation_config=generation_config)
 
             if stream:
                 return (chunk.text for chunk in response)
@@ -101,6 +116,31 @@ class GeminiAgent(BaseAgent):
             # For a stream, return an iterator that yields the error; otherwise, return the string.
             return iter([error_message]) if stream else error_message
 
+    async def agenerate_text(self, prompt, stream=False, system_prompt=None, chat_session=None, **kwargs):
+        """
+        Asynchronous version of generate_text, using the SDK's async calls.
+        With stream, returns an async iterator of text chunks.
+        """
+        try:
+            model_instance, generation_config = self._generation_request(system_prompt, kwargs)
+            if chat_session:
+                response = await chat_session.send_message_async(prompt, stream=stream,
+                                                                 generation_config=generation_config)
+            else:
+                response = await model_instance.generate_content_async(prompt, stream=stream,
+                                                                       generation_config=generation_config)
+        except Exception as e:
+            logger.error(f"Error generating text with Gemini: {e}", exc_info=True)
+            error_message = f"An error occurred with Gemini: {e}"
+            return aiter_in_thread([error_message]) if stream else error_message
+
+        if stream:
+            async def stream_generator():
+                async for chunk in response:
+                    yield chunk.text
+            return stream_generator()
+        return response.text
+
     def embed(self, input_data):
         """Generates embeddings for the given input data."""
         try:
@@ -113,6 +153,22 @@ class GeminiAgent(BaseAgent):
                 task_type="retrieval_document"
             )
             return result['embedding']
+        except Exception as e:
+            logger.error(f"Error generating embeddings with Gemini: {e}", exc_info=True)
+            return []
+
+    async def aembed(self, input_data):
+        """Asynchronous version of embed."""
+        try:
+            if isinstance(input_data, str):
+                input_data = [input_data]
+
+            result = await genai.embed_content_async(
+                model=self.embedding_model_name,
+                content=input_data,
+                task_type="retrieval_document"
+            )
+            return result['embedding']
         except Exception as e:
             logger.error(f"Error generating embeddings with Gemini: {e}", exc_info=True)
             return []
\ No newline at end of file
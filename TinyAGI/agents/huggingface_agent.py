@@ -1,13 +1,49 @@
 # TinyAGI/agents/huggingface_agent.py
 
 from .base_agent import BaseAgent
+from ..core.model_cache import model_cache
 from transformers import pipeline
 
+def _pipeline_size(generator):
+    """Return the size of a pipeline's weights in bytes, or 0 if the model does not expose them."""
+    try:
+        return sum(p.numel() * p.element_size() for p in generator.model.parameters())
+    except Exception:
+        return 0
+
 class HuggingFaceAgent(BaseAgent):
+    supports_batch_generation = True
+
     def __init__(self, model_config, module_manager=None):
         super().__init__(model_config)
         self.model_name = self.model_config.get('model_name', 'distilgpt2')
-        self.generator = pipeline("text-generation", model=self.model_name)
+        # Agents using the same model share one pipeline.
+        self._model_handle = model_cache.acquire(
+            'huggingface', self.model_name, lambda: pipeline("text-generation", model=self.model_name),
+            params={'task': 'text-generation'}, size=_pipeline_size
+        )
+
+    @property
+    def generator(self):
+        """The text-generation pipeline, loaded again if it was unloaded by the model cache."""
+        return self._model_handle.model if self._model_handle else None
 
     def generate_text(self, prompt: str, **kwargs) -> str:
-        return self.generator(prompt, max_length=50, num_return_sequences=1)[0]["generated_text"]
+        with self._model_handle.use() as generator:
+            return generator(prompt, max_length=50, num_return_sequences=1)[0]["generated_text"]
+
+    def generate_batch(self, prompts):
+        """Generate text for several prompts in one pipeline call, batch_size (default 8) at a time."""
+        batch_size = self.model_config.get('parameters', {}).get('batch_size', 8)
+        with self._model_handle.use() as generator:
+            if generator.tokenizer.pad_token_id is None:
+                # Padding is needed to batch prompts of different lengths.
+                generator.tokenizer.pad_token_id = generator.model.config.eos_token_id
+            outputs = generator(list(prompts), max_length=50, num_return_sequences=1, batch_size=batch_size)
+        return [output[0]["generated_text"] for output in outputs]
+
+    def close(self):
+        """Release this agent's reference to the shared pipeline."""
+        if self._model_handle is not None:
+            self._model_handle.release()
+            self._model_handle = None
@@ -6,36 +6,71 @@
 # TinyAGI/agents/llama_cpp_agent.py
 
 import logging
+import os
 from llama_cpp import Llama
 from .base_agent import BaseAgent
+from ..core.model_cache import model_cache
 
 logger = logging.getLogger(__name__)
 
 class LlamaCppAgent(BaseAgent):
+    # One model instance evaluates one batch at a time.
+    embed_batch_size = 32
+    embed_concurrency = 1
+
     def __init__(self, model_config, module_manager=None):
         super().__init__(model_config)
         model_path = self.parameters.get('model_path', '')
         if not model_path:
             logger.error("Model path not provided for LlamaCppAgent.")
             raise ValueError("Model path is required for LlamaCppAgent.")
-        self.model = Llama(model_path=model_path)
+        # Extra keyword arguments for Llama (n_ctx, n_gpu_layers, ...). Agents with the same
+        # model_path and model_kwargs share one copy of the weights. GGUF files are memory-mapped
+        # by default, so their resident size is roughly the file size.
+        model_kwargs = {'use_mmap': True, **self.parameters.get('model_kwargs', {})}
+        # Embeddings need a model loaded with "embedding": true in model_kwargs.
+        self.supports_batch_embedding = bool(model_kwargs.get('embedding'))
+        self._model_handle = model_cache.acquire(
+            'llama_cpp', model_path, lambda: Llama(model_path=model_path, **model_kwargs), params=model_kwargs,
+            size=os.path.getsize(model_path) if model_kwargs['use_mmap'] and os.path.isfile(model_path) else None
+        )
         logger.info(f"LlamaCppAgent initialized with model at: {model_path}")
 
+    @property
+    def model(self):
+        """The Llama instance, loaded again if it was unloaded by the model cache."""
+        return self._model_handle.model if self._model_handle else None
+
     def generate_text(self, prompt, stream=False):
         try:
-            output = self.model(prompt, max_tokens=self.parameters.get('max_tokens', 150), stream=stream)
             if stream:
-                return (chunk['choices'][0]['text'] for chunk in output)
-            else:
-                text = output['choices'][0]['text']
-                return text
+                return self._stream_text(prompt)
+            with self._model_handle.use() as model:
+                output = model(prompt, max_tokens=self.parameters.get('max_tokens', 150))
+            return output['choices'][0]['text']
         except Exception as e:
             logger.error(f"Error generating text with LlamaCpp: {e}")
             return None
 
+    def _stream_text(self, prompt):
+        # Keep the model resident until the stream is exhausted or closed.
+        with self._model_handle.use() as model:
+            for chunk in model(prompt, max_tokens=self.parameters.get('max_tokens', 150), stream=True):
+                yield chunk['choices'][0]['text']
+
     def embed(self, input_data):
-        logger.warning("Embedding is not implemented for LlamaCppAgent.")
-        return []
+        """Embed a string or a list of strings; a list is evaluated as one batch."""
+        if not self.supports_batch_embedding:
+            logger.warning("Embedding requires 'embedding': true in the model_kwargs of LlamaCppAgent.")
+            return []
+        with self._model_handle.use() as model:
+            return model.embed(input_data)
+
+    def close(self):
+        """Release this agent's reference to the shared model."""
+        if self._model_handle is not None:
+            self._model_handle.release()
+            self._model_handle = None
 
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
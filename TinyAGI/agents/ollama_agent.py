@@ -7,15 +7,45 @@
 
 import logging
 import json
+import httpx
 import ollama
 from .base_agent import BaseAgent
+from ..core.client_pool import client_pool
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_HOST = 'http://localhost:11434'
+
+def _client_settings(config):
+    """Connection settings from an agent's optional 'client' configuration, with defaults."""
+    return {
+        'pool_size': config.get('pool_size', 10),
+        'timeout': config.get('timeout'),
+        'connect_timeout': config.get('connect_timeout', 10.0),
+        'keepalive_expiry': config.get('keepalive_expiry', 30.0),
+    }
+
+def _create_client(host, settings, client_class=None):
+    return (client_class or ollama.Client)(
+        host=host,
+        timeout=httpx.Timeout(settings['timeout'], connect=settings['connect_timeout']),
+        limits=httpx.Limits(max_connections=settings['pool_size'],
+                            max_keepalive_connections=settings['pool_size'],
+                            keepalive_expiry=settings['keepalive_expiry'])
+    )
+
 class OllamaAgent(BaseAgent):
+    # /api/embed takes a list of inputs in one request.
+    supports_batch_embedding = True
+
     def __init__(self, model_config, module_manager=None):
         super().__init__(model_config)
-        self.client = ollama.Client(host=self.model_config.get('host', 'http://localhost:11434'))
+        # Agents on the same host share one client and its keep-alive connections.
+        self.host = self.model_config.get('host', DEFAULT_HOST)
+        settings = self._client_settings = _client_settings(self.model_config.get('client', {}))
+        self._client_handle = client_pool.acquire('ollama', self.host, lambda: _create_client(self.host, settings),
+                                                  params=settings)
+        self.client = self._client_handle.client
 
         if 'model_card' in self.model_config:
             card_path = self.model_config['model_card']
@@ -38,42 +68,50 @@ class OllamaAgent(BaseAgent):
         mode = kwargs.pop('mode', None)
         return self.generate_text(messages, stream=stream, mode=mode, **kwargs)
 
+    def _async_client(self):
+        """The pooled AsyncClient for this agent's host on the running event loop."""
+        settings = self._client_settings
+        return client_pool.acquire_async('ollama', self.host,
+                                         lambda: _create_client(self.host, settings, ollama.AsyncClient),
+                                         params=settings)
+
+    def _chat_request(self, messages, kwargs):
+        """Build the arguments of a chat call. A plain prompt string becomes a single user message."""
+        mode = kwargs.pop('mode', None)
+        mode_config = self.model_config.get('modes', {}).get(mode, {})
+
+        # The Ollama library uses a 'system' message for system prompts.
+        system_prompt = mode_config.get('system_prompt')
+        if isinstance(messages, str):
+            messages = [{'role': 'user', 'content': messages}]
+        final_messages = list(messages)
+        if system_prompt:
+            # Check if a system message already exists
+            has_system = any(m.get('role') == 'system' for m in final_messages)
+            if not has_system:
+                final_messages.insert(0, {'role': 'system', 'content': system_prompt})
+
+        # Parameter precedence: base -> mode -> runtime
+        generation_params = self.parameters.copy()
+        if 'parameters' in mode_config:
+            generation_params.update(mode_config.get('parameters', {}))
+        generation_params.update(kwargs)
+
+        # Map common names to Ollama's expected names
+        if 'temperature' in generation_params:
+            generation_params['temperature'] = float(generation_params['temperature'])
+        if 'max_tokens' in generation_params:
+            generation_params['num_predict'] = int(generation_params.pop('max_tokens'))
+
+        return {'model': self.model_name, 'messages': final_messages, 'options': generation_params}
+
     def generate_text(self, messages, stream=False, **kwargs):
         """
         Generates text using the Ollama model.
         The 'messages' parameter is used directly as it's the expected format.
         """
         try:
-            mode = kwargs.pop('mode', None)
-            mode_config = self.model_config.get('modes', {}).get(mode, {})
-
-            # The Ollama library uses a 'system' message for system prompts.
-            system_prompt = mode_config.get('system_prompt')
-            final_messages = list(messages)
-            if system_prompt:
-                # Check if a system message already exists
-                has_system = any(m.get('role') == 'system' for m in final_messages)
-                if not has_system:
-                    final_messages.insert(0, {'role': 'system', 'content': system_prompt})
-
-            # Parameter precedence: base -> mode -> runtime
-            generation_params = self.parameters.copy()
-            if 'parameters' in mode_config:
-                generation_params.update(mode_config.get('parameters', {}))
-            generation_params.update(kwargs)
-
-            # Map common names to Ollama's expected names
-            if 'temperature' in generation_params:
-                generation_params['temperature'] = float(generation_params['temperature'])
-            if 'max_tokens' in generation_params:
-                generation_params['num_predict'] = int(generation_params.pop('max_tokens'))
-
-            response = self.client.chat(
-                model=self.model_name,
-                messages=final_messages,
-                stream=stream,
-                options=generation_params
-            )
+            response = self.client.chat(stream=stream, **self._chat_request(messages, kwargs))
 
             if stream:
                 return (chunk['message']['content'] for chunk in response)
@@ -83,11 +121,49 @@ class OllamaAgent(BaseAgent):
             logger.error(f"Error generating text with Ollama: {e}", exc_info=True)
             return f"An error occurred with Ollama: {e}"
 
+    async def achat(self, messages, stream=False, **kwargs):
+        """Asynchronous version of chat."""
+        return await self.agenerate_text(messages, stream=stream, **kwargs)
+
+    async def agenerate_text(self, messages, stream=False, **kwargs):
+        """
+        Asynchronous version of generate_text, using the pooled AsyncClient.
+        With stream, returns an async iterator of text chunks.
+        """
+        try:
+            response = await self._async_client().chat(stream=stream, **self._chat_request(messages, kwargs))
+        except Exception as e:
+            logger.error(f"Error generating text with Ollama: {e}", exc_info=True)
+            return f"An error occurred with Ollama: {e}"
+        if stream:
+            return (chunk['message']['content'] async for chunk in response)
+        return response['message']['content']
+
     def embed(self, input_data):
-        """Generates embeddings using the Ollama model."""
+        """
+        Generates embeddings using the Ollama model on the agent's host.
+        A string gives one vector; a list of strings gives one vector per string, in one request.
+        """
+        try:
+            response = self.client.embed(model=self.model_name, input=input_data)
+            embeddings = response["embeddings"]
+            return embeddings[0] if isinstance(input_data, str) else embeddings
+        except Exception as e:
+            logger.error(f"Error generating embeddings with Ollama: {e}", exc_info=True)
+            return []
+
+    async def aembed(self, input_data):
+        """Asynchronous version of embed, using the pooled AsyncClient."""
         try:
-            response = ollama.embeddings(model=self.model_name, prompt=input_data)
-            return response["embedding"]
+            response = await self._async_client().embed(model=self.model_name, input=input_data)
+            embeddings = response["embeddings"]
+            return embeddings[0] if isinstance(input_data, str) else embeddings
         except Exception as e:
             logger.error(f"Error generating embeddings with Ollama: {e}", exc_info=True)
-            return []
\ No newline at end of file
+            return []
+
+    def close(self):
+        """Release this agent's reference to the shared client."""
+        if self._client_handle is not None:
+            self._client_handle.release()
+            self._client_handle = None
\ No newline at end of file
@@ -8,30 +8,53 @@
 import logging
 import os
 import openai
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, aiter_in_thread
+from ..core.client_pool import client_pool
 
 logger = logging.getLogger(__name__)
 
+DISABLED_MESSAGE = "OpenAIAgent is disabled because OPENAI_API_KEY is not set."
+DEFAULT_BASE_URL = 'https://api.openai.com/v1'
+
 class OpenAIAgent(BaseAgent):
+    # The embeddings endpoint takes a list of inputs in one request. It allows 2048 inputs, but
+    # also caps the tokens per request, so sub-batches stay smaller.
+    supports_batch_embedding = True
+    embed_batch_size = 256
+
     def __init__(self, model_config, module_manager=None):
         super().__init__(model_config)
         self.disabled = False
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
+        self._api_key = os.getenv('OPENAI_API_KEY')
+        # Agents on the same API base share one client and its keep-alive connections.
+        self._base_url = self.model_config.get('base_url')
+        self.base_url = self._base_url or os.getenv('OPENAI_BASE_URL') or DEFAULT_BASE_URL
+        self._client_handle = None
+        if not self._api_key:
             logger.warning("OPENAI_API_KEY not found. OpenAIAgent will be disabled.")
             self.disabled = True
             self.client = None
             self.model_name = None
         else:
-            self.client = openai.OpenAI(api_key=api_key)
+            self._client_handle = client_pool.acquire(
+                'openai', self.base_url, lambda: openai.OpenAI(api_key=self._api_key, base_url=self._base_url))
+            self.client = self._client_handle.client
             self.model_name = self.model_config.get('model', 'gpt-5-nano')
             logger.info(f"OpenAIAgent initialized with model: {self.model_name}")
+        self.embedding_model_name = self.model_config.get('embedding_model', 'text-embedding-3-small')
+
+    def _async_client(self):
+        """The shared AsyncOpenAI client for this agent's API base on the running event loop."""
+        return client_pool.acquire_async('openai', self.base_url,
+                                         lambda: openai.AsyncOpenAI(api_key=self._api_key, base_url=self._base_url))
 
     def _format_chat_history(self, messages):
         """
         Formats a list of messages for the OpenAI Responses API.
         Maps 'system' to 'developer' role if needed by the model.
         """
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
         history = []
         for message in messages:
             role = message.get("role")
@@ -47,52 +70,62 @@ class OpenAIAgent(BaseAgent):
         mode = kwargs.pop('mode', None)
         return self.generate_text(messages, stream=stream, mode=mode, **kwargs)
 
+    def _response_request(self, messages, kwargs):
+        """Build the arguments of a responses.create call."""
+        mode = kwargs.pop('mode', None)
+        mode_config = self.model_config.get('modes', {}).get(mode, {})
+
+        # The 'instructions' parameter is for high-level instructions.
+        # We'll use the system prompt from the mode or settings here.
+        instructions = mode_config.get('system_prompt')
+        if 'system_prompt' in kwargs:
+            instructions = kwargs.pop('system_prompt')
+
+        # Format messages for the 'input' parameter
+        formatted_messages = self._format_chat_history(messages)
+
+        # Parameter precedence: base -> mode -> runtime
+        generation_params = self.parameters.copy()
+        if 'parameters' in mode_config:
+            generation_params.update(mode_config.get('parameters', {}))
+        generation_params.update(kwargs)
+
+        # The Responses API uses a 'reasoning' object for some controls.
+        # We'll map temperature to it for now.
+        reasoning_config = {}
+        if 'temperature' in generation_params:
+            reasoning_config['effort'] = 'low' # A default, can be configured
+
+        return {
+            'model': self.model_name,
+            'input': formatted_messages,
+            'instructions': instructions,
+            'reasoning': reasoning_config if reasoning_config else None,
+        }
+
+    @staticmethod
+    def _chunk_text(chunk):
+        """Return the text of a streamed chunk, or None."""
+        # The new API has a different streaming format.
+        # We need to check for text content in the delta.
+        if chunk.delta and chunk.delta.content and chunk.delta.content[0].text:
+            return chunk.delta.content[0].text
+        return None
+
     def generate_text(self, messages, stream=False, **kwargs):
         """Generates text using the OpenAI model."""
         if self.disabled:
-            error_message = "OpenAIAgent is disabled because OPENAI_API_KEY is not set."
-            return iter([error_message]) if stream else error_message
+            return iter([DISABLED_MESSAGE]) if stream else DISABLED_MESSAGE
 
         try:
-            mode = kwargs.pop('mode', None)
-            mode_config = self.model_config.get('modes', {}).get(mode, {})
-
-            # The 'instructions' parameter is for high-level instructions.
-            # We'll use the system prompt from the mode or settings here.
-            instructions = mode_config.get('system_prompt')
-            if 'system_prompt' in kwargs:
-                instructions = kwargs.pop('system_prompt')
-
-            # Format messages for the 'input' parameter
-            formatted_messages = self._format_chat_history(messages)
-
-            # Parameter precedence: base -> mode -> runtime
-            generation_params = self.parameters.copy()
-            if 'parameters' in mode_config:
-                generation_params.update(mode_config.get('parameters', {}))
-            generation_params.update(kwargs)
-
-            # The Responses API uses a 'reasoning' object for some controls.
-            # We'll map temperature to it for now.
-            reasoning_config = {}
-            if 'temperature' in generation_params:
-                reasoning_config['effort'] = 'low' # A default, can be configured
-
-            response = self.client.responses.create(
-                model=self.model_name,
-                input=formatted_messages,
-                instructions=instructions,
-                reasoning=reasoning_config if reasoning_config else None,
-                stream=stream
-            )
+            response = self.client.responses.create(stream=stream, **self._response_request(messages, kwargs))
 
             if stream:
                 def stream_generator():
                     for chunk in response:
-                        # The new API has a different streaming format.
-                        # We need to check for text content in the delta.
-                        if chunk.delta and chunk.delta.content and chunk.delta.content[0].text:
-                            yield chunk.delta.content[0].text
+                        text = self._chunk_text(chunk)
+                        if text:
+                            yield text
                 return stream_generator()
             else:
                 # The output_text property conveniently aggregates text output.
@@ -102,12 +135,70 @@ class OpenAIAgent(BaseAgent):
             error_message = f"An error occurred with OpenAI: {e}"
             return iter([error_message]) if stream else error_message
 
+    async def achat(self, messages, stream=False, **kwargs):
+        """Asynchronous version of chat."""
+        return await self.agenerate_text(messages, stream=stream, **kwargs)
+
+    async def agenerate_text(self, messages, stream=False, **kwargs):
+        """
+        Asynchronous version of generate_text, using AsyncOpenAI.
+        With stream, returns an async iterator of text chunks.
+        """
+        if self.disabled:
+            return aiter_in_thread([DISABLED_MESSAGE]) if stream else DISABLED_MESSAGE
+
+        try:
+            response = await self._async_client().responses.create(stream=stream,
+                                                                    **self._response_request(messages, kwargs))
+        except Exception as e:
+            logger.error(f"Error generating text with OpenAI: {e}", exc_info=True)
+            error_message = f"An error occurred with OpenAI: {e}"
+            return aiter_in_thread([error_message]) if stream else error_message
+        if stream:
+            async def stream_generator():
+                async for chunk in response:
+                    text = self._chunk_text(chunk)
+                    if text:
+                        yield text
+            return stream_generator()
+        return response.output_text
+
     def embed(self, input_data):
-        """Generates embeddings using the OpenAI embedding models."""
+        """
+        Generates embeddings using the OpenAI embedding models.
+        A string gives one vector; a list of strings gives one vector per string, in one request.
+        """
         if self.disabled:
             logger.warning("Cannot generate embeddings: OpenAIAgent is disabled.")
             return []
 
-        # This would use client.embeddings.create, similar to gemini_agent.
-        logger.warning("Embedding is not yet implemented for OpenAIAgent.")
-        return []
\ No newline at end of file
+        try:
+            response = self.client.embeddings.create(model=self.embedding_model_name, input=input_data)
+            return self._embeddings(input_data, response)
+        except Exception as e:
+            logger.error(f"Error generating embeddings with OpenAI: {e}", exc_info=True)
+            return []
+
+    async def aembed(self, input_data):
+        """Asynchronous version of embed, using AsyncOpenAI."""
+        if self.disabled:
+            logger.warning("Cannot generate embeddings: OpenAIAgent is disabled.")
+            return []
+
+        try:
+            response = await self._async_client().embeddings.create(model=self.embedding_model_name, input=input_data)
+            return self._embeddings(input_data, response)
+        except Exception as e:
+            logger.error(f"Error generating embeddings with OpenAI: {e}", exc_info=True)
+            return []
+
+    @staticmethod
+    def _embeddings(input_data, response):
+        embeddings = [item.embedding for item in response.data]
+        return embeddings[0] if isinstance(input_data, str) else embeddings
+
+    def close(self):
+        """Release this agent's reference to the shared client."""
+        if self._client_handle is not None:
+            self._client_handle.release()
+            self._client_handle = None
\ No newline at end of file
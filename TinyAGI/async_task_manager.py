@@ -0,0 +1,311 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/async_task_manager.py
+
+import asyncio
+import logging
+import time
+from .task_manager import TaskManager
+from .task_stream import TaskStream, contains_stream
+from .run_journal import STARTED, CANCELLED
+from .task_policy import TaskTimeoutError, RetryPolicy, hold_until_consumed
+from .core.client_pool import client_pool
+
+logger = logging.getLogger(__name__)
+
+class AsyncTaskManager(TaskManager):
+    """
+    Runs the task graph on a single asyncio event loop.
+
+    Plugins that implement execute_async are awaited directly, so an I/O-bound
+    task holds no thread while it waits on a backend. Synchronous plugins are
+    offloaded to the loop's default thread pool. Tasks follow the same
+    dependency, ordering and result rules as TaskManager.
+    """
+    def __init__(self, agent_manager, plugin_manager, tool_manager, tasks, max_concurrency=None, result_cache=None,
+                 journal=None, quiet=False, tracer=None, batch_size=16):
+        """
+        Initialize the AsyncTaskManager.
+
+        :param agent_manager: Instance of AgentManager.
+        :param plugin_manager: Instance of PluginManager.
+        :param tool_manager: Instance of ToolManager.
+        :param tasks: A list of tasks to be executed.
+        :param max_concurrency: Maximum number of tasks in flight at once. None means no limit.
+        :param result_cache: Optional ResultCache (see TaskManager).
+        :param journal: Optional RunJournal (see TaskManager).
+        :param quiet: If True, results are not printed (see TaskManager).
+        :param tracer: Optional TaskTracer (see TaskManager).
+        :param batch_size: Maximum number of tasks per batched plugin call (see TaskManager).
+        """
+        super().__init__(agent_manager, plugin_manager, tool_manager, tasks, result_cache=result_cache, journal=journal,
+                         quiet=quiet, tracer=tracer, batch_size=batch_size)
+        self.max_concurrency = max_concurrency
+        self._running = {}
+        self._pumps = set()
+        self._loop = None
+
+    def execute_tasks(self, force=False, resume=None):
+        """
+        Execute all tasks, blocking until they finish. Starts its own event loop;
+        use execute_tasks_async from code that already runs one.
+
+        :param force: If True, run every task even if the result cache holds its result.
+        :param resume: Id of a journaled run to continue.
+        """
+        asyncio.run(self.execute_tasks_async(force, resume))
+
+    async def execute_tasks_async(self, force=False, resume=None):
+        """
+        Execute all tasks on the running event loop.
+
+        Cancelling this coroutine cancels every task in flight. Individual tasks can be
+        cancelled with cancel(task_id); they count as failed.
+
+        :param force: If True, run every task even if the result cache holds its result.
+        :param resume: Id of a journaled run to continue.
+        :raises TaskGraphError: If the dependencies contain a cycle or task ids are duplicated.
+        :raises KeyError: If the run to resume is not in the journal.
+        """
+        tasks, scheduler, results, templates = self._start_run(force, resume)
+        by_id = {task.get('task_id'): task for task in tasks}
+        limit = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else None
+        self._loop = asyncio.get_running_loop()
+        running = {}
+        probing = {}
+        client_pool.retain_loop()
+
+        def start(plan):
+            for kind, task_ids, args in plan:
+                if kind == 'map':
+                    coroutine = self._execute_map_task_async(*args, results, limit, self._trace_now())
+                elif kind == 'batch':
+                    coroutine = self._execute_batch_async(*args, limit, self._trace_now())
+                else:
+                    coroutine = self._execute_task_async(*args, limit, self._trace_now())
+                future = asyncio.ensure_future(coroutine)
+                running[future] = task_ids
+                for task_id in task_ids:
+                    self._running[task_id] = future
+                    self._journal_state(task_id, STARTED)
+
+        def start_ready():
+            plan, probes = self._plan_dispatch(scheduler.pop_ready(), by_id, templates, results)
+            start(plan)
+            # Checking batch support may build components, so keep it off the loop.
+            for members in probes:
+                probing[asyncio.ensure_future(asyncio.to_thread(self._probe_batch_support, members[0][0]))] = members
+
+        try:
+            start_ready()
+            while running or probing:
+                finished, _ = await asyncio.wait([*running, *probing], return_when=asyncio.FIRST_COMPLETED)
+                for future in finished:
+                    if future in probing:
+                        start(self._group_plan(probing.pop(future)))
+                        continue
+                    task_ids = running.pop(future)
+                    outcomes = None if future.cancelled() else self._outcomes(future, task_ids)
+                    for index, task_id in enumerate(task_ids):
+                        self._running.pop(task_id, None)
+                        if outcomes is None:
+                            logger.warning(f"Task '{task_id}' was cancelled.")
+                            self._journal_state(task_id, CANCELLED)
+                        else:
+                            succeeded, response = outcomes[index]
+                            if succeeded:
+                                results[task_id] = response
+                            self._journal_result(by_id[task_id], succeeded, response)
+                        scheduler.finish(task_id)
+                start_ready()
+        finally:
+            for future in probing:
+                future.cancel()
+            if running:
+                for future in running:
+                    future.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                for task_ids in running.values():
+                    for task_id in task_ids:
+                        self._journal_state(task_id, CANCELLED)
+            self._running.clear()
+            # Streams may still be feeding from this loop, so wait for them off the loop.
+            try:
+                await asyncio.to_thread(self._commit_results, tasks, results)
+            finally:
+                await client_pool.release_loop()
+
+    def cancel(self, task_id=None):
+        """
+        Cancel one running task, or all of them. Safe to call from any thread. Cancelling
+        a task that runs in a batched call cancels the whole batch.
+
+        :param task_id: The task to cancel. Defaults to every running task.
+        """
+        if self._loop is None:
+            return
+        futures = list(self._running.values()) if task_id is None else [self._running.get(task_id)]
+        for future in futures:
+            if future is not None:
+                self._loop.call_soon_threadsafe(future.cancel)
+
+    async def _execute_map_task_async(self, task, compiled, results, limit=None, queued_at=None):
+        """
+        Execute a map task. Its items run on their own thread pool (see TaskManager._execute_map_task),
+        counting as one task against max_concurrency.
+        """
+        if limit is not None:
+            async with limit:
+                return await asyncio.to_thread(self._execute_map_task, task, compiled, results, queued_at)
+        return await asyncio.to_thread(self._execute_map_task, task, compiled, results, queued_at)
+
+    async def _execute_batch_async(self, tasks, inputs, limit=None, queued_at=None):
+        """
+        Execute a batch of tasks with one plugin call on a thread (see TaskManager._execute_batch),
+        counting as one task against max_concurrency.
+        """
+        if limit is not None:
+            async with limit:
+                return await asyncio.to_thread(self._execute_batch, tasks, inputs, queued_at)
+        return await asyncio.to_thread(self._execute_batch, tasks, inputs, queued_at)
+
+    async def _execute_task_async(self, task, input_data, limit=None, queued_at=None):
+        """
+        Execute a single task without blocking the event loop.
+
+        :param task: The task configuration.
+        :param input_data: The task input with placeholders resolved.
+        :param limit: Optional semaphore bounding the number of tasks in flight.
+        :param queued_at: When the task became ready, from the tracer's clock.
+        :return: Tuple of (succeeded, response).
+        """
+        if limit is not None:
+            async with limit:
+                return await self._execute_task_async(task, input_data, queued_at=queued_at)
+        self._trace_queue(task.get('task_id'), queued_at)
+
+        # Looking components up may build them (lazy loading), so keep it off the loop.
+        components = None
+        if contains_stream(input_data):
+            components = await asyncio.to_thread(self._get_components, task)
+            if components is None:
+                return False, None
+            input_data = await asyncio.to_thread(self._stream_inputs, task, input_data, components)
+            if input_data is None:
+                return False, None
+
+        key = None
+        if self.result_cache is not None:
+            key, found, cached = await asyncio.to_thread(self._cached_result, task, input_data)
+            if found:
+                await asyncio.to_thread(self._finish_task, task, cached)
+                return True, cached
+
+        components = components or await asyncio.to_thread(self._get_components, task)
+        if components is None:
+            return False, None
+        try:
+            response = await self._call_plugin_async(task, components, input_data)
+            if hasattr(response, '__anext__'):
+                # Async streams are fed from this loop rather than from a thread of their own.
+                stream = TaskStream(task_id=task.get('task_id'))
+                pump = asyncio.ensure_future(stream.pump_async(response))
+                self._pumps.add(pump)
+                pump.add_done_callback(self._pumps.discard)
+                response = stream
+            return True, await asyncio.to_thread(self._handle_response, task, key, response)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error during task '{task.get('task_id')}' execution: {e}")
+            return False, None
+
+    async def _call_plugin_async(self, task, components, input_data):
+        """
+        Run a task's plugin with the same timeout, retry and agent slot rules as
+        TaskManager._call_plugin. Plugins with a native execute_async are awaited on
+        the loop, and a timed-out call is cancelled; others run on a thread.
+
+        :param task: The task configuration.
+        :param components: Tuple of (plugin, agent, tool).
+        :param input_data: The resolved input.
+        :return: The plugin's response.
+        """
+        plugin = components[0]
+        if not asyncio.iscoroutinefunction(getattr(plugin, 'execute_async', None)):
+            return await asyncio.to_thread(self._call_plugin, task, components, input_data)
+
+        components = self._traced_components(task, components)
+        policy = RetryPolicy.from_task(task)
+        for attempt in range(policy.retries + 1):
+            try:
+                with self._trace('plugin', task.get('task_id'), attempt=attempt + 1):
+                    return await self._call_plugin_once_async(task, components, input_data, policy.timeout_s)
+            except Exception as e:
+                if attempt == policy.retries:
+                    raise
+                delay = policy.delay(attempt)
+                logger.warning(f"Task '{task.get('task_id')}' failed (attempt {attempt + 1} of "
+                               f"{policy.retries + 1}): {e}. Retrying in {delay:g}s.")
+                await asyncio.sleep(delay)
+
+    async def _call_plugin_once_async(self, task, components, input_data, timeout=None):
+        """
+        Make one execute_async call, holding a slot of the task's agent while it runs.
+        Waiting for a free slot counts against the timeout. A call that times out is
+        cancelled but keeps its slot until it has actually ended, so work still running
+        on a thread counts against the agent's max_in_flight.
+        """
+        plugin, agent, tool = components
+        options = task.get('options', {})
+        slot = self._agent_limits.get(task.get('agent'))
+        if slot is not None:
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(slot.acquire_async(), timeout)
+            except asyncio.TimeoutError:
+                raise TaskTimeoutError(f"'{task.get('task_id')}' found no free slot of agent "
+                                       f"'{task.get('agent')}' within {timeout}s.") from None
+            if timeout is not None:
+                timeout = max(0.0, timeout - (time.monotonic() - started))
+        call = asyncio.ensure_future(plugin.execute_async(agent=agent, tool=tool, input_data=input_data,
+                                                          options=options, stream=options.get('stream', False)))
+        try:
+            done, _ = await asyncio.wait({call}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(call, slot)
+            raise
+        if not done:
+            self._abandon(call, slot)
+            raise TaskTimeoutError(f"'{task.get('task_id')}' did not finish within {timeout}s.")
+        try:
+            response = call.result()
+        except BaseException:
+            if slot is not None:
+                slot.release()
+            raise
+        if slot is not None:
+            response, held = hold_until_consumed(response, slot.release)
+            if not held:
+                slot.release()
+        return response
+
+    @staticmethod
+    def _abandon(call, slot):
+        """Cancel a plugin call, release its slot once it has ended and close any stream it returned."""
+        def ended(future):
+            try:
+                if not future.cancelled() and future.exception() is None:
+                    response = future.result()
+                    if hasattr(response, 'aclose'):
+                        asyncio.ensure_future(response.aclose())
+                    elif callable(getattr(response, 'close', None)):
+                        response.close()
+            finally:
+                if slot is not None:
+                    slot.release()
+        call.cancel()
+        call.add_done_callback(ended)
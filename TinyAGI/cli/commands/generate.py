@@ -19,7 +19,7 @@ class GenerateCommand(BaseCommand):
     def execute(self, agent_system: AgentSystem, args: list = None):
         """Handles the 'generate' command in the interactive CLI."""
         try:
-            available_agents = list(agent_system.agent_manager.loaded_agents.keys())
+            available_agents = agent_system.agent_manager.get_agent_names()
             if not available_agents:
                 console.print("[bold red]No agents available. Please check your configuration.[/bold red]")
                 return
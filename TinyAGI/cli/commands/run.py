@@ -5,12 +5,13 @@
 
 # TinyAGI/cli/commands/run.py
 
-import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from rich.console import Console
 from rich.prompt import Prompt
 from TinyAGI.agent import AgentSystem
+from TinyAGI.planner import Planner
+from TinyAGI.task_template import compile_template
 from .base_command import BaseCommand
-from TinyAGI.task_manager import TaskManager
 from ..command_manager import CommandManager
 from ..command_executor import CommandExecutor
 
@@ -42,25 +43,30 @@ class RunCommand(BaseCommand):
         
         console.print(f"[bold green]Plan:[/bold green]\n{planner.tasks}")
 
-        # 2. Execute the tasks in the plan.
+        # 2. Execute the tasks in the plan. A task is started as soon as its dependencies complete.
         command_manager = CommandManager()
         command_executor = CommandExecutor(command_manager, agent_system)
-        task_manager = TaskManager(agent_system.agent_manager, agent_system.plugin_manager, agent_system.tool_manager, command_executor)
+        outputs = {}
+
+        def run_task(task):
+            input_data = compile_template(task.get('input', {})).render(outputs)
+            args = [str(value) for value in input_data.values()] if isinstance(input_data, dict) else None
+            return command_executor.execute_command(task['command'], args)
 
         with ThreadPoolExecutor() as executor:
+            running = {}
             while True:
-                runnable_tasks = planner.get_runnable_tasks()
-                if not runnable_tasks:
-                    break
-
-                futures = []
-                for task in runnable_tasks:
+                for task in planner.get_runnable_tasks():
                     planner.update_task_status(task['task_id'], 'in_progress')
-                    futures.append(executor.submit(task_manager.execute_tasks, [task]))
+                    running[executor.submit(run_task, task)] = task
+                if not running:
+                    break
 
-                for future in futures:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = running.pop(future)
                     try:
-                        future.result()
+                        outputs[task['task_id']] = future.result()
                         planner.update_task_status(task['task_id'], 'completed')
                     except Exception as e:
                         console.print(f"[bold red]Error executing task {task['task_id']}: {e}[/bold red]")
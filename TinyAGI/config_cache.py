@@ -0,0 +1,116 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/config_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class ConfigCache:
+    """
+    Caches merged, validated configurations so that reloading unchanged config
+    files skips JSON parsing, merging and schema validation.
+
+    Entries are found first by (path, mtime, size) of every file, then by a
+    SHA-256 hash of their contents, so touching a file without changing it is
+    still a hit. Only configurations that passed validation are cached.
+    """
+    def __init__(self, max_entries=32):
+        """
+        Initialize the ConfigCache.
+
+        :param max_entries: Maximum number of merged configurations to keep.
+        """
+        self.max_entries = max_entries
+        self._by_stat = OrderedDict()
+        self._by_hash = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _stat_key(self, config_files):
+        key = []
+        for file in config_files:
+            path = os.path.abspath(file)
+            try:
+                st = os.stat(path)
+                key.append((path, st.st_mtime_ns, st.st_size))
+            except OSError:
+                key.append((path, None, None))
+        return tuple(key)
+
+    def _content_hash(self, config_files):
+        digest = hashlib.sha256()
+        for file in config_files:
+            digest.update(os.path.abspath(file).encode('utf-8'))
+            try:
+                with open(file, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(b'\0missing')
+        return digest.hexdigest()
+
+    def _store(self, stat_key, content_hash, merged_json):
+        self._by_stat[stat_key] = content_hash
+        self._by_hash[content_hash] = merged_json
+        self._by_stat.move_to_end(stat_key)
+        self._by_hash.move_to_end(content_hash)
+        while len(self._by_hash) > self.max_entries:
+            evicted, _ = self._by_hash.popitem(last=False)
+            for key in [k for k, h in self._by_stat.items() if h == evicted]:
+                del self._by_stat[key]
+        while len(self._by_stat) > self.max_entries:
+            self._by_stat.popitem(last=False)
+
+    def load(self, config_files, loader, validator):
+        """
+        Return the merged configuration for the given files, using the cache when possible.
+
+        :param config_files: List of configuration file paths.
+        :param loader: Callable taking the file list and returning the merged configuration.
+        :param validator: Callable taking the merged configuration and returning True if it is valid.
+        :return: Tuple of (configuration dictionary, is_valid). The dictionary is a fresh copy.
+        """
+        stat_key = self._stat_key(config_files)
+        with self._lock:
+            content_hash = self._by_stat.get(stat_key)
+            merged_json = self._by_hash.get(content_hash) if content_hash else None
+
+        if merged_json is None:
+            content_hash = self._content_hash(config_files)
+            with self._lock:
+                merged_json = self._by_hash.get(content_hash)
+                if merged_json is not None:
+                    self._store(stat_key, content_hash, merged_json)
+
+        if merged_json is not None:
+            with self._lock:
+                self.hits += 1
+            logger.info("Configuration unchanged since last load; using cached validated config.")
+            return json.loads(merged_json), True
+
+        with self._lock:
+            self.misses += 1
+        config = loader(config_files)
+        if not validator(config):
+            return config, False
+        # Store a serialized copy so later mutations of the returned dict cannot leak into the cache.
+        with self._lock:
+            self._store(stat_key, content_hash, json.dumps(config))
+        return config, True
+
+    def clear(self):
+        """Drop all cached configurations."""
+        with self._lock:
+            self._by_stat.clear()
+            self._by_hash.clear()
+
+config_cache = ConfigCache()
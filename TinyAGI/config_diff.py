@@ -0,0 +1,65 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/config_diff.py
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Keys that determine how a component is built. A change to any other key
+# (description, modes, system_prompt, ...) does not require a rebuild.
+BUILD_KEYS = {
+    'agents': ('module', 'class', 'source', 'repo_url', 'config'),
+    'plugins': ('module', 'source', 'repo_url', 'config'),
+    'tools': ('module', 'class', 'source', 'repo_url', 'config'),
+}
+
+def _build_signature(section, info):
+    keys = BUILD_KEYS.get(section)
+    relevant = {k: info.get(k) for k in keys} if keys else info
+    return json.dumps(relevant, sort_keys=True, default=str)
+
+def diff_components(section, old_list, new_list):
+    """
+    Compare two lists of component configurations by component name.
+
+    :param section: The config section ('agents', 'plugins' or 'tools').
+    :param old_list: Component configurations currently in use.
+    :param new_list: Component configurations to switch to.
+    :return: Dictionary with 'added', 'removed', 'changed' and 'unchanged' lists of names.
+    """
+    old = {info.get('name'): info for info in old_list or []}
+    new = {info.get('name'): info for info in new_list or []}
+    diff = {'added': [], 'removed': [], 'changed': [], 'unchanged': []}
+    for name, info in new.items():
+        if name not in old:
+            diff['added'].append(name)
+        elif _build_signature(section, old[name]) != _build_signature(section, info):
+            diff['changed'].append(name)
+        else:
+            diff['unchanged'].append(name)
+    diff['removed'] = [name for name in old if name not in new]
+    return diff
+
+def diff_configs(old_config, new_config):
+    """
+    Compare the component sections of two merged configurations.
+
+    :param old_config: The configuration currently in use.
+    :param new_config: The configuration to switch to.
+    :return: Dictionary mapping 'agents', 'plugins' and 'tools' to their diff_components result,
+             plus 'modules_changed' (bool) since every agent depends on the shared modules.
+    """
+    diff = {
+        section: diff_components(section, old_config.get(section, []), new_config.get(section, []))
+        for section in BUILD_KEYS
+    }
+    diff['modules_changed'] = (
+        json.dumps(old_config.get('modules', []), sort_keys=True, default=str) !=
+        json.dumps(new_config.get('modules', []), sort_keys=True, default=str)
+    )
+    return diff
@@ -22,7 +22,9 @@ CONFIG_SCHEMA = {
                     "module": {"type": "string", "minLength": 1},
                     "class": {"type": "string", "minLength": 1},
                     "source": {"type": "string", "enum": ["local", "github"]},
-                    "config": {"type": "object"}
+                    "config": {"type": "object"},
+                    "load_timeout": {"type": "number", "exclusiveMinimum": 0},
+                    "max_in_flight": {"type": "integer", "minimum": 1}
                 },
                 "required": ["name", "module", "class", "source", "config"]
             }
@@ -35,7 +37,8 @@ CONFIG_SCHEMA = {
                     "name": {"type": "string", "minLength": 1},
                     "module": {"type": "string", "minLength": 1},
                     "source": {"type": "string", "enum": ["local", "github"]},
-                    "config": {"type": "object"}
+                    "config": {"type": "object"},
+                    "load_timeout": {"type": "number", "exclusiveMinimum": 0}
                 },
                 "required": ["name", "module", "source"]
             }
@@ -49,7 +52,8 @@ CONFIG_SCHEMA = {
                     "module": {"type": "string", "minLength": 1},
                     "class": {"type": "string", "minLength": 1},
                     "source": {"type": "string", "enum": ["local", "github"]},
-                    "config": {"type": "object"}
+                    "config": {"type": "object"},
+                    "load_timeout": {"type": "number", "exclusiveMinimum": 0}
                 },
                 "required": ["name", "module", "class", "source"]
             }
@@ -64,34 +68,111 @@ CONFIG_SCHEMA = {
                     "agent": {"type": "string", "minLength": 1},
                     "tool": {"type": ["string", "null"]},
                     "input": {"type": "object"},
-                    "output": {"type": "object"},
-                    "options": {"type": "object"}
+                    "output": {
+                        "type": ["object", "array"],
+                        "items": {"type": "object"}
+                    },
+                    "options": {"type": "object"},
+                    "cache": {"type": "boolean"},
+                    "timeout_s": {"type": "number", "exclusiveMinimum": 0},
+                    "retries": {"type": "integer", "minimum": 0},
+                    "backoff": {"type": "number", "minimum": 0},
+                    "map_over": {"type": ["string", "array"]},
+                    "max_concurrency": {"type": "integer", "minimum": 1},
+                    "on_item_error": {"type": "string", "enum": ["fail", "skip", "null"]},
+                    "reduce": {
+                        "type": "object",
+                        "properties": {
+                            "plugin": {"type": "string", "minLength": 1},
+                            "agent": {"type": "string", "minLength": 1},
+                            "tool": {"type": ["string", "null"]},
+                            "input": {"type": "object"},
+                            "options": {"type": "object"},
+                            "timeout_s": {"type": "number", "exclusiveMinimum": 0},
+                            "retries": {"type": "integer", "minimum": 0},
+                            "backoff": {"type": "number", "minimum": 0}
+                        },
+                        "required": ["plugin"]
+                    },
+                    "depends_on": {
+                        "type": ["string", "array"],
+                        "items": {"type": "string", "minLength": 1}
+                    }
                 },
                 "required": ["task_id", "plugin", "agent", "input"]
             }
         },
         "modules": {
             "type": "array"
+        },
+        "lazy_loading": {"type": "boolean"},
+        "load_workers": {"type": "integer", "minimum": 1},
+        "load_timeout": {"type": ["number", "null"], "exclusiveMinimum": 0},
+        "load_retries": {"type": "integer", "minimum": 0},
+        "load_retry_delay": {"type": "number", "minimum": 0},
+        "task_workers": {"type": "integer", "minimum": 1},
+        "task_engine": {"type": "string", "enum": ["threads", "asyncio"]},
+        "task_batch_size": {"type": "integer", "minimum": 1},
+        "quiet": {"type": "boolean"},
+        "trace": {
+            "type": ["boolean", "object"],
+            "properties": {
+                "path": {"type": "string", "minLength": 1}
+            }
+        },
+        "task_cache": {
+            "type": ["boolean", "object"],
+            "properties": {
+                "path": {"type": "string", "minLength": 1},
+                "max_size_mb": {"type": ["number", "null"], "exclusiveMinimum": 0},
+                "max_entries": {"type": ["integer", "null"], "minimum": 1}
+            }
+        },
+        "run_journal": {
+            "type": ["boolean", "object"],
+            "properties": {
+                "path": {"type": "string", "minLength": 1}
+            }
+        },
+        "model_memory_budget_mb": {"type": ["number", "null"], "exclusiveMinimum": 0},
+        "model_idle_timeout": {"type": ["number", "null"], "exclusiveMinimum": 0},
+        "preload": {
+            "type": "array",
+            "items": {"type": "string", "minLength": 1}
         }
     },
     "required": ["agents", "plugins", "tools", "tasks"]
 }
 
+# Compile the validator once at import time instead of on every validate_config call.
+_VALIDATOR_CLASS = jsonschema.validators.validator_for(CONFIG_SCHEMA)
+_VALIDATOR_CLASS.check_schema(CONFIG_SCHEMA)
+CONFIG_VALIDATOR = _VALIDATOR_CLASS(CONFIG_SCHEMA)
+
+def get_config_errors(config_data):
+    """
+    Collects every schema violation in the configuration data.
+
+    :param config_data: The configuration dictionary to validate.
+    :return: List of (path, message) tuples, empty if the configuration is valid.
+    """
+    errors = sorted(CONFIG_VALIDATOR.iter_errors(config_data), key=lambda e: [str(p) for p in e.path])
+    return [(list(e.path), e.message) for e in errors]
+
 def validate_config(config_data):
     """
     Validates the configuration data against the defined schema.
+    All violations are logged, not only the first one.
 
     :param config_data: The configuration dictionary to validate.
     :return: True if validation is successful, False otherwise.
     """
-    try:
-        jsonschema.validate(instance=config_data, schema=CONFIG_SCHEMA)
+    errors = get_config_errors(config_data)
+    if not errors:
         logger.info("Configuration validation successful.")
         return True
-    except jsonschema.exceptions.ValidationError as e:
-        logger.error(f"Configuration validation error: {e.message}")
-        logger.error(f"Path to error: {list(e.path)}")
-        return False
-    except jsonschema.exceptions.SchemaError as e:
-        logger.error(f"Configuration schema is invalid: {e.message}")
-        return False
\ No newline at end of file
+    logger.error(f"Configuration validation failed with {len(errors)} error(s):")
+    for path, message in errors:
+        logger.error(f"Configuration validation error: {message}")
+        logger.error(f"Path to error: {path}")
+    return False
\ No newline at end of file
@@ -6,7 +6,16 @@
 # This file makes the 'core' directory a Python package.
 
 from .base_manager import BaseManager
+from .lazy_registry import LazyRegistry, lazy_exports
+from .model_cache import ModelCache, model_cache
+from .client_pool import ClientPool, client_pool
 
 __all__ = [
-    'BaseManager'
+    'BaseManager',
+    'LazyRegistry',
+    'lazy_exports',
+    'ModelCache',
+    'model_cache',
+    'ClientPool',
+    'client_pool'
 ]
\ No newline at end of file
@@ -0,0 +1,185 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/core/client_pool.py
+
+import asyncio
+import inspect
+import json
+import logging
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+class ClientHandle:
+    """
+    A borrowed reference to a pooled backend client. Release it exactly once when the
+    owner (usually an agent) no longer needs the client.
+    """
+    def __init__(self, pool, key, client):
+        self._pool = pool
+        self.key = key
+        self.client = client
+        self._released = False
+
+    def release(self):
+        """Return the reference to the pool. Calling it more than once has no effect."""
+        if self._released:
+            return
+        self._released = True
+        self._pool._release(self.key)
+
+class ClientPool:
+    """
+    Process-wide registry of HTTP clients for model backends, one per backend, host and
+    connection settings. Every agent talking to the same server borrows the same client,
+    so its keep-alive connections are reused across agents and requests instead of being
+    opened for each of them. Entries are reference counted like ModelCache entries: the
+    client is created on the first acquire and closed when the last handle is released.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._loop_clients = weakref.WeakKeyDictionary()
+        self._loop_users = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def make_key(backend, host, params=None):
+        """
+        Build the pool key for a client.
+
+        :param backend: Name of the backend (e.g., 'ollama').
+        :param host: The server's base URL.
+        :param params: Connection settings that change the created client (pool size, timeouts, ...).
+        :return: A hashable key.
+        """
+        return (backend, str(host), json.dumps(params or {}, sort_keys=True, default=str))
+
+    def acquire(self, backend, host, factory, params=None):
+        """
+        Borrow the client for a host, creating it if this is its first user.
+
+        :param backend: Name of the backend.
+        :param host: The server's base URL.
+        :param factory: Callable taking no arguments that creates the client.
+        :param params: Connection settings, part of the pool key.
+        :return: A ClientHandle.
+        """
+        key = self.make_key(backend, host, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {'client': factory(), 'refs': 0}
+                logger.info(f"Created pooled {backend} client for '{host}'.")
+            entry['refs'] += 1
+            return ClientHandle(self, key, entry['client'])
+
+    def acquire_async(self, backend, host, factory, params=None):
+        """
+        Return the async client for a host on the running event loop, creating it on first use.
+        Async HTTP clients are bound to the loop they were used on, so each loop gets its own,
+        shared by every agent on that loop. They are closed by aclose_loop, or when the last
+        retain_loop holder releases the loop.
+
+        :param backend: Name of the backend.
+        :param host: The server's base URL.
+        :param factory: Callable taking no arguments that creates the async client.
+        :param params: Connection settings, part of the pool key.
+        :return: The async client.
+        """
+        loop = asyncio.get_running_loop()
+        key = self.make_key(backend, host, params)
+        with self._lock:
+            clients = self._loop_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = clients[key] = factory()
+                logger.info(f"Created pooled async {backend} client for '{host}'.")
+            return client
+
+    def retain_loop(self):
+        """
+        Mark the running event loop as in use, so release_loop from another user of the loop
+        does not close clients this one is still using. Pair every call with release_loop.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._loop_users[loop] = self._loop_users.get(loop, 0) + 1
+
+    async def release_loop(self):
+        """End a retain_loop on the running event loop; the last holder closes the loop's clients."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            users = self._loop_users.get(loop, 0) - 1
+            if users > 0:
+                self._loop_users[loop] = users
+                return
+            self._loop_users.pop(loop, None)
+        await self.aclose_loop()
+
+    async def aclose_loop(self):
+        """
+        Close and drop every async client created on the running event loop. Clients are
+        created again on the next acquire_async.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._loop_clients.pop(loop, {})
+        for key, client in clients.items():
+            close = getattr(client, 'aclose', None) or getattr(client, 'close', None)
+            if not callable(close):
+                continue
+            try:
+                result = close()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error closing async {key[0]} client for '{key[1]}': {e}")
+
+    def _release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry['refs'] -= 1
+            if entry['refs'] > 0:
+                return
+            del self._entries[key]
+        logger.info(f"Closing pooled {key[0]} client for '{key[1]}'.")
+        close = getattr(entry['client'], 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.error(f"Error closing {key[0]} client for '{key[1]}': {e}")
+
+    def stats(self):
+        """
+        Return the pooled clients.
+
+        :return: List of dictionaries with 'backend', 'host', 'params' and 'refs'.
+        """
+        with self._lock:
+            return [{'backend': key[0], 'host': key[1], 'params': json.loads(key[2]), 'refs': entry['refs']}
+                    for key, entry in self._entries.items()]
+
+client_pool = ClientPool()
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
@@ -0,0 +1,64 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/core/fork_safety.py
+
+import logging
+import os
+import threading
+import weakref
+
+logger = logging.getLogger(__name__)
+
+_instances = weakref.WeakSet()
+_hook_lock = threading.Lock()
+_hook_installed = False
+
+def _after_in_child():
+    global _hook_lock
+    _hook_lock = threading.Lock()
+    for target in list(_instances):
+        try:
+            target._after_fork()
+        except Exception as e:
+            logger.error(f"Error resetting {type(target).__name__} after fork: {e}")
+
+def register_after_fork(instance):
+    """
+    Call instance._after_fork() in every child process forked from now on.
+
+    A forked child (e.g. a pre-fork server worker) inherits objects but only the thread
+    that called fork: background threads such as sweepers and retry timers are gone, and
+    a lock held by one of them at the time of the fork stays locked forever. Objects that
+    own threads or locks implement _after_fork to replace their locks and restart their
+    threads. Fork hooks cannot be removed, so a single hook serves every registered
+    instance; instances are held weakly and drop out once they are collected.
+
+    :param instance: An object with an _after_fork method.
+    """
+    global _hook_installed
+    if not hasattr(os, 'register_at_fork'):
+        return
+    with _hook_lock:
+        _instances.add(instance)
+        if not _hook_installed:
+            os.register_at_fork(after_in_child=_after_in_child)
+            _hook_installed = True
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
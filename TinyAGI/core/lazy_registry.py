@@ -0,0 +1,326 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/core/lazy_registry.py
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from .fork_safety import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+def lazy_exports(package, exports):
+    """
+    Build a module-level __getattr__ that imports a package's re-exported names on first
+    access. The component packages use it so that importing a single manager does not pull
+    in every backend SDK (llama.cpp, transformers, NLTK, ...).
+
+    :param package: The package's __name__.
+    :param exports: Dictionary mapping each exported name to its module, relative to the package.
+    :return: The __getattr__ function to assign in the package.
+    """
+    def __getattr__(name):
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+    return __getattr__
+
+class LazyRegistry:
+    """
+    Holds the configuration of a set of components (agents, plugins, tools) and
+    builds each one on first access. Construction is guarded by a per-name lock
+    so concurrent callers never initialize the same component twice.
+
+    Components can also be built ahead of time on a bounded pool of threads,
+    each with its own timeout. A component that fails or times out is marked
+    unavailable (get returns None without blocking) and is retried in the
+    background until it loads or the retries run out.
+    """
+    def __init__(self, component_type, config_list, factory, profiler=None,
+                 max_workers=1, timeout=None, retries=0, retry_delay=30.0, instances=None):
+        """
+        Initialize the LazyRegistry.
+
+        :param component_type: The type of component being managed (e.g., 'agent', 'plugin').
+        :param config_list: List of component configurations, each with a 'name' key.
+        :param factory: Callable taking a component configuration and returning an instance, or None on failure.
+        :param profiler: Optional StartupProfiler that records the construction of each component.
+        :param max_workers: Maximum number of components built concurrently by preload.
+        :param timeout: Default seconds preload waits for a single component. A component's
+                        'load_timeout' key overrides it. None waits indefinitely.
+        :param retries: Number of background retries for components that failed or timed out.
+        :param retry_delay: Seconds before the first background retry; doubles on each attempt.
+        :param instances: Already-built instances to adopt, keyed by name. Names that are not
+                          in config_list are ignored.
+        """
+        self.component_type = component_type
+        self.factory = factory
+        self.profiler = profiler
+        self.max_workers = max(1, max_workers or 1)
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.specs = {}
+        self.instances = {}
+        self.failed = set()
+        self._retrying = set()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._name_locks = {}
+        for info in config_list:
+            self.register(info)
+        for name, instance in (instances or {}).items():
+            if name in self.specs and instance is not None:
+                self.instances[name] = instance
+        register_after_fork(self)
+
+    def _after_fork(self):
+        """In a forked child: replace the locks and restart the retries whose timers did not survive."""
+        self._lock = threading.Lock()
+        self._name_locks = {}
+        retrying, self._retrying = self._retrying, set()
+        for name in retrying:
+            self._schedule_retry(name, 1)
+
+    def register(self, info):
+        """
+        Register (or replace) the configuration of a component without building it.
+        Replacing a component drops any instance built from its old configuration.
+
+        :param info: Component configuration dictionary.
+        :return: The dropped instance, or None.
+        """
+        name = info.get('name')
+        with self._lock:
+            self.specs[name] = info
+            self.failed.discard(name)
+            self._generations[name] = self._generations.get(name, 0) + 1
+            return self.instances.pop(name, None)
+
+    def unregister(self, name):
+        """
+        Forget a component's configuration and drop its instance if it was built.
+
+        :param name: The name of the component.
+        :return: The dropped instance, or None.
+        """
+        with self._lock:
+            self.specs.pop(name, None)
+            self.failed.discard(name)
+            self._generations[name] = self._generations.get(name, 0) + 1
+            return self.instances.pop(name, None)
+
+    def _lock_for(self, name):
+        with self._lock:
+            lock = self._name_locks.get(name)
+            if lock is None:
+                lock = self._name_locks[name] = threading.Lock()
+            return lock
+
+    def _build(self, name, spec, generation):
+        """Run the factory for one component. Must be called with the component's lock held."""
+        measure = self.profiler.measure(name, kind=self.component_type) if self.profiler else nullcontext()
+        with measure as record:
+            try:
+                instance = self.factory(spec)
+            except Exception as e:
+                logger.error(f"Failed to build {self.component_type} '{name}': {e}", exc_info=True)
+                instance = None
+            if instance is None and record is not None:
+                record['error'] = f"{self.component_type} failed to load"
+
+        with self._lock:
+            if self._generations.get(name) != generation:
+                # The component was replaced or removed while it was being built.
+                return None
+            if instance is None:
+                self.failed.add(name)
+            else:
+                self.instances[name] = instance
+                self.failed.discard(name)
+        return instance
+
+    def get(self, name):
+        """
+        Return the component instance, building it on first access.
+
+        :param name: The name of the component.
+        :return: The component instance, or None if it is unknown or currently unavailable.
+        """
+        instance = self.instances.get(name)
+        if instance is not None or name not in self.specs or name in self.failed:
+            return instance
+
+        with self._lock_for(name):
+            # Another thread may have finished building it while we waited.
+            instance = self.instances.get(name)
+            if instance is not None or name in self.failed:
+                return instance
+            spec = self.specs.get(name)
+            if spec is None:
+                return None
+            logger.debug(f"Building {self.component_type} '{name}' on first use.")
+            instance = self._build(name, spec, self._generations.get(name))
+        if instance is None:
+            self._schedule_retry(name, 1)
+        return instance
+
+    def _schedule_retry(self, name, attempt, continuing=False):
+        with self._lock:
+            if attempt > self.retries or name not in self.specs:
+                self._retrying.discard(name)
+                return
+            if not continuing:
+                # Only one retry chain per component at a time.
+                if name in self._retrying:
+                    return
+                self._retrying.add(name)
+        delay = self.retry_delay * (2 ** (attempt - 1))
+        logger.info(f"Retrying {self.component_type} '{name}' in {delay:.0f}s (attempt {attempt}/{self.retries}).")
+        timer = threading.Timer(delay, self._retry, args=(name, attempt))
+        timer.daemon = True
+        timer.start()
+
+    def _retry(self, name, attempt):
+        lock = self._lock_for(name)
+        if not lock.acquire(blocking=False):
+            # A previous build (e.g. one that timed out) is still running; check again later.
+            self._schedule_retry(name, attempt, continuing=True)
+            return
+        try:
+            spec = self.specs.get(name)
+            instance = self.instances.get(name)
+            if spec is not None and instance is None:
+                instance = self._build(name, spec, self._generations.get(name))
+        finally:
+            lock.release()
+        if instance is None and spec is not None:
+            self._schedule_retry(name, attempt + 1, continuing=True)
+            return
+        with self._lock:
+            self._retrying.discard(name)
+        if instance is not None:
+            logger.info(f"{self.component_type.capitalize()} '{name}' became available on retry {attempt}.")
+
+    def mark_unavailable(self, name):
+        """
+        Mark a component as unavailable so get returns None without blocking, and schedule a retry.
+
+        :param name: The name of the component.
+        """
+        with self._lock:
+            if name in self.instances or name not in self.specs:
+                return
+            self.failed.add(name)
+        self._schedule_retry(name, 1)
+
+    def preload(self, names=None):
+        """
+        Build the given components (or all registered ones) ahead of first use, up to
+        max_workers at a time. Components that exceed their timeout are marked
+        unavailable and left to finish (or be retried) in the background.
+
+        :param names: Iterable of component names. Defaults to every registered component.
+        """
+        to_build = []
+        for name in list(self.specs) if names is None else names:
+            if name not in self.specs:
+                logger.warning(f"Cannot preload unknown {self.component_type}: {name}")
+            elif name not in self.instances and name not in to_build:
+                to_build.append(name)
+
+        if self.max_workers == 1 and self.timeout is None and not any(
+                'load_timeout' in self.specs[name] for name in to_build):
+            for name in to_build:
+                self.get(name)
+            return
+
+        condition = threading.Condition()
+        slots = threading.Semaphore(self.max_workers)
+        started = {}
+        finished = set()
+        released = set()
+
+        def release_slot(name):
+            # Called with the condition held. A slot is freed exactly once per
+            # component: either when its build ends or when it times out.
+            if name not in released:
+                released.add(name)
+                slots.release()
+
+        def worker(name):
+            slots.acquire()
+            with condition:
+                started[name] = time.monotonic()
+                condition.notify_all()
+            try:
+                self.get(name)
+            finally:
+                with condition:
+                    finished.add(name)
+                    release_slot(name)
+                    condition.notify_all()
+
+        for name in to_build:
+            threading.Thread(target=worker, args=(name,), name=f"load-{self.component_type}-{name}", daemon=True).start()
+
+        pending = set(to_build)
+        with condition:
+            while pending:
+                pending -= finished
+                now = time.monotonic()
+                wait_for = None
+                for name in list(pending):
+                    if name not in started:
+                        continue
+                    timeout = self.specs.get(name, {}).get('load_timeout', self.timeout)
+                    if timeout is None:
+                        continue
+                    remaining = started[name] + timeout - now
+                    if remaining <= 0:
+                        logger.error(f"{self.component_type.capitalize()} '{name}' did not load within {timeout}s; "
+                                     f"marking it unavailable.")
+                        pending.discard(name)
+                        self.mark_unavailable(name)
+                        # Free the slot; the stuck build keeps running on its own thread.
+                        release_slot(name)
+                    else:
+                        wait_for = remaining if wait_for is None else min(wait_for, remaining)
+                if pending:
+                    condition.wait(wait_for)
+
+    def status(self):
+        """
+        Return the load state of every registered component.
+
+        :return: Dictionary mapping names to 'loaded', 'unavailable' or 'not_loaded'.
+        """
+        with self._lock:
+            return {
+                name: 'loaded' if name in self.instances else 'unavailable' if name in self.failed else 'not_loaded'
+                for name in self.specs
+            }
+
+    def names(self):
+        """Return the names of all registered components, in configuration order."""
+        return list(self.specs)
+
+    def loaded_names(self):
+        """Return the names of all built components, in configuration order."""
+        return [name for name in self.specs if name in self.instances]
+
+    def is_loaded(self, name):
+        """Return True if the component has already been built."""
+        return name in self.instances
+
+    def __contains__(self, name):
+        return name in self.specs
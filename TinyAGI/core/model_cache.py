@@ -0,0 +1,336 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/core/model_cache.py
+
+import gc
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from ..startup_profiler import current_rss
+from .fork_safety import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+class ModelHandle:
+    """
+    A borrowed reference to a cached model. Release it exactly once when the
+    owner (usually an agent) no longer needs the model.
+
+    Holding a handle does not keep the weights in memory: an idle model can be
+    unloaded to stay within the memory budget and is loaded again on next use.
+    Wrap every call into the model in use() so it cannot be unloaded meanwhile.
+    """
+    def __init__(self, cache, key):
+        self._cache = cache
+        self.key = key
+        self._released = False
+
+    @contextmanager
+    def use(self):
+        """
+        Context manager that yields the model, loading it if it is not resident,
+        and keeps it resident until the block exits.
+        """
+        if self._released:
+            raise RuntimeError(f"Model handle for '{self.key[1]}' has been released.")
+        model = self._cache._checkout(self.key)
+        try:
+            yield model
+        finally:
+            self._cache._checkin(self.key)
+
+    @property
+    def model(self):
+        """The model object, loaded if necessary. Prefer use() for calls that must not race an eviction."""
+        with self.use() as model:
+            return model
+
+    def release(self):
+        """Return the reference to the cache. Calling it more than once has no effect."""
+        if self._released:
+            return
+        self._released = True
+        self._cache._release(self.key)
+
+class ModelCache:
+    """
+    Process-wide cache and residency manager for loaded model weights.
+
+    Every agent that uses the same backend, model and load parameters shares one
+    entry. Entries are reference counted: they are created on the first acquire
+    and freed when the last handle is released. Because a rebuilt agent acquires
+    its model before the agent it replaces is closed, unchanged models survive
+    reloads.
+
+    With a memory budget set, loading a model that would exceed it first unloads
+    the least recently used models that are not in use. Models idle for longer
+    than idle_timeout are unloaded as well. Unloaded models stay registered and
+    are loaded again on their next use.
+    """
+    def __init__(self, budget_bytes=None, idle_timeout=None):
+        """
+        Initialize the ModelCache.
+
+        :param budget_bytes: Maximum total size of resident models. None means unlimited.
+        :param idle_timeout: Seconds after which an unused model is unloaded. None keeps models resident.
+        """
+        self.budget_bytes = budget_bytes
+        self.idle_timeout = None
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._sweeper = None
+        self.configure(budget_bytes=budget_bytes, idle_timeout=idle_timeout)
+        register_after_fork(self)
+
+    def _after_fork(self):
+        """In a forked child: replace the locks, forget checkouts by threads that did not survive, restart the sweeper."""
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        for entry in self._entries.values():
+            entry['active'] = 0
+        self._sweeper = None
+        self.configure(budget_bytes=self.budget_bytes, idle_timeout=self.idle_timeout)
+
+    def configure(self, budget_bytes=None, idle_timeout=None):
+        """
+        Set the memory budget and idle timeout. Resident models over the new budget are unloaded.
+
+        :param budget_bytes: Maximum total size of resident models. None means unlimited.
+        :param idle_timeout: Seconds after which an unused model is unloaded. None keeps models resident.
+        """
+        self.budget_bytes = budget_bytes
+        self.idle_timeout = idle_timeout
+        if idle_timeout and (self._sweeper is None or not self._sweeper.is_alive()):
+            self._sweeper = threading.Thread(target=self._sweep, name='model-cache-sweeper', daemon=True)
+            self._sweeper.start()
+        self._make_room(0)
+
+    @staticmethod
+    def make_key(backend, identity, params=None):
+        """
+        Build the cache key for a model.
+
+        :param backend: Name of the backend (e.g., 'llama_cpp', 'huggingface').
+        :param identity: What identifies the weights (e.g., a model path or model name).
+        :param params: Load parameters that change the loaded object (context size, task, ...).
+        :return: A hashable key.
+        """
+        return (backend, str(identity), json.dumps(params or {}, sort_keys=True, default=str))
+
+    def _lock_for(self, key):
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def acquire(self, backend, identity, loader, params=None, size=None):
+        """
+        Borrow a model, loading it if it is not resident yet.
+
+        :param backend: Name of the backend.
+        :param identity: What identifies the weights.
+        :param loader: Callable taking no arguments that loads and returns the model.
+        :param params: Load parameters, part of the cache key.
+        :param size: Size of the model in bytes, or a callable taking the loaded model and
+                     returning it. Defaults to the growth of the process RSS during loading.
+        :return: A ModelHandle.
+        """
+        key = self.make_key(backend, identity, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    'loader': loader, 'size_fn': size, 'model': None, 'refs': 0, 'active': 0,
+                    # A constant size is known before the first load, so room can be made for it.
+                    'size_bytes': size if size is not None and not callable(size) else 0,
+                    'last_used': time.monotonic(), 'load_count': 0,
+                    'total_load_time_s': 0.0, 'last_load_time_s': None, 'evictions': 0,
+                }
+            entry['refs'] += 1
+            if entry['model'] is not None:
+                logger.debug(f"Reusing cached {backend} model '{identity}' ({entry['refs']} references).")
+        handle = ModelHandle(self, key)
+        try:
+            # Load eagerly so configuration errors surface when the agent is built.
+            with handle.use():
+                pass
+        except Exception:
+            handle.release()
+            raise
+        return handle
+
+    def _checkout(self, key):
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    raise RuntimeError(f"Model '{key[1]}' is not registered in the model cache.")
+                if entry['model'] is not None:
+                    entry['active'] += 1
+                    entry['last_used'] = time.monotonic()
+                    return entry['model']
+            with self._lock_for(key):
+                with self._lock:
+                    if entry['model'] is not None or self._entries.get(key) is not entry:
+                        continue
+                self._load(key, entry)
+
+    def _checkin(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['active'] -= 1
+                entry['last_used'] = time.monotonic()
+
+    def _load(self, key, entry):
+        """Load an entry's model. Must be called with the entry's key lock held."""
+        # The size of a model that was resident before, or given as a constant, is known;
+        # make room for it up front.
+        self._make_room(entry['size_bytes'], exclude=key)
+        logger.info(f"Loading {key[0]} model '{key[1]}'.")
+        rss_before = current_rss()
+        start = time.perf_counter()
+        model = entry['loader']()
+        elapsed = time.perf_counter() - start
+        size_fn = entry['size_fn']
+        if callable(size_fn):
+            size = size_fn(model)
+        elif size_fn is not None:
+            size = size_fn
+        else:
+            size = max(current_rss() - rss_before, 0)
+        with self._lock:
+            entry['model'] = model
+            entry['size_bytes'] = size
+            entry['last_used'] = time.monotonic()
+            entry['load_count'] += 1
+            entry['total_load_time_s'] += elapsed
+            entry['last_load_time_s'] = elapsed
+        logger.info(f"Loaded {key[0]} model '{key[1]}' in {elapsed:.2f}s ({size / (1024 * 1024):.0f} MB).")
+        self._make_room(0, exclude=key)
+
+    def _resident_bytes(self):
+        return sum(e['size_bytes'] for e in self._entries.values() if e['model'] is not None)
+
+    def _make_room(self, needed, exclude=None):
+        """Unload least recently used idle models until needed more bytes fit in the budget."""
+        if self.budget_bytes is None:
+            return
+        while True:
+            with self._lock:
+                if self._resident_bytes() + needed <= self.budget_bytes:
+                    return
+                idle = [
+                    (entry['last_used'], key) for key, entry in self._entries.items()
+                    if key != exclude and entry['model'] is not None and entry['active'] == 0
+                ]
+                if not idle:
+                    logger.warning(
+                        f"Model memory budget of {self.budget_bytes / (1024 * 1024):.0f} MB exceeded, "
+                        f"but every resident model is in use."
+                    )
+                    return
+                _, victim = min(idle)
+                model = self._evict_locked(victim)
+            self._free(victim, model, reason='to stay within the memory budget')
+
+    def _evict_locked(self, key):
+        """Detach a resident model from its entry. Must be called with self._lock held."""
+        entry = self._entries[key]
+        model, entry['model'] = entry['model'], None
+        entry['evictions'] += 1
+        return model
+
+    def unload_idle(self, max_idle=None):
+        """
+        Unload every resident model that is not in use and has been idle for at least max_idle seconds.
+
+        :param max_idle: Idle threshold in seconds. Defaults to the configured idle_timeout, or 0.
+        :return: Number of models unloaded.
+        """
+        max_idle = max_idle if max_idle is not None else (self.idle_timeout or 0)
+        now = time.monotonic()
+        with self._lock:
+            victims = [
+                (key, self._evict_locked(key)) for key, entry in list(self._entries.items())
+                if entry['model'] is not None and entry['active'] == 0 and now - entry['last_used'] >= max_idle
+            ]
+        for key, model in victims:
+            self._free(key, model, reason=f'after {max_idle:.0f}s idle')
+        return len(victims)
+
+    def _sweep(self):
+        while self.idle_timeout:
+            time.sleep(max(1.0, min(self.idle_timeout / 2, 30.0)))
+            try:
+                self.unload_idle()
+            except Exception as e:
+                logger.error(f"Error unloading idle models: {e}")
+
+    def _release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry['refs'] -= 1
+            if entry['refs'] > 0:
+                return
+            del self._entries[key]
+            model = entry['model']
+        if model is not None:
+            self._free(key, model, reason='no agent uses it any more')
+
+    def _free(self, key, model, reason):
+        logger.info(f"Unloading {key[0]} model '{key[1]}' {reason}.")
+        close = getattr(model, 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                logger.error(f"Error closing {key[0]} model '{key[1]}': {e}")
+        del model
+        gc.collect()
+
+    def stats(self):
+        """
+        Return the memory budget and the residency of every registered model.
+
+        :return: Dictionary with 'budget_bytes', 'resident_bytes', 'idle_timeout' and 'models', a list
+                 of dictionaries with 'backend', 'identity', 'params', 'refs', 'active', 'resident',
+                 'size_bytes', 'idle_s', 'load_count', 'total_load_time_s', 'last_load_time_s'
+                 and 'evictions'.
+        """
+        now = time.monotonic()
+        with self._lock:
+            models = [
+                {
+                    'backend': key[0],
+                    'identity': key[1],
+                    'params': json.loads(key[2]),
+                    'refs': entry['refs'],
+                    'active': entry['active'],
+                    'resident': entry['model'] is not None,
+                    'size_bytes': entry['size_bytes'],
+                    'idle_s': now - entry['last_used'] if entry['active'] == 0 else 0.0,
+                    'load_count': entry['load_count'],
+                    'total_load_time_s': entry['total_load_time_s'],
+                    'last_load_time_s': entry['last_load_time_s'],
+                    'evictions': entry['evictions'],
+                }
+                for key, entry in self._entries.items()
+            ]
+            return {
+                'budget_bytes': self.budget_bytes,
+                'resident_bytes': self._resident_bytes(),
+                'idle_timeout': self.idle_timeout,
+                'models': models,
+            }
+
+model_cache = ModelCache()
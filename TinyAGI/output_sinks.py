@@ -0,0 +1,277 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/output_sinks.py
+
+import json
+import logging
+import os
+import threading
+from .task_template import to_text
+
+logger = logging.getLogger(__name__)
+
+class OutputSink:
+    """
+    Destination for one task's output. A finished result is passed to write(); a streamed
+    result is passed chunk by chunk to write_chunk() as the task produces it. close() is
+    called once either way, with the stream's error if it failed, so whatever was
+    written before a failure stays in place.
+    """
+    def __init__(self, task_id, config):
+        """
+        Initialize the sink.
+
+        :param task_id: Id of the task whose output is written.
+        :param config: The sink's entry of the task's 'output' configuration.
+        """
+        self.task_id = task_id
+        self.config = config
+
+    def write(self, data):
+        """Write a finished result."""
+        raise NotImplementedError
+
+    def write_chunk(self, chunk):
+        """Write one chunk of a streamed result."""
+        raise NotImplementedError
+
+    def close(self, error=None):
+        """Finish the output. error is set if the stream failed."""
+
+class ConsoleSink(OutputSink):
+    """Prints results to stdout. Streams are printed whole once they end, so concurrent tasks do not interleave."""
+    def __init__(self, task_id, config=None):
+        super().__init__(task_id, config or {})
+        self._chunks = []
+
+    def write(self, data):
+        print(f"\nTask: {self.task_id} - Response:\n{data}\n")
+
+    def write_chunk(self, chunk):
+        self._chunks.append(str(chunk))
+
+    def close(self, error=None):
+        if self._chunks and error is None:
+            self.write(''.join(self._chunks))
+        self._chunks = []
+
+class _SharedFile:
+    """
+    An append-mode file shared by every sink writing to the same path, so concurrent tasks
+    write whole records and rotation is seen by all of them. With max_bytes, the file is
+    renamed to <path>.1 (shifting older backups up to <path>.<backups>) before a write
+    would take it past that size.
+    """
+    _files = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, path, max_bytes=None, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.users = 0
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    @classmethod
+    def acquire(cls, path, max_bytes=None, backups=3):
+        key = os.path.abspath(path)
+        with cls._registry_lock:
+            shared = cls._files.get(key)
+            if shared is None:
+                shared = cls._files[key] = cls(path, max_bytes, backups)
+            shared.users += 1
+            return shared
+
+    def release(self):
+        with self._registry_lock:
+            self.users -= 1
+            if self.users == 0:
+                self._files.pop(os.path.abspath(self.path), None)
+                with self.lock:
+                    self._file.close()
+
+    def write(self, text):
+        with self.lock:
+            if self.max_bytes and self._file.tell() and self._file.tell() + len(text.encode('utf-8')) > self.max_bytes:
+                self._rotate()
+            self._file.write(text)
+            self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{index}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'a', encoding='utf-8')
+        logger.info(f"Rotated output file '{self.path}'.")
+
+class _FileSink(OutputSink):
+    """Base for sinks that append to a (possibly rotating) file given by 'path'."""
+    default_path = 'output.txt'
+
+    def __init__(self, task_id, config):
+        super().__init__(task_id, config)
+        self._file = _SharedFile.acquire(config.get('path') or config.get('file_path') or self.default_path,
+                                         config.get('max_bytes'), config.get('backups', 3))
+
+    def close(self, error=None):
+        if self._file is not None:
+            self._file.release()
+            self._file = None
+
+class JsonlSink(_FileSink):
+    """
+    Appends JSON Lines records: {"task_id", "output"} for a result, one record with an
+    "index" per item of a list result, and {"task_id", "index", "chunk"} per streamed chunk.
+    A failed stream ends with an {"task_id", "error"} record.
+    """
+    default_path = 'output.jsonl'
+
+    def __init__(self, task_id, config):
+        super().__init__(task_id, config)
+        self._index = 0
+
+    def _record(self, **fields):
+        self._file.write(json.dumps({'task_id': self.task_id, **fields}, ensure_ascii=False, default=str) + '\n')
+
+    def write(self, data):
+        if isinstance(data, list):
+            for index, item in enumerate(data):
+                self._record(index=index, output=item)
+        else:
+            self._record(output=data)
+
+    def write_chunk(self, chunk):
+        self._record(index=self._index, chunk=chunk)
+        self._index += 1
+
+    def close(self, error=None):
+        if error is not None and self._file is not None:
+            self._record(error=str(error))
+        super().close(error)
+
+class TextSink(_FileSink):
+    """Appends plain text: chunks as they arrive, a list result one item per line, anything else as text."""
+    def __init__(self, task_id, config):
+        super().__init__(task_id, config)
+        self._streamed = False
+
+    def write(self, data):
+        items = data if isinstance(data, list) else [data]
+        for item in items:
+            self._file.write(to_text(item) + '\n')
+
+    def write_chunk(self, chunk):
+        self._streamed = True
+        self._file.write(str(chunk))
+
+    def close(self, error=None):
+        if self._streamed and self._file is not None:
+            self._file.write('\n')
+        super().close(error)
+
+class JsonFileSink(OutputSink):
+    """
+    Writes the result as one JSON document to 'file_path' (or 'path'), replacing the file.
+    A streamed result is written as a JSON string, chunk by chunk, so it never has to be
+    held in memory whole. This is the format of 'save_to_file'.
+    """
+    def __init__(self, task_id, config):
+        super().__init__(task_id, config)
+        self.path = config.get('path') or config.get('file_path') or 'output.json'
+        self._file = None
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return open(self.path, 'w', encoding='utf-8')
+
+    def write(self, data):
+        with self._open() as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        logger.info(f"Output saved to '{self.path}'.")
+
+    def write_chunk(self, chunk):
+        if self._file is None:
+            self._file = self._open()
+            self._file.write('"')
+        self._file.write(json.dumps(str(chunk), ensure_ascii=False)[1:-1])
+        self._file.flush()
+
+    def close(self, error=None):
+        if self._file is not None:
+            self._file.write('"')
+            self._file.close()
+            self._file = None
+            logger.info(f"Output saved to '{self.path}'.")
+
+SINKS = {
+    'json': JsonFileSink,
+    'jsonl': JsonlSink,
+    'text': TextSink
+}
+
+def register_sink(name, sink_class):
+    """
+    Make a sink type available to task 'output' configurations.
+
+    :param name: The value of 'sink' that selects it.
+    :param sink_class: An OutputSink subclass, constructed with (task_id, config).
+    """
+    SINKS[name] = sink_class
+
+def create_sinks(task_id, output_config):
+    """
+    Build the sinks of a task's 'output' configuration: one sink entry, or a list of them.
+    An entry names its type with 'sink' ('json', 'jsonl', 'text' or a registered name); the
+    older form {"save_to_file": true, "file_path": ...} is a 'json' sink. Entries that do not
+    write anything (e.g. {"save_to_file": false}) are ignored.
+
+    :param task_id: The task id.
+    :param output_config: The task's 'output' configuration.
+    :return: List of OutputSinks.
+    """
+    entries = output_config if isinstance(output_config, list) else [output_config or {}]
+    sinks = []
+    for entry in entries:
+        name = entry.get('sink') or ('json' if entry.get('save_to_file') else None)
+        if name is None:
+            continue
+        sink_class = SINKS.get(name)
+        if sink_class is None:
+            logger.error(f"Unknown output sink '{name}' for task '{task_id}'.")
+            continue
+        try:
+            sinks.append(sink_class(task_id, entry))
+        except Exception as e:
+            logger.error(f"Error opening output sink '{name}' for task '{task_id}': {e}")
+    return sinks
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
@@ -6,12 +6,18 @@
 # TinyAGI/planner.py
 
 import json
+import logging
+from .task_graph import TaskScheduler, find_cycle
+
+logger = logging.getLogger(__name__)
 
 class Planner:
     def __init__(self, agent_system):
         self.agent_system = agent_system
         self.tasks = []
         self.task_status = {}
+        self._by_id = {}
+        self._scheduler = TaskScheduler({})
 
     def create_plan(self, goal: str):
         """Creates a plan to achieve a goal."""
@@ -44,26 +50,53 @@ Here is an example of a plan:
     }}
 ]"""
         response = self.agent_system.chat(prompt)
-        self.tasks = json.loads(response)
-        for task in self.tasks:
-            self.task_status[task['task_id']] = 'pending'
+        self.set_tasks(json.loads(response))
+
+    def set_tasks(self, tasks: list):
+        """
+        Sets the plan and indexes its dependencies: each task keeps a count of unfinished
+        dependencies, a reverse index lists its dependents, and tasks without dependencies
+        start in the ready queue.
+        """
+        self.tasks = tasks
+        self.task_status = {task['task_id']: 'pending' for task in tasks}
+        self._by_id = {task['task_id']: task for task in tasks}
+        graph = {task['task_id']: set(task.get('dependencies', [])) for task in tasks}
+        known = set(graph)
+        unknown = {task_id: deps - known for task_id, deps in graph.items() if not deps <= known}
+        for task_id in unknown:
+            graph[task_id] &= known
+
+        cycle = find_cycle(graph)
+        if cycle:
+            logger.warning(f"Plan dependencies contain a cycle; these tasks will never run: {' -> '.join(cycle)}")
+        self._scheduler = TaskScheduler(graph, [task['task_id'] for task in tasks])
+        for task_id, deps in unknown.items():
+            logger.warning(f"Task '{task_id}' depends on unknown tasks {sorted(deps)}; marking it as failed.")
+            self.update_task_status(task_id, 'failed')
 
     def get_runnable_tasks(self):
-        """Gets a list of tasks that can be executed in parallel."""
-        runnable_tasks = []
-        for task in self.tasks:
-            if self.task_status[task['task_id']] == 'pending':
-                dependencies_met = True
-                for dep_id in task['dependencies']:
-                    if self.task_status.get(dep_id) != 'completed':
-                        dependencies_met = False
-                        if self.task_status.get(dep_id) == 'failed':
-                            self.update_task_status(task['task_id'], 'failed')
-                        break
-                if dependencies_met:
-                    runnable_tasks.append(task)
-        return runnable_tasks
+        """
+        Gets the tasks whose dependencies have all completed, in plan order. Each task is
+        returned once; report its outcome with update_task_status.
+        """
+        return [self._by_id[task_id] for task_id in self._scheduler.pop_ready()]
 
     def update_task_status(self, task_id: str, status: str):
-        """Updates the status of a task."""
+        """
+        Updates the status of a task. Completing a task releases its dependents; failing
+        it fails every task that depends on it, directly or transitively.
+        """
+        previous = self.task_status.get(task_id)
         self.task_status[task_id] = status
+        if previous in ('completed', 'failed'):
+            return
+        if status == 'completed':
+            self._scheduler.finish(task_id)
+        elif status == 'failed':
+            for dependent in self._scheduler.fail(task_id):
+                self.task_status[dependent] = 'failed'
+
+    def is_finished(self):
+        """Returns True once every task has completed or failed."""
+        return self._scheduler.unfinished == 0
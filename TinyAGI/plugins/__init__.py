@@ -5,23 +5,20 @@
 
 # TinyAGI/plugins/__init__.py
 
-from .base_plugin import BasePlugin
-from .code_formatter import CodeFormatter
-from .generate_references import GenerateReferences
-from .generate_summary import GenerateSummary
-from .generate_tags import GenerateTags
-from .generate_text import GenerateText
-from .plugin_manager import PluginManager  # Added line
+from ..core.lazy_registry import lazy_exports
 
-__all__ = [
-    'BasePlugin',
-    'CodeFormatter',
-    'GenerateReferences',
-    'GenerateSummary',
-    'GenerateTags',
-    'GenerateText',
-    'PluginManager'  # Added line
-]
+_LAZY_EXPORTS = {
+    'BasePlugin': '.base_plugin',
+    'CodeFormatter': '.code_formatter',
+    'GenerateReferences': '.generate_references',
+    'GenerateSummary': '.generate_summary',
+    'GenerateTags': '.generate_tags',
+    'GenerateText': '.generate_text',
+    'PluginManager': '.plugin_manager'
+}
+
+__all__ = list(_LAZY_EXPORTS)
+__getattr__ = lazy_exports(__name__, _LAZY_EXPORTS)
 
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
@@ -5,11 +5,17 @@
 
 # TinyAGI/plugins/base_plugin.py
 
+import asyncio
 import logging
+from ..task_policy import run_in_thread
 
 logger = logging.getLogger(__name__)
 
 class BasePlugin:
+    # Set to True in plugins that can consume upstream TaskStreams chunk by chunk. Other
+    # plugins receive the full text of a streamed upstream result once it has ended.
+    accepts_stream = False
+
     def __init__(self, config):
         """
         Initialize the plugin with its configuration.
@@ -32,6 +38,57 @@ class BasePlugin:
         """
         raise NotImplementedError("Execute method must be implemented by the plugin.")
 
+    async def execute_async(self, agent, tool, input_data, options, stream=False):
+        """
+        Asynchronous counterpart of execute, used by AsyncTaskManager. The default runs
+        execute in a worker thread; I/O-bound plugins should override it to await the agent.
+
+        :param agent: Instance of a model agent to interact with the model backend.
+        :param tool: Instance of a tool (optional).
+        :param input_data: Input data for the plugin.
+        :param options: Dictionary containing additional options.
+        :param stream: Boolean indicating whether to handle streaming responses.
+        :return: Result of the plugin's execution.
+        """
+        return await run_in_thread(self.execute, agent, tool, input_data, options, stream=stream)
+
+    def supports_batch(self, agent):
+        """
+        Whether execute_batch can serve several inputs with one call to this agent. The task
+        manager coalesces ready tasks only when this returns True. The default is False.
+
+        :param agent: Instance of a model agent.
+        :return: True if execute_batch is available for the agent.
+        """
+        return False
+
+    def execute_batch(self, agent, tool, inputs, options):
+        """
+        Execute the plugin for several inputs at once, e.g. with one batched backend call.
+        Batches are never streamed.
+
+        :param agent: Instance of a model agent to interact with the model backend.
+        :param tool: Instance of a tool (optional).
+        :param inputs: List of input data, one per task.
+        :param options: Dictionary containing additional options, shared by the tasks.
+        :return: List of results, in the order of inputs.
+        """
+        raise NotImplementedError("execute_batch method is not implemented by the plugin.")
+
+async def agenerate_text(agent, prompt, stream=False):
+    """
+    Await text generation from any agent: agents with an agenerate_text coroutine are
+    awaited directly, others are called in a worker thread.
+
+    :param agent: Instance of a model agent.
+    :param prompt: The prompt string.
+    :param stream: Boolean indicating whether to stream the response.
+    :return: Generated text or a generator for streaming.
+    """
+    if asyncio.iscoroutinefunction(getattr(agent, 'agenerate_text', None)):
+        return await agent.agenerate_text(prompt, stream=stream)
+    return await run_in_thread(agent.generate_text, prompt, stream=stream)
+
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the "Software"), to deal
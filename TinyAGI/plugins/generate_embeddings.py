@@ -0,0 +1,83 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/plugins/generate_embeddings.py
+
+import asyncio
+import logging
+from .base_plugin import BasePlugin
+from ..task_policy import run_in_thread
+
+logger = logging.getLogger(__name__)
+
+class GenerateEmbeddings(BasePlugin):
+    def execute(self, agent, tool, input_data, options, stream=False):
+        """
+        Embed the input text.
+
+        :param agent: Instance of a model agent implementing embed.
+        :param tool: Not used.
+        :param input_data: Dictionary containing the 'text' to embed.
+        :param options: Dictionary containing additional options.
+        :param stream: Not used; embeddings are never streamed.
+        :return: The embedding vector.
+        :raises RuntimeError: If the agent returned no embedding.
+        """
+        text = input_data.get('text', '')
+        if getattr(agent, 'supports_batch_embedding', False) is True:
+            # Batch-capable agents return one vector per input, also for a single text.
+            embedding = _first(agent, agent.embed([text]))
+        else:
+            embedding = _checked(agent, agent.embed(text))
+        logger.info("Generated embedding using GenerateEmbeddings plugin.")
+        return embedding
+
+    async def execute_async(self, agent, tool, input_data, options, stream=False):
+        """Asynchronous version of execute. Agents with an aembed coroutine are awaited directly."""
+        if not asyncio.iscoroutinefunction(getattr(agent, 'aembed', None)):
+            return await run_in_thread(self.execute, agent, tool, input_data, options)
+        text = input_data.get('text', '')
+        if getattr(agent, 'supports_batch_embedding', False) is True:
+            embedding = _first(agent, await agent.aembed([text]))
+        else:
+            embedding = _checked(agent, await agent.aembed(text))
+        logger.info("Generated embedding using GenerateEmbeddings plugin.")
+        return embedding
+
+    def supports_batch(self, agent):
+        return getattr(agent, 'supports_batch_embedding', False) is True
+
+    def execute_batch(self, agent, tool, inputs, options):
+        texts = [input_data.get('text', '') for input_data in inputs]
+        embeddings = agent.embed(texts)
+        if embeddings is None or len(embeddings) != len(texts):
+            raise RuntimeError(f"{type(agent).__name__} did not return one embedding per text.")
+        logger.info(f"Generated {len(texts)} embeddings using GenerateEmbeddings plugin.")
+        return embeddings
+
+def _checked(agent, embedding):
+    # Agents log the provider's error and return an empty result instead of raising.
+    if embedding is None or len(embedding) == 0:
+        raise RuntimeError(f"{type(agent).__name__} returned no embedding; see its log for the provider error.")
+    return embedding
+
+def _first(agent, embeddings):
+    return _checked(agent, _checked(agent, embeddings)[0])
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
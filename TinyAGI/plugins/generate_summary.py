@@ -6,7 +6,7 @@
 # TinyAGI/plugins/generate_summary.py
 
 import logging
-from .base_plugin import BasePlugin
+from .base_plugin import BasePlugin, agenerate_text
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +22,22 @@ class GenerateSummary(BasePlugin):
         logger.info("Generated summary using GenerateSummary plugin.")
         return response
 
+    async def execute_async(self, agent, tool, input_data, options, stream=False):
+        text = input_data.get('text', '')
+        prompt = self.prompt_template.format(text=text)
+        response = await agenerate_text(agent, prompt, stream=stream)
+        logger.info("Generated summary using GenerateSummary plugin.")
+        return response
+
+    def supports_batch(self, agent):
+        return getattr(agent, 'supports_batch_generation', False) is True
+
+    def execute_batch(self, agent, tool, inputs, options):
+        prompts = [self.prompt_template.format(text=input_data.get('text', '')) for input_data in inputs]
+        responses = agent.generate_batch(prompts)
+        logger.info(f"Generated {len(prompts)} summaries using GenerateSummary plugin.")
+        return responses
+
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the "Software"), to deal
@@ -6,24 +6,40 @@
 # TinyAGI/plugins/generate_tags.py
 
 import logging
+import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from .base_plugin import BasePlugin
+from ..resource_manager import nltk_resources
+from ..task_stream import TaskStream
 
 logger = logging.getLogger(__name__)
 
 class GenerateTags(BasePlugin):
+    # Tags are counted incrementally, so an upstream stream is read as it is generated.
+    accepts_stream = True
+
     def __init__(self, config):
         super().__init__(config)
-        self.stopwords = set(stopwords.words('english'))
+        # NLTK data is resolved on first use so constructing the plugin never touches disk or network.
+        self.stopwords = None
         self.max_tags = self.config.get('max_tags', 10)
+        # Seconds to wait for a background download of missing NLTK data before failing the task.
+        self.resource_timeout = self.config.get('resource_timeout', 30)
+
+    def _load_resources(self):
+        if self.stopwords is None:
+            nltk_resources.require(timeout=self.resource_timeout)
+            self.stopwords = set(stopwords.words('english'))
 
     def execute(self, agent, tool, input_data, options, stream=False):
         text = input_data.get('text', '')
         try:
-            tokens = word_tokenize(text)
-            filtered_tokens = [word.lower() for word in tokens if word.lower() not in self.stopwords and word.isalpha()]
-            freq_dist = nltk.FreqDist(filtered_tokens)
+            self._load_resources()
+            freq_dist = nltk.FreqDist()
+            for segment in self._segments(text):
+                tokens = word_tokenize(segment)
+                freq_dist.update(word.lower() for word in tokens if word.lower() not in self.stopwords and word.isalpha())
             tags = [word for word, freq in freq_dist.most_common(self.max_tags)]
             logger.info("Generated tags using GenerateTags plugin.")
             return tags
@@ -31,6 +47,24 @@ class GenerateTags(BasePlugin):
             logger.error(f"Error generating tags: {e}")
             return []
 
+    @staticmethod
+    def _segments(text):
+        """
+        Yield the text in pieces that end on whitespace. A TaskStream is split as its chunks
+        arrive, holding back a trailing partial word until the next chunk completes it.
+        """
+        if not isinstance(text, TaskStream):
+            yield str(text)
+            return
+        pending = ''
+        for chunk in text:
+            pending += str(chunk)
+            cut = max(pending.rfind(' '), pending.rfind('\n'))
+            if cut > 0:
+                yield pending[:cut]
+                pending = pending[cut:]
+        yield pending
+
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the "Software"), to deal
@@ -5,8 +5,9 @@
 
 # TinyAGI/plugins/generate_text.py
 
+import asyncio
 import logging
-from .base_plugin import BasePlugin
+from .base_plugin import BasePlugin, agenerate_text
 
 logger = logging.getLogger(__name__)
 
@@ -26,21 +27,60 @@ class GenerateText(BasePlugin):
         :param stream: Boolean indicating whether to handle streaming responses.
         :return: Generated text.
         """
+        prompt = self._build_prompt(tool, input_data)
+        if prompt is None:
+            return "No prompt provided."
+
+        response = agent.generate_text(prompt, stream=stream)
+        logger.info("Generated text using GenerateText plugin.")
+        return response
+
+    async def execute_async(self, agent, tool, input_data, options, stream=False):
+        """
+        Asynchronous version of execute. The tool lookup runs in a worker thread and the
+        agent call is awaited.
+        """
+        prompt = await asyncio.to_thread(self._build_prompt, tool, input_data)
+        if prompt is None:
+            return "No prompt provided."
+
+        response = await agenerate_text(agent, prompt, stream=stream)
+        logger.info("Generated text using GenerateText plugin.")
+        return response
+
+    def supports_batch(self, agent):
+        return getattr(agent, 'supports_batch_generation', False) is True
+
+    def execute_batch(self, agent, tool, inputs, options):
+        """
+        Generate text for several prompts with one batched agent call. Inputs without a
+        prompt get the same message as execute.
+
+        :param agent: Instance of a model agent with supports_batch_generation.
+        :param tool: Instance of a tool (optional).
+        :param inputs: List of dictionaries containing the prompts.
+        :param options: Dictionary containing additional options.
+        :return: List of generated texts, in the order of inputs.
+        """
+        prompts = [self._build_prompt(tool, input_data) for input_data in inputs]
+        generated = iter(agent.generate_batch([prompt for prompt in prompts if prompt is not None]))
+        logger.info(f"Generated {len(prompts)} texts using GenerateText plugin.")
+        return ["No prompt provided." if prompt is None else next(generated) for prompt in prompts]
+
+    def _build_prompt(self, tool, input_data):
+        """Format the prompt and append the tool's information. Returns None if the prompt is empty."""
         prompt = self.prompt_template.format(prompt=input_data.get('prompt', ''))
         
         if not prompt.strip():
             logger.error("No prompt provided for GenerateText plugin.")
-            return "No prompt provided."
+            return None
 
         # Optionally use the tool to enhance the prompt or fetch additional data
         if tool:
             additional_info = tool.get_page_summary(prompt)
             if additional_info:
                 prompt += f"\n\nAdditional Information:\n{additional_info}"
-
-        response = agent.generate_text(prompt, stream=stream)
-        logger.info("Generated text using GenerateText plugin.")
-        return response
+        return prompt
 
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
@@ -10,20 +10,31 @@ import importlib
 import os
 import git  # Requires gitpython
 import sys
+from ..core.lazy_registry import LazyRegistry
 
 logger = logging.getLogger(__name__)
 
 class PluginManager:
-    def __init__(self, plugins_config, base_path=None):
+    def __init__(self, plugins_config, base_path=None, lazy=False, profiler=None, load_options=None,
+                 instances=None):
         """
         Initialize the PluginManager with the provided plugins configuration.
 
         :param plugins_config: List of plugin configurations from the JSON config
         :param base_path: The base path for resolving local modules.
+        :param lazy: If True, plugins are only imported and constructed on their first get_plugin call.
+        :param profiler: Optional StartupProfiler that records how long each plugin takes to build.
+        :param load_options: Optional LazyRegistry settings for building plugins (max_workers, timeout, retries, retry_delay).
+        :param instances: Already-built plugins to adopt by name instead of constructing them again.
         """
         self.plugins_config = plugins_config
         self.base_path = base_path or os.path.dirname(__file__)
-        self.loaded_plugins = self.load_plugins()
+        self.lazy = lazy
+        self.registry = LazyRegistry('plugin', plugins_config, self.load_plugin, profiler=profiler,
+                                     **(load_options or {}), instances=instances)
+        self.loaded_plugins = self.registry.instances
+        if not lazy:
+            self.load_plugins()
 
     def load_plugins(self):
         """
@@ -31,35 +42,42 @@ class PluginManager:
 
         :return: Dictionary of loaded plugin instances keyed by plugin name
         """
-        loaded_plugins = {}
-        for plugin_info in self.plugins_config:
-            name = plugin_info.get('name')
-            module_name = plugin_info.get('module')
-            source = plugin_info.get('source', 'local')
-            config = plugin_info.get('config', {})
+        self.registry.preload()
+        logger.debug(f"All loaded plugins: {list(self.loaded_plugins.keys())}")
+        return self.loaded_plugins
 
-            logger.info(f"Loading plugin '{name}' from module '{module_name}' with source '{source}'.")
+    def load_plugin(self, plugin_info):
+        """
+        Import and construct a single plugin.
 
-            if source == 'github':
-                repo_url = plugin_info.get('repo_url')
-                if not repo_url:
-                    logger.error(f"Repo URL not provided for plugin '{name}'. Skipping.")
-                    continue
-                self.load_plugin_from_github(module_name, repo_url)
+        :param plugin_info: Dictionary containing plugin configuration
+        :return: Plugin instance or None if it could not be loaded
+        """
+        name = plugin_info.get('name')
+        module_name = plugin_info.get('module')
+        source = plugin_info.get('source', 'local')
+        config = plugin_info.get('config', {})
 
-            try:
-                module = importlib.import_module(f'TinyAGI.plugins.{module_name}')
-                plugin_class = getattr(module, name)
-                plugin_instance = plugin_class(config)
-                loaded_plugins[name] = plugin_instance
-                logger.info(f"Successfully loaded plugin: {name}")
-            except AttributeError:
-                logger.error(f"Plugin class '{name}' not found in module '{module_name}'.")
-            except Exception as e:
-                logger.error(f"Failed to load plugin '{name}': {e}", exc_info=True)
+        logger.info(f"Loading plugin '{name}' from module '{module_name}' with source '{source}'.")
+
+        if source == 'github':
+            repo_url = plugin_info.get('repo_url')
+            if not repo_url:
+                logger.error(f"Repo URL not provided for plugin '{name}'. Skipping.")
+                return None
+            self.load_plugin_from_github(module_name, repo_url)
 
-        logger.debug(f"All loaded plugins: {list(loaded_plugins.keys())}")
-        return loaded_plugins
+        try:
+            module = importlib.import_module(f'TinyAGI.plugins.{module_name}')
+            plugin_class = getattr(module, name)
+            plugin_instance = plugin_class(config)
+            logger.info(f"Successfully loaded plugin: {name}")
+            return plugin_instance
+        except AttributeError:
+            logger.error(f"Plugin class '{name}' not found in module '{module_name}'.")
+        except Exception as e:
+            logger.error(f"Failed to load plugin '{name}': {e}", exc_info=True)
+        return None
 
     def load_plugin_from_github(self, module_name, repo_url):
         """
@@ -83,12 +101,24 @@ class PluginManager:
 
     def get_plugin(self, plugin_name):
         """
-        Retrieve a loaded plugin by its name.
+        Retrieve a plugin by its name, loading it first if it has not been built yet.
 
         :param plugin_name: Name of the plugin
         :return: Plugin instance or None if not found
         """
-        return self.loaded_plugins.get(plugin_name)
+        return self.registry.get(plugin_name)
+
+    def get_plugin_names(self):
+        """
+        Retrieve the names of the plugins.
+        In lazy mode these are all configured plugins, whether built yet or not; otherwise
+        only the plugins that loaded successfully.
+
+        :return: List of plugin names
+        """
+        if self.lazy:
+            return self.registry.names()
+        return self.registry.loaded_names()
 
     def add_plugin(self, plugin_info):
         """
@@ -98,27 +128,11 @@ class PluginManager:
         """
         self.plugins_config.append(plugin_info)
         plugin_name = plugin_info.get('name')
-        module_name = plugin_info.get('module')
-        source = plugin_info.get('source', 'local')
-        config = plugin_info.get('config', {})
-
-        if source == 'github':
-            repo_url = plugin_info.get('repo_url')
-            if not repo_url:
-                logger.error(f"Repo URL not provided for plugin '{plugin_name}'. Cannot add plugin.")
-                return
-            self.load_plugin_from_github(module_name, repo_url)
-
-        try:
-            module = importlib.import_module(f'TinyAGI.plugins.{module_name}')
-            plugin_class = getattr(module, plugin_name)
-            plugin_instance = plugin_class(config)
-            self.loaded_plugins[plugin_name] = plugin_instance
+        self.registry.register(plugin_info)
+        if self.lazy:
+            logger.info(f"Registered new plugin: {plugin_name}")
+        elif self.registry.get(plugin_name) is not None:
             logger.info(f"Added and loaded new plugin: {plugin_name}")
-        except AttributeError:
-            logger.error(f"Plugin class '{plugin_name}' not found in module '{module_name}'.")
-        except Exception as e:
-            logger.error(f"Failed to add plugin '{plugin_name}': {e}", exc_info=True)
 
     def remove_plugin(self, plugin_name):
         """
@@ -126,8 +140,8 @@ class PluginManager:
 
         :param plugin_name: Name of the plugin to remove
         """
-        if plugin_name in self.loaded_plugins:
-            del self.loaded_plugins[plugin_name]
+        if plugin_name in self.registry:
+            self.registry.unregister(plugin_name)
             logger.info(f"Removed plugin: {plugin_name}")
         else:
             logger.warning(f"Attempted to remove non-existent plugin: {plugin_name}")
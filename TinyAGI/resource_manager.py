@@ -0,0 +1,217 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/resource_manager.py
+
+import json
+import logging
+import os
+import threading
+import time
+from .core.fork_safety import register_after_fork
+
+logger = logging.getLogger(__name__)
+
+# Resource id -> path used by nltk.data.find.
+NLTK_RESOURCES = {
+    'punkt': 'tokenizers/punkt',
+    'punkt_tab': 'tokenizers/punkt_tab',
+    'stopwords': 'corpora/stopwords',
+}
+
+MARKER_FILE = 'tinyagi_resources.json'
+
+def punkt_resource():
+    """Return the Punkt resource id that word_tokenize loads on the installed NLTK."""
+    import nltk
+    version = tuple(int(part) for part in nltk.__version__.split('.')[:3] if part.isdigit())
+    return 'punkt_tab' if version >= (3, 8, 2) else 'punkt'
+
+class NLTKResourceManager:
+    """
+    Offline-first provisioning of NLTK data.
+
+    Resources are looked up in the local NLTK data paths first. Nothing is
+    downloaded unless a resource is missing, and then only from a background
+    thread (prefetch) or through an explicit pull (`tinyagi resources pull`).
+    Set TINYAGI_OFFLINE=1 to disable background downloads entirely.
+    """
+    def __init__(self, resources=None, download_dir=None):
+        """
+        Initialize the NLTKResourceManager.
+
+        :param resources: Resource ids managed by default. Defaults to the Punkt tokenizer and stopwords.
+        :param download_dir: Directory downloads and the version marker go to. Defaults to $NLTK_DATA or ~/nltk_data.
+        """
+        self._resources = list(resources) if resources else None
+        self.download_dir = download_dir or os.getenv('NLTK_DATA') or os.path.expanduser(os.path.join('~', 'nltk_data'))
+        self._lock = threading.Lock()
+        self._available = set()
+        self._background = None
+        register_after_fork(self)
+
+    def _after_fork(self):
+        """In a forked child: replace the lock and drop the parent's download thread, which did not survive."""
+        self._lock = threading.Lock()
+        self._background = None
+
+    @property
+    def resources(self):
+        if self._resources is None:
+            self._resources = [punkt_resource(), 'stopwords']
+        return self._resources
+
+    @property
+    def marker_path(self):
+        return os.path.join(self.download_dir, MARKER_FILE)
+
+    def _nltk_version(self):
+        import nltk
+        return nltk.__version__
+
+    def _read_marker(self):
+        try:
+            with open(self.marker_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_marker(self, names):
+        marker = self._read_marker()
+        if marker.get('nltk_version') != self._nltk_version():
+            marker = {}
+        marker['nltk_version'] = self._nltk_version()
+        marker['resources'] = sorted(set(marker.get('resources', [])) | set(names))
+        marker['updated_at'] = time.time()
+        try:
+            os.makedirs(self.download_dir, exist_ok=True)
+            with open(self.marker_path, 'w', encoding='utf-8') as f:
+                json.dump(marker, f, indent=2)
+        except OSError as e:
+            logger.debug(f"Could not write NLTK resource marker '{self.marker_path}': {e}")
+
+    def _register_data_path(self):
+        import nltk
+        if self.download_dir not in nltk.data.path:
+            nltk.data.path.append(self.download_dir)
+
+    def _find_locally(self, name):
+        import nltk
+        try:
+            nltk.data.find(NLTK_RESOURCES.get(name, name))
+            return True
+        except LookupError:
+            return False
+
+    def missing(self, names=None):
+        """
+        Return the resources that are not available locally. Never touches the network.
+
+        :param names: Resource ids to check. Defaults to the managed resources.
+        :return: List of missing resource ids.
+        """
+        names = list(names or self.resources)
+        self._register_data_path()
+        pending = [name for name in names if name not in self._available]
+        if not pending:
+            return []
+
+        marker = self._read_marker()
+        if marker.get('nltk_version') == self._nltk_version() and set(pending) <= set(marker.get('resources', [])):
+            with self._lock:
+                self._available.update(pending)
+            return []
+
+        missing = [name for name in pending if not self._find_locally(name)]
+        found = [name for name in pending if name not in missing]
+        if found:
+            with self._lock:
+                self._available.update(found)
+            self._write_marker(found)
+        return missing
+
+    def pull(self, names=None, force=False):
+        """
+        Download resources that are missing (or all of them when force is True).
+
+        :param names: Resource ids to download. Defaults to the managed resources.
+        :param force: Re-download resources even if they are present locally.
+        :return: List of resource ids that could not be downloaded.
+        """
+        import nltk
+        names = list(names or self.resources)
+        to_fetch = names if force else self.missing(names)
+        failed = []
+        for name in to_fetch:
+            logger.info(f"Downloading NLTK resource '{name}' to '{self.download_dir}'.")
+            try:
+                ok = nltk.download(name, download_dir=self.download_dir, quiet=True)
+            except Exception as e:
+                logger.error(f"Error downloading NLTK resource '{name}': {e}")
+                ok = False
+            if ok:
+                with self._lock:
+                    self._available.add(name)
+            else:
+                failed.append(name)
+        fetched = [name for name in to_fetch if name not in failed]
+        if fetched:
+            self._write_marker(fetched)
+        return failed
+
+    def prefetch(self, names=None):
+        """
+        Start a background download of any missing resources. Returns immediately.
+
+        :param names: Resource ids to prefetch. Defaults to the managed resources.
+        :return: The background thread, or None if nothing needs to be fetched.
+        """
+        names = list(names or self.resources)
+        if not self.missing(names):
+            return None
+        if os.getenv('TINYAGI_OFFLINE', '').lower() in ('1', 'true', 'yes'):
+            logger.warning(f"NLTK resources {self.missing(names)} are missing and TINYAGI_OFFLINE is set. "
+                           "Run 'tinyagi resources pull' to install them.")
+            return None
+        with self._lock:
+            if self._background is None or not self._background.is_alive():
+                self._background = threading.Thread(
+                    target=self.pull, args=(names,), name='nltk-resource-prefetch', daemon=True
+                )
+                self._background.start()
+            return self._background
+
+    def require(self, names=None, timeout=None):
+        """
+        Ensure resources are available before they are used, waiting for a running
+        background download if there is one.
+
+        :param names: Resource ids that are needed. Defaults to the managed resources.
+        :param timeout: Maximum seconds to wait for a background download.
+        :raises LookupError: If any resource is still missing.
+        """
+        missing = self.missing(names)
+        if not missing:
+            return
+        background = self.prefetch(missing)
+        if background is not None:
+            background.join(timeout)
+            missing = self.missing(missing)
+        if missing:
+            raise LookupError(
+                f"NLTK resources {missing} are not installed. Run 'tinyagi resources pull' to download them."
+            )
+
+    def status(self, names=None):
+        """
+        Return a dictionary mapping each resource id to whether it is available locally.
+
+        :param names: Resource ids to report. Defaults to the managed resources.
+        """
+        names = list(names or self.resources)
+        missing = set(self.missing(names))
+        return {name: name not in missing for name in names}
+
+nltk_resources = NLTKResourceManager()
@@ -0,0 +1,187 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/result_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def cache_key(*parts):
+    """
+    Compute a content hash for the given JSON-like values.
+
+    :param parts: Values to hash. Dictionaries are hashed independently of key order.
+    :return: Hex SHA-256 digest.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResultCache:
+    """
+    Persistent, content-addressed store for task results, kept in a SQLite file.
+
+    Entries are keyed by a hash of everything that determines a task's output (see
+    TaskManager), so a change anywhere upstream produces a new key and the stale
+    entry is simply never read again. When the store exceeds max_bytes or
+    max_entries, the least recently used entries are evicted.
+    """
+    def __init__(self, path, max_bytes=None, max_entries=None):
+        """
+        Initialize the ResultCache. The database is opened on first use.
+
+        :param path: Path of the SQLite file. Parent directories are created as needed.
+        :param max_bytes: Maximum total size of the stored results in bytes. None means no limit.
+        :param max_entries: Maximum number of stored results. None means no limit.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._conn = None
+        self._lock = threading.Lock()
+        self._last_access = 0.0
+
+    def _connection(self):
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, task_id TEXT, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            self._conn = conn
+        return self._conn
+
+    def _now(self):
+        # Strictly increasing within the process, so LRU order holds even with a coarse clock.
+        self._last_access = max(time.time(), self._last_access + 1e-6)
+        return self._last_access
+
+    def get(self, key):
+        """
+        Look a result up.
+
+        :param key: The cache key.
+        :return: Tuple of (found, value).
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (self._now(), key))
+            self.hits += 1
+        return True, json.loads(row[0])
+
+    def put(self, key, value, task_id=None):
+        """
+        Store a result, evicting older entries if the cache grows past its limits.
+
+        :param key: The cache key.
+        :param value: The result. Only JSON-serializable results are stored.
+        :param task_id: Optional task id, kept for inspection.
+        :return: True if the result was stored.
+        """
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            logger.debug(f"Result of task '{task_id}' is not JSON-serializable; not caching it.")
+            return False
+        size = len(payload.encode('utf-8'))
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"Result of task '{task_id}' is larger than the cache; not caching it.")
+            return False
+
+        with self._lock:
+            conn = self._connection()
+            now = self._now()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, task_id, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, task_id, payload, size, now, now)
+            )
+            self.writes += 1
+            self._evict(conn)
+        return True
+
+    def _evict(self, conn):
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        excess_entries = entries - self.max_entries if self.max_entries is not None else 0
+        excess_bytes = total - self.max_bytes if self.max_bytes is not None else 0
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            victims.append((key,))
+            excess_entries -= 1
+            excess_bytes -= size
+        conn.executemany("DELETE FROM results WHERE key = ?", victims)
+        self.evictions += len(victims)
+        logger.info(f"Evicted {len(victims)} cached task results.")
+
+    def clear(self):
+        """Remove every stored result."""
+        with self._lock:
+            self._connection().execute("DELETE FROM results")
+
+    def stats(self):
+        """
+        Report the cache's size and how it was used by this process.
+
+        :return: Dictionary with entries, bytes, limits and hit/miss/write/eviction counts.
+        """
+        with self._lock:
+            entries, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {
+            'path': self.path,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions
+        }
+
+    def close(self):
+        """Close the database connection. It is reopened on next use."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
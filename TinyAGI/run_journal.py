@@ -0,0 +1,197 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/run_journal.py
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Task states recorded in the journal. Events with no task id describe the run itself.
+STARTED, SUCCEEDED, FAILED, CANCELLED = 'started', 'succeeded', 'failed', 'cancelled'
+# A task that succeeded with an output the journal could not store; it runs again on resume.
+SUCCEEDED_UNSTORED = 'succeeded_unstored'
+RUN_STARTED, RUN_RESUMED, RUN_FINISHED = 'run_started', 'run_resumed', 'run_finished'
+
+class RunJournal:
+    """
+    Append-only log of task runs, kept in a SQLite file.
+
+    Every state change of a task (started, succeeded, failed, cancelled) is one row,
+    written in its own transaction as it happens, so the journal of a run that
+    crashed holds every task that finished before the crash. A successful task's
+    row stores its output (when it is JSON-serializable) and a fingerprint of the
+    task configuration, which is what a resumed run restores. Rows are never
+    updated or deleted; the latest row of a task is its state.
+    """
+    def __init__(self, path):
+        """
+        Initialize the RunJournal. The database is opened on first use.
+
+        :param path: Path of the SQLite file. Parent directories are created as needed.
+        """
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Commits survive a crash of the process without an fsync each; only a power loss
+            # can drop the last few events.
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT, run_id TEXT NOT NULL, task_id TEXT,"
+                " state TEXT NOT NULL, output TEXT, fingerprint TEXT, time REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS events_run ON events (run_id, seq)")
+            self._conn = conn
+        return self._conn
+
+    def _append(self, run_id, task_id, state, output=None, fingerprint=None):
+        with self._lock:
+            self._connection().execute(
+                "INSERT INTO events (run_id, task_id, state, output, fingerprint, time) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, task_id, state, output, fingerprint, time.time())
+            )
+
+    def start_run(self, resume=None):
+        """
+        Begin a new run, or continue an earlier one.
+
+        :param resume: Id of the run to continue. None starts a new run.
+        :return: The run id.
+        :raises KeyError: If the run to resume is not in the journal.
+        """
+        if resume is not None:
+            if not self.exists(resume):
+                raise KeyError(f"Run '{resume}' is not in the journal at {self.path}.")
+            self._append(resume, None, RUN_RESUMED)
+            return resume
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._append(run_id, None, RUN_STARTED)
+        return run_id
+
+    def finish_run(self, run_id, succeeded, total):
+        """
+        Record the end of a run.
+
+        :param run_id: The run id.
+        :param succeeded: Number of tasks that have succeeded in the run so far.
+        :param total: Number of tasks in the run.
+        """
+        self._append(run_id, None, RUN_FINISHED, json.dumps({'succeeded': succeeded, 'total': total}))
+
+    def record(self, run_id, task_id, state, output=None, fingerprint=None):
+        """
+        Append a task state change.
+
+        :param run_id: The run id.
+        :param task_id: The task id.
+        :param state: One of STARTED, SUCCEEDED, FAILED or CANCELLED.
+        :param output: The task's output, for SUCCEEDED. Outputs that are not JSON-serializable
+                       are not stored, and the task runs again when the run is resumed.
+        :param fingerprint: Fingerprint of the task configuration, for SUCCEEDED.
+        """
+        payload = None
+        if state == SUCCEEDED:
+            try:
+                payload = json.dumps(output, ensure_ascii=False)
+            except (TypeError, ValueError):
+                logger.warning(f"Output of task '{task_id}' is not JSON-serializable; "
+                               f"it will run again if run '{run_id}' is resumed.")
+                state, fingerprint = SUCCEEDED_UNSTORED, None
+        self._append(run_id, task_id, state, payload, fingerprint)
+
+    def exists(self, run_id):
+        """Return True if the journal has events for the run."""
+        with self._lock:
+            row = self._connection().execute("SELECT 1 FROM events WHERE run_id = ? LIMIT 1", (run_id,)).fetchone()
+        return row is not None
+
+    def completed(self, run_id):
+        """
+        Collect the tasks whose latest state in a run is SUCCEEDED.
+
+        :param run_id: The run id.
+        :return: Dictionary mapping task id to a tuple of (output, fingerprint).
+        """
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT task_id, state, output, fingerprint FROM events"
+                " WHERE run_id = ? AND task_id IS NOT NULL ORDER BY seq", (run_id,)
+            ).fetchall()
+        latest = {}
+        for task_id, state, output, fingerprint in rows:
+            latest[task_id] = (state, output, fingerprint)
+        return {task_id: (json.loads(output), fingerprint)
+                for task_id, (state, output, fingerprint) in latest.items() if state == SUCCEEDED}
+
+    def runs(self, limit=20):
+        """
+        Summarize the most recent runs.
+
+        :param limit: Maximum number of runs to list.
+        :return: List of dictionaries with run_id, started, updated, succeeded, failed and
+                 finished (False for runs that are still going or were interrupted), newest first.
+        """
+        with self._lock:
+            conn = self._connection()
+            runs = conn.execute(
+                "SELECT run_id, MIN(time), MAX(time), MAX(seq) FROM events GROUP BY run_id"
+                " ORDER BY MAX(seq) DESC LIMIT ?", (limit,)
+            ).fetchall()
+            summaries = []
+            for run_id, started, updated, last in runs:
+                states = {}
+                finished = False
+                for task_id, state in conn.execute(
+                        "SELECT task_id, state FROM events WHERE run_id = ? ORDER BY seq", (run_id,)):
+                    if task_id is None:
+                        finished = state == RUN_FINISHED
+                    else:
+                        states[task_id] = state
+                summaries.append({
+                    'run_id': run_id,
+                    'started': started,
+                    'updated': updated,
+                    'succeeded': sum(1 for s in states.values() if s in (SUCCEEDED, SUCCEEDED_UNSTORED)),
+                    'failed': sum(1 for s in states.values() if s in (FAILED, CANCELLED)),
+                    'finished': finished
+                })
+        return summaries
+
+    def close(self):
+        """Close the database connection. It is reopened on next use."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
@@ -7,20 +7,121 @@
 
 import argparse
 import sys
+import time
 import logging
 from ..agent import AgentSystem
 from ..utils import setup_logging
+from ..resource_manager import NLTKResourceManager
 from ..cli.ui import run_cli_ui
 
 logger = logging.getLogger(__name__)
 
+def handle_startup_report(args):
+    """Builds the AgentSystem with startup profiling enabled and prints the report."""
+    setup_logging()
+    config_file = args.config if args.config else 'config/agent_config.json'
+
+    try:
+        agent_system = AgentSystem(config_files=config_file, lazy_loading=args.lazy or None, profile_startup=True)
+    except ValueError as e:
+        logger.error(f"Failed to initialize AgentSystem: {e}")
+        sys.exit(1)
+
+    print(agent_system.profiler.format_table())
+    if args.json:
+        agent_system.profiler.to_json(args.json)
+
+def handle_resources(args):
+    """Reports on or downloads the NLTK data used by plugins."""
+    setup_logging()
+    manager = NLTKResourceManager(resources=args.names or None, download_dir=args.dir)
+
+    if args.action == 'pull':
+        failed = manager.pull(force=args.force)
+        if failed:
+            logger.error(f"Failed to download NLTK resources: {failed}")
+            sys.exit(1)
+
+    for name, available in manager.status().items():
+        print(f"{name}: {'installed' if available else 'missing'}")
+
+def handle_cache(args):
+    """Shows or clears the task result cache."""
+    setup_logging()
+    config_file = args.config if args.config else 'config/agent_config.json'
+
+    try:
+        agent_system = AgentSystem(config_files=config_file, lazy_loading=True)
+    except ValueError as e:
+        logger.error(f"Failed to initialize AgentSystem: {e}")
+        sys.exit(1)
+
+    cache = agent_system.result_cache
+    if cache is None:
+        print("Task result caching is disabled; set 'task_cache' in the config to enable it.")
+        return
+    if args.action == 'clear':
+        cache.clear()
+    for key, value in cache.stats().items():
+        print(f"{key}: {value}")
+
+def handle_runs(args):
+    """Lists the most recent journaled task runs."""
+    setup_logging()
+    config_file = args.config if args.config else 'config/agent_config.json'
+
+    try:
+        agent_system = AgentSystem(config_files=config_file, lazy_loading=True)
+    except ValueError as e:
+        logger.error(f"Failed to initialize AgentSystem: {e}")
+        sys.exit(1)
+
+    journal = agent_system.journal
+    if journal is None:
+        print("Run journaling is disabled; set 'run_journal' in the config to enable it.")
+        return
+    for run in journal.runs(limit=args.limit):
+        started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started']))
+        status = 'finished' if run['finished'] else 'interrupted'
+        print(f"{run['run_id']}  {started}  {status}  {run['succeeded']} succeeded, {run['failed']} failed")
+
+def handle_serve(args):
+    """Runs the web server with pre-forked worker processes."""
+    from .server_manager import serve
+    serve(
+        config_files=args.config if args.config else 'config/agent_config.json',
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        preload=args.preload,
+        max_requests=args.max_requests,
+        graceful_timeout=args.graceful_timeout
+    )
+
 def handle_direct_command(args):
     """Handles direct command execution from the command line."""
+    if args.command == 'serve':
+        handle_serve(args)
+        return
+    if args.command == 'startup-report':
+        handle_startup_report(args)
+        return
+    if args.command == 'resources':
+        handle_resources(args)
+        return
+    if args.command == 'cache':
+        handle_cache(args)
+        return
+    if args.command == 'runs':
+        handle_runs(args)
+        return
+
     setup_logging()
     config_file = args.config if args.config else 'config/agent_config.json'
     
     try:
-        agent_system = AgentSystem(config_files=config_file)
+        # A direct 'generate' only ever needs one agent, so build components on demand.
+        agent_system = AgentSystem(config_files=config_file, lazy_loading=True if args.command == 'generate' else None)
     except ValueError as e:
         logger.error(f"Failed to initialize AgentSystem: {e}")
         sys.exit(1)
@@ -45,7 +146,11 @@ def handle_direct_command(args):
             sys.exit(1)
     elif args.command == 'run':
         try:
-            agent_system.run()
+            if args.quiet:
+                agent_system.task_manager.quiet = True
+            tracer = agent_system.run(force=args.force, resume=args.resume, trace=args.trace)
+            if tracer is not None and not args.quiet:
+                print(tracer.format_summary(agent_system.task_manager.graph))
         except Exception as e:
             logger.error(f"Error during task execution: {e}")
             sys.exit(1)
@@ -64,6 +169,43 @@ def main():
     # Run command
     parser_run = subparsers.add_parser('run', help='Run tasks defined in the config file.')
     parser_run.add_argument('--config', '-c', help='Path to a custom config file.')
+    parser_run.add_argument('--force', '-f', action='store_true', help='Re-run tasks whose results are cached.')
+    parser_run.add_argument('--quiet', '-q', action='store_true', help='Do not print task results; only write them to their output sinks.')
+    parser_run.add_argument('--trace', '-t', metavar='PATH', help='Write a Chrome trace (chrome://tracing, Perfetto) of the run to PATH and print per-task timings.')
+    parser_run.add_argument('--resume', '-r', metavar='RUN_ID', help='Continue a journaled run, skipping the tasks it completed.')
+
+    # Startup report command
+    parser_report = subparsers.add_parser('startup-report', help='Profile AgentSystem startup and print a per-phase, per-component report.')
+    parser_report.add_argument('--config', '-c', help='Path to a custom config file.')
+    parser_report.add_argument('--json', '-j', help='Also export the report as JSON to this path.')
+    parser_report.add_argument('--lazy', action='store_true', help='Profile with lazy component loading enabled.')
+
+    # Resources command
+    parser_resources = subparsers.add_parser('resources', help='Show or download the NLTK data used by plugins.')
+    parser_resources.add_argument('action', choices=['pull', 'status'], help='Download missing resources, or show what is installed.')
+    parser_resources.add_argument('names', nargs='*', help='Resource ids (defaults to the Punkt tokenizer and stopwords).')
+    parser_resources.add_argument('--dir', '-d', help='NLTK data directory (defaults to $NLTK_DATA or ~/nltk_data).')
+    parser_resources.add_argument('--force', '-f', action='store_true', help='Re-download resources that are already installed.')
+
+    # Cache command
+    parser_cache = subparsers.add_parser('cache', help='Show or clear the task result cache.')
+    parser_cache.add_argument('action', choices=['stats', 'clear'], help='Print cache statistics, or remove every cached result.')
+    parser_cache.add_argument('--config', '-c', help='Path to a custom config file.')
+
+    # Runs command
+    parser_runs = subparsers.add_parser('runs', help='List journaled task runs that can be resumed.')
+    parser_runs.add_argument('--config', '-c', help='Path to a custom config file.')
+    parser_runs.add_argument('--limit', '-n', type=int, default=20, help='Number of runs to list.')
+
+    # Serve command
+    parser_serve = subparsers.add_parser('serve', help='Run the web server with multiple worker processes.')
+    parser_serve.add_argument('--config', '-c', help='Path to a custom config file.')
+    parser_serve.add_argument('--host', default='0.0.0.0', help='Interface to listen on.')
+    parser_serve.add_argument('--port', '-p', type=int, default=5000, help='Port to listen on.')
+    parser_serve.add_argument('--workers', '-w', type=int, default=2, help='Number of worker processes.')
+    parser_serve.add_argument('--preload', action='store_true', help='Load agents and model weights once in the parent and share them with the workers.')
+    parser_serve.add_argument('--max-requests', type=int, default=0, help='Restart a worker after it served this many requests (0 = never).')
+    parser_serve.add_argument('--graceful-timeout', type=float, default=30, help='Seconds a stopping worker waits for in-flight requests.')
 
     # Parse arguments. If no command is given, sys.argv will be short.
     if len(sys.argv) == 1:
@@ -1,7 +1,7 @@
 # TinyAGI/services/database.py
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Integer, String, Text, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime, timezone
 
@@ -30,4 +30,12 @@ class Message(db.Model):
     conversation: Mapped["Conversation"] = relationship("Conversation", back_populates="messages")
 
     def to_dict(self):
-        return {"role": self.role, "content": self.content}
\ No newline at end of file
+        return {"role": self.role, "content": self.content}
+
+class Document(db.Model):
+    # Kept in the database rather than in memory so that every server worker sees every
+    # uploaded document, and documents survive worker restarts.
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    chunks: Mapped[list] = mapped_column(JSON, nullable=False)
+    embeddings: Mapped[list] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,284 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/services/prefork_server.py
+
+import gc
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from werkzeug.serving import make_server
+
+logger = logging.getLogger(__name__)
+
+class _RequestCounter:
+    """
+    WSGI middleware that counts requests and tracks how many are still being
+    served, including streamed bodies, so a worker can drain before exiting.
+    """
+    def __init__(self, app, max_requests=0, on_limit=None):
+        self.app = app
+        self.max_requests = max_requests
+        self.on_limit = on_limit
+        self.served = 0
+        self.active = 0
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.served += 1
+            self.active += 1
+            limit_reached = self.max_requests and self.served == self.max_requests
+        if limit_reached and self.on_limit:
+            self.on_limit()
+        try:
+            body = self.app(environ, start_response)
+        except BaseException:
+            self._finished()
+            raise
+        return _ClosingBody(body, self._finished)
+
+    def _finished(self):
+        with self._lock:
+            self.active -= 1
+            self._idle.notify_all()
+
+    def wait_idle(self, timeout):
+        """Wait until no request is being served. Returns False if the timeout expired first."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self.active > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+class _ClosingBody:
+    def __init__(self, body, callback):
+        self._body = body
+        self._callback = callback
+
+    def __iter__(self):
+        return iter(self._body)
+
+    def close(self):
+        try:
+            close = getattr(self._body, 'close', None)
+            if close:
+                close()
+        finally:
+            self._callback()
+
+class PreforkServer:
+    """
+    Serves a WSGI app from several forked worker processes sharing one listening socket.
+
+    With preload, the app (and with it the AgentSystem and model weights) is built once
+    in the parent before forking, so workers share the loaded, read-only memory
+    copy-on-write and start instantly. Without preload every worker builds its own app.
+    Threads do not survive a fork; the model cache, component registries and NLTK resource
+    manager replace their locks and restart their background threads (idle-model sweeper,
+    load retries) in each worker (see core/fork_safety.py).
+
+    The parent restarts workers that exit. A worker exits gracefully, after finishing
+    its in-flight requests, once it has served max_requests requests or when it
+    receives SIGTERM. Sending SIGHUP to the parent reloads the preloaded app (through
+    on_reload) and replaces the workers one at a time.
+    """
+    def __init__(self, app_factory, host='0.0.0.0', port=5000, workers=2, preload=False,
+                 max_requests=0, graceful_timeout=30, post_fork=None, on_reload=None):
+        """
+        Initialize the PreforkServer.
+
+        :param app_factory: Callable taking no arguments and returning the WSGI app.
+        :param host: Interface to listen on.
+        :param port: Port to listen on.
+        :param workers: Number of worker processes.
+        :param preload: If True, build the app in the parent before forking.
+        :param max_requests: Recycle a worker after it served this many requests. 0 disables recycling.
+        :param graceful_timeout: Seconds a stopping worker waits for in-flight requests before exiting.
+        :param post_fork: Optional callable taking the app, run in each worker right after it starts
+                          (e.g., to drop database connections inherited from the parent).
+        :param on_reload: Optional callable taking the preloaded app, run in the parent on SIGHUP.
+        """
+        self.app_factory = app_factory
+        self.host = host
+        self.port = port
+        self.num_workers = max(1, workers)
+        self.preload = preload
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        self.post_fork = post_fork
+        self.on_reload = on_reload
+        self.app = None
+        self.socket = None
+        self.workers = {}
+        self._stopping = False
+        self._reload_requested = False
+
+    def run(self):
+        """Bind the socket, fork the workers and supervise them until SIGINT or SIGTERM."""
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("Pre-fork workers require os.fork, which is not available on this platform.")
+
+        self.socket = socket.create_server((self.host, self.port), backlog=2048)
+        if self.preload:
+            logger.info("Preloading the app in the parent process.")
+            self.app = self.app_factory()
+            self._freeze()
+
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        logger.info(f"Listening on {self.host}:{self.port} with {self.num_workers} workers (pid {os.getpid()}).")
+        for _ in range(self.num_workers):
+            self._spawn()
+        try:
+            while not self._stopping:
+                self._reap(respawn=True)
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self._rolling_restart()
+                time.sleep(0.5)
+        finally:
+            self._shutdown()
+
+    def _freeze(self):
+        # Move everything allocated so far out of the collector's generations so that
+        # garbage collection in the workers does not write to (and copy) shared pages.
+        gc.collect()
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reload_requested = True
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._worker_main()
+            except BaseException:
+                logger.exception("Worker crashed.")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}.")
+        return pid
+
+    def _reap(self, respawn):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            logger.info(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}.")
+            if respawn and not self._stopping:
+                if time.monotonic() - started < 1.0:
+                    # Avoid a tight fork loop when workers crash on startup.
+                    time.sleep(1.0)
+                self._spawn()
+
+    def _wait_for_exit(self, pid, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done == pid:
+                self.workers.pop(pid, None)
+                return True
+            time.sleep(0.1)
+        return False
+
+    def _stop_worker(self, pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+            return
+        if not self._wait_for_exit(pid, self.graceful_timeout + 5):
+            logger.warning(f"Worker {pid} did not stop in time; killing it.")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            self._wait_for_exit(pid, 5)
+
+    def _rolling_restart(self):
+        if self.preload and self.on_reload:
+            try:
+                self.on_reload(self.app)
+                self._freeze()
+            except Exception as e:
+                logger.error(f"Reload failed; keeping the current app: {e}")
+                return
+        logger.info("Replacing workers.")
+        for pid in list(self.workers):
+            # Start the replacement first so capacity never drops.
+            self._spawn()
+            self._stop_worker(pid)
+
+    def _shutdown(self):
+        logger.info("Stopping workers.")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning(f"Worker {pid} did not stop in time; killing it.")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.socket.close()
+
+    def _worker_main(self):
+        # Ctrl-C reaches the whole process group; let the parent decide when workers stop.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        app = self.app if self.preload else self.app_factory()
+        if self.post_fork:
+            self.post_fork(app)
+
+        stopping = threading.Event()
+
+        def stop():
+            if not stopping.is_set():
+                stopping.set()
+                threading.Thread(target=server.shutdown, daemon=True).start()
+
+        counter = _RequestCounter(app, self.max_requests, on_limit=stop)
+        server = make_server(self.host, self.port, counter, threaded=True, fd=self.socket.fileno())
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop())
+        server.serve_forever()
+
+        # No new connections are accepted; let the requests (and streams) in flight finish.
+        if not counter.wait_idle(self.graceful_timeout):
+            logger.warning(f"Worker {os.getpid()} exiting with {counter.active} requests still in flight.")
+        server.server_close()
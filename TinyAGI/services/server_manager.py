@@ -7,11 +7,13 @@
 import time
 import uuid
 
-from .database import db, Conversation, Message
-from flask import Flask, request, jsonify, Response, render_template
+from .database import db, Conversation, Message, Document
+from flask import Flask, request, jsonify, Response, render_template, g
 from flask_socketio import SocketIO, emit
 import asyncio
-from ..agent import AgentSystem
+from .system_snapshot import SystemHolder
+from .prefork_server import PreforkServer
+from ..core.model_cache import model_cache
 import os
 import logging
 from rich.logging import RichHandler
@@ -24,7 +26,6 @@ console = Console()
 
 # Dictionary to hold background tasks for music generation
 music_sessions = {}
-document_stores = {} # In-memory store for document embeddings
 
 
 def setup_rich_logging():
@@ -37,10 +38,12 @@ def setup_rich_logging():
     )
 
 
-def create_app():
+def create_app(config_files='config/agent_config.json', socketio_options=None):
     """
     Create and configure the Flask application.
 
+    :param config_files: Path(s) to the agent configuration file(s).
+    :param socketio_options: Extra keyword arguments for SocketIO (e.g., transports).
     :return: Configured Flask app
     """
     # Define paths relative to the project root to find templates and static files
@@ -53,31 +56,52 @@ def create_app():
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     db.init_app(app)
 
-    socketio = SocketIO(app, async_mode='threading')
+    socketio = SocketIO(app, async_mode='threading', **(socketio_options or {}))
 
     setup_rich_logging()
 
+    app.system = SystemHolder()
+
     def initialize_agent_system(config_files='config/agent_config.json'):
-        """Initializes the AgentSystem and attaches it to the app context."""
+        """
+        Builds an AgentSystem and publishes it as the app's current snapshot.
+        A running system keeps serving while the new one is built: unchanged agents,
+        plugins and tools are adopted from it, and the ones it no longer needs are
+        closed once the requests still using them have finished.
+        """
         try:
-            agent_system = AgentSystem(config_files=config_files)
-            app.agent_system = agent_system
-            app.config['AGENT_CONFIG_PATH'] = agent_system.config_files[0] if agent_system.config_files else None
+            app.system.reload(config_files)
+            logger.info("AgentSystem initialized and attached to Flask app.")
         except Exception as e:
             logger.error(f"Failed to initialize AgentSystem: {e}")
             # We can let the app start and fail on requests, or exit here.
             # For a web UI, it's better to let it start and show an error.
-            app.agent_system = None
-        app.config['AGENT_CONFIG'] = agent_system.config if app.agent_system else {}
-        app.plugin_manager = agent_system.plugin_manager if app.agent_system else None
-        app.task_manager = agent_system.task_manager if app.agent_system else None
-        app.tool_manager = agent_system.tool_manager if app.agent_system else None
-        logger.info("AgentSystem initialized and attached to Flask app.")
+            # A failed reload keeps the previous system serving.
+
+    @app.before_request
+    def pin_snapshot():
+        """Pin the current system for the whole request so a reload cannot swap it mid-request."""
+        g.snapshot = app.system.acquire()
+
+    @app.after_request
+    def release_snapshot_on_close(response):
+        # Streamed responses outlive the handler; release once the body has been sent.
+        snapshot = g.pop('snapshot', None)
+        if snapshot is not None:
+            response.call_on_close(snapshot.release)
+        return response
+
+    @app.teardown_request
+    def release_snapshot(exc):
+        # Only reached with a pinned snapshot if no response was produced.
+        snapshot = g.pop('snapshot', None)
+        if snapshot is not None:
+            snapshot.release()
 
     # Initial setup
     with app.app_context():
         db.create_all()
-        initialize_agent_system()
+        initialize_agent_system(config_files)
 
     @app.route('/')
     def index():
@@ -87,9 +111,9 @@ def create_app():
     @app.route('/api/agents', methods=['GET'])
     def get_agents():
         """Endpoint to get the list of available agents."""
-        if not app.agent_system:
+        if not g.snapshot.agent_system:
             return jsonify({'error': 'AgentSystem not initialized'}), 500
-        agents = list(app.agent_system.agent_manager.loaded_agents.keys())
+        agents = g.snapshot.agent_system.agent_manager.get_agent_names()
         return jsonify(agents)
 
     @app.route('/api/models', methods=['GET'])
@@ -109,19 +133,24 @@ def create_app():
         provider = request.args.get('provider')
         return jsonify(models.get(provider, [])) if provider else jsonify(models)
 
+    @app.route('/api/models/residency', methods=['GET'])
+    def get_model_residency():
+        """Endpoint to get the memory budget and which local models are loaded."""
+        return jsonify(model_cache.stats())
+
     @app.route('/api/tools', methods=['GET'])
     def get_tools():
         """Endpoint to get the list of available tools."""
-        if not app.tool_manager:
+        if not g.snapshot.tool_manager:
             return jsonify({'error': 'ToolManager not initialized'}), 500
         
-        tools = list(app.tool_manager.tools.keys())
+        tools = g.snapshot.tool_manager.get_tool_names()
         return jsonify(tools)
 
     @app.route('/api/agents', methods=['POST'])
     def create_agent():
         """Endpoint to create a new agent."""
-        config_path = app.config.get('AGENT_CONFIG_PATH')
+        config_path = g.snapshot.config_path
         if not config_path or not os.path.exists(config_path):
             return jsonify({'error': 'Agent configuration file not found or accessible.'}), 500
 
@@ -171,7 +200,7 @@ def create_app():
     @app.route('/api/agents/<string:agent_name>', methods=['GET', 'PUT', 'DELETE'])
     def manage_agent(agent_name):
         """Endpoint to get, update, or delete a specific agent's config."""
-        config_path = app.config.get('AGENT_CONFIG_PATH')
+        config_path = g.snapshot.config_path
         if not config_path or not os.path.exists(config_path):
             return jsonify({'error': 'Agent configuration file not found or accessible.'}), 500
 
@@ -262,10 +291,10 @@ def create_app():
             return jsonify({'error': 'Messages are required'}), 400
         if not agent_name:
             return jsonify({'error': 'Agent name is required'}), 400
-        if not app.agent_system:
+        if not g.snapshot.agent_system:
             return jsonify({'error': 'AgentSystem not initialized'}), 500
 
-        agent = app.agent_system.agent_manager.get_agent(agent_name)
+        agent = g.snapshot.agent_system.agent_manager.get_agent(agent_name)
         if not agent:
             return jsonify({'error': f"Agent '{agent_name}' not found"}), 404
 
@@ -330,10 +359,10 @@ def create_app():
             return jsonify({'error': 'Prompt is required'}), 400
         if not agent_name:
             return jsonify({'error': 'Agent name is required'}), 400
-        if not app.agent_system:
+        if not g.snapshot.agent_system:
             return jsonify({'error': 'AgentSystem not initialized'}), 500
 
-        agent = app.agent_system.agent_manager.get_agent(agent_name)
+        agent = g.snapshot.agent_system.agent_manager.get_agent(agent_name)
         if not agent:
             return jsonify({'error': f"Agent '{agent_name}' not found"}), 404
 
@@ -364,10 +393,10 @@ def create_app():
             return jsonify({'error': 'Prompt is required'}), 400
         if not agent_name:
             return jsonify({'error': 'Agent name is required'}), 400
-        if not app.agent_system:
+        if not g.snapshot.agent_system:
             return jsonify({'error': 'AgentSystem not initialized'}), 500
 
-        agent = app.agent_system.agent_manager.get_agent(agent_name)
+        agent = g.snapshot.agent_system.agent_manager.get_agent(agent_name)
         if not agent:
             return jsonify({'error': f"Agent '{agent_name}' not found"}), 404
         
@@ -396,7 +425,7 @@ def create_app():
         if not prompt:
             return jsonify({'error': 'Prompt is required'}), 400
 
-        agent = app.agent_system.agent_manager.get_agent(agent_name)
+        agent = g.snapshot.agent_system.agent_manager.get_agent(agent_name)
         if not agent or not hasattr(agent, 'process_image_with_prompt'):
             return jsonify({'error': f"Robotics agent '{agent_name}' not found or is invalid."}), 404
 
@@ -430,7 +459,7 @@ def create_app():
         if not prompt:
             return jsonify({'error': 'Prompt is required'}), 400
 
-        agent = app.agent_system.agent_manager.get_agent(agent_name)
+        agent = g.snapshot.agent_system.agent_manager.get_agent(agent_name)
         if not agent or not hasattr(agent, 'generate_video'):
             return jsonify({'error': f"Video generation agent '{agent_name}' not found or is invalid."}), 404
 
@@ -498,10 +527,10 @@ def create_app():
             return jsonify({'error': 'Input text is required'}), 400
         if not agent_name:
             return jsonify({'error': 'Agent name is required'}), 400
-        if not app.agent_system:
+        if not g.snapshot.agent_system:
             return jsonify({'error': 'AgentSystem not initialized'}), 500
 
-        agent = app.agent_system.agent_manager.get_agent(agent_name)
+        agent = g.snapshot.agent_system.agent_manager.get_agent(agent_name)
         if not agent:
             return jsonify({'error': f"Agent '{agent_name}' not found"}), 404
 
@@ -555,7 +584,7 @@ def create_app():
         if not agent_name:
             return jsonify({'error': 'Agent name is required for embedding'}), 400
 
-        agent = app.agent_system.agent_manager.get_agent(agent_name)
+        agent = g.snapshot.agent_system.agent_manager.get_agent(agent_name)
         if not agent or not hasattr(agent, 'embed'):
             return jsonify({'error': f"Agent '{agent_name}' not found or does not support embedding."}), 404
 
@@ -565,15 +594,16 @@ def create_app():
             # Simple chunking by paragraph
             chunks = [chunk for chunk in content.split('\n\n') if chunk.strip()]
             
-            # Embed the chunks
-            embeddings = agent.embed(chunks)
+            # Embed the chunks in sub-batches sized for the agent's provider
+            embed_batch = getattr(agent, 'embed_batch', None)
+            embeddings = embed_batch(chunks) if embed_batch else agent.embed(chunks)
             
-            # Store in memory
+            # Store in the database, which all server workers share
             doc_id = str(uuid.uuid4())
-            document_stores[doc_id] = {
-                'chunks': chunks,
-                'embeddings': embeddings
-            }
+            if hasattr(embeddings, 'tolist'):
+                embeddings = embeddings.tolist()
+            db.session.add(Document(id=doc_id, chunks=chunks, embeddings=embeddings))
+            db.session.commit()
             
             return jsonify({'message': 'Document processed successfully', 'doc_id': doc_id}), 200
         except Exception as e:
@@ -591,18 +621,18 @@ def create_app():
         if not all([doc_id, question, agent_name]):
             return jsonify({'error': 'doc_id, question, and agent are required'}), 400
 
-        if doc_id not in document_stores:
+        document = db.session.get(Document, doc_id)
+        if document is None:
             return jsonify({'error': 'Document not found or not processed'}), 404
 
-        agent = app.agent_system.agent_manager.get_agent(agent_name)
+        agent = g.snapshot.agent_system.agent_manager.get_agent(agent_name)
         if not agent:
             return jsonify({'error': f"Agent '{agent_name}' not found."}), 404
 
         try:
             # This is a simplified RAG (Retrieval-Augmented Generation) process
             # A real implementation would use a vector database for similarity search
-            store = document_stores[doc_id]
-            context = "\n---\n".join(store['chunks']) # For simplicity, use all chunks as context
+            context = "\n---\n".join(document.chunks) # For simplicity, use all chunks as context
             
             prompt = f"Based on the following document context, please answer the question.\n\nContext:\n{context}\n\nQuestion: {question}"
             answer = agent.chat([{'role': 'user', 'content': prompt}])
@@ -631,9 +661,12 @@ def create_app():
         """Starts a music generation stream in a background thread."""
         sid = request.sid
         prompt = data.get('prompt', 'ambient electronic')
-        agent = app.agent_system.agent_manager.get_agent('lyria_agent')
+        # Socket.IO events bypass the request hooks, so pin the system for the stream's lifetime here.
+        snapshot = app.system.acquire()
+        agent = snapshot.agent_manager.get_agent('lyria_agent') if snapshot.agent_system else None
 
         if not agent:
+            snapshot.release()
             emit('stream_error', {'error': 'Lyria agent not found.'})
             return
 
@@ -661,8 +694,14 @@ def create_app():
                 elif item is None: # Stream finished
                     break
         
+        async def pinned_music_task():
+            try:
+                await music_task()
+            finally:
+                snapshot.release()
+
         # Run the async task in a new thread
-        socketio.start_background_task(asyncio.run, music_task())
+        socketio.start_background_task(asyncio.run, pinned_music_task())
 
     @socketio.on('steer_music', namespace='/music')
     def steer_music(data):
@@ -701,7 +740,7 @@ def create_app():
         """
         Retrieve the current configuration.
         """
-        return jsonify(app.config.get('AGENT_CONFIG', {})), 200
+        return jsonify(g.snapshot.config), 200
 
     return app, socketio
 
@@ -719,6 +758,52 @@ def run_server():
     console.print(welcome_panel)
     socketio.run(app, host='0.0.0.0', port=5000, debug=True, allow_unsafe_werkzeug=True)
 
+def serve(config_files='config/agent_config.json', host='0.0.0.0', port=5000, workers=2, preload=False,
+          max_requests=0, graceful_timeout=30):
+    """
+    Run the server with several pre-forked worker processes.
+
+    :param config_files: Path(s) to the agent configuration file(s).
+    :param host: Interface to listen on.
+    :param port: Port to listen on.
+    :param workers: Number of worker processes.
+    :param preload: Build the AgentSystem and load every agent, plugin and tool once in the parent,
+                    so workers share the loaded weights copy-on-write.
+    :param max_requests: Recycle a worker after this many requests (0 disables recycling).
+    :param graceful_timeout: Seconds a stopping worker waits for in-flight requests and streams.
+    """
+    def app_factory():
+        # A WebSocket is one connection and therefore stays on one worker; long-polling
+        # requests would be spread across workers that do not share Socket.IO sessions.
+        app, _ = create_app(config_files, socketio_options={'transports': ['websocket']})
+        if preload:
+            agent_system = app.system.current.agent_system
+            if agent_system is not None and agent_system.lazy_loading:
+                agent_system.preload(
+                    agent_system.agent_manager.get_agent_names() +
+                    agent_system.plugin_manager.get_plugin_names() +
+                    agent_system.tool_manager.get_tool_names()
+                )
+        return app
+
+    def post_fork(app):
+        # SQLite connections must not be shared across processes.
+        with app.app_context():
+            db.engine.dispose()
+
+    def on_reload(app):
+        app.system.reload(app.system.current.agent_system.config_files if app.system.current.agent_system
+                          else config_files)
+
+    console.print(Panel(
+        f"[bold green]TinyAGI Server is running with {workers} workers![/bold green]\n\n"
+        f"Access the web UI at: [bold cyan]http://localhost:{port}[/bold cyan]",
+        title="[bold]🚀 Server Online[/bold]", border_style="blue"
+    ))
+    PreforkServer(app_factory, host=host, port=port, workers=workers, preload=preload,
+                  max_requests=max_requests, graceful_timeout=graceful_timeout,
+                  post_fork=post_fork, on_reload=on_reload).run()
+
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
 # of this software and associated documentation files (the "Software"), to deal
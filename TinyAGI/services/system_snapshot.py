@@ -0,0 +1,164 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/services/system_snapshot.py
+
+import logging
+import threading
+from contextlib import contextmanager
+from ..agent import AgentSystem
+from ..utils import close_component
+
+logger = logging.getLogger(__name__)
+
+def close_dropped_components(old_system, new_system):
+    """
+    Close the agents, plugins and tools of old_system that new_system did not adopt.
+    Components without a close() method are simply dropped.
+
+    :param old_system: The AgentSystem that was replaced.
+    :param new_system: The AgentSystem that replaced it, or None.
+    :return: Number of components that were closed.
+    """
+    if old_system is None:
+        return 0
+    kept = {id(instance) for instance in new_system.instances()} if new_system is not None else set()
+    return sum(
+        1 for instance in old_system.instances() if id(instance) not in kept and close_component(instance)
+    )
+
+class SystemSnapshot:
+    """
+    An AgentSystem together with the configuration it was built from, published
+    as a single unit. A snapshot is never modified after it is created; a reload
+    publishes a new one instead.
+
+    Requests pin the snapshot they started with (acquire/release) so the
+    components they use stay open until they finish, including streamed
+    responses that outlive the request handler.
+    """
+    def __init__(self, agent_system=None, config_path=None):
+        """
+        Initialize the SystemSnapshot.
+
+        :param agent_system: The AgentSystem to publish, or None if none could be built.
+        :param config_path: The configuration file the system was loaded from.
+        """
+        self.agent_system = agent_system
+        self.config = agent_system.config if agent_system else {}
+        self.config_path = config_path
+        self._in_flight = 0
+        self._on_drained = None
+        self._lock = threading.Lock()
+
+    @property
+    def agent_manager(self):
+        return self.agent_system.agent_manager if self.agent_system else None
+
+    @property
+    def plugin_manager(self):
+        return self.agent_system.plugin_manager if self.agent_system else None
+
+    @property
+    def tool_manager(self):
+        return self.agent_system.tool_manager if self.agent_system else None
+
+    @property
+    def task_manager(self):
+        return self.agent_system.task_manager if self.agent_system else None
+
+    @property
+    def in_flight(self):
+        """Number of requests currently using this snapshot."""
+        return self._in_flight
+
+    def acquire(self):
+        """Mark the snapshot as in use by one more request."""
+        with self._lock:
+            self._in_flight += 1
+        return self
+
+    def release(self):
+        """Mark one request as finished, running the drain callback if this was the last one."""
+        with self._lock:
+            self._in_flight -= 1
+            callback = self._on_drained if self._in_flight == 0 else None
+            if callback is not None:
+                self._on_drained = None
+        if callback is not None:
+            callback()
+
+    def retire(self, on_drained):
+        """
+        Schedule on_drained to run once no request is using the snapshot any more
+        (immediately if it is idle).
+
+        :param on_drained: Callable taking no arguments.
+        """
+        with self._lock:
+            if self._in_flight > 0:
+                self._on_drained = on_drained
+                return
+        on_drained()
+
+class SystemHolder:
+    """
+    Holds the current SystemSnapshot. Reloads build a new AgentSystem while the
+    current one keeps serving, then publish it with a single reference swap.
+    The replaced snapshot is drained in the background: its components that the
+    new system did not adopt are closed after its last in-flight request ends.
+    """
+    def __init__(self, factory=AgentSystem):
+        """
+        Initialize the SystemHolder.
+
+        :param factory: Callable building an AgentSystem from (config_files, previous=...).
+        """
+        self.factory = factory
+        self.current = SystemSnapshot()
+        self._swap_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Pin and return the current snapshot. Must be paired with snapshot.release().
+        """
+        # Holding the swap lock guarantees a snapshot cannot be retired between
+        # reading the reference and registering the request on it.
+        with self._swap_lock:
+            return self.current.acquire()
+
+    @contextmanager
+    def use(self):
+        """Context manager that pins the current snapshot for the duration of the block."""
+        snapshot = self.acquire()
+        try:
+            yield snapshot
+        finally:
+            snapshot.release()
+
+    def reload(self, config_files):
+        """
+        Build a new AgentSystem from config_files and publish it. Concurrent reloads are
+        serialized. If building fails the exception propagates and the current snapshot
+        stays in place.
+
+        :param config_files: Path(s) to the JSON configuration file(s).
+        :return: The new SystemSnapshot.
+        """
+        with self._reload_lock:
+            old = self.current
+            agent_system = self.factory(config_files, previous=old.agent_system)
+            config_path = agent_system.config_files[0] if agent_system.config_files else None
+            new = SystemSnapshot(agent_system, config_path)
+            with self._swap_lock:
+                self.current = new
+            old.retire(lambda: self._drain(old, new))
+            return new
+
+    def _drain(self, old, new):
+        closed = close_dropped_components(old.agent_system, new.agent_system)
+        if closed:
+            logger.info(f"Closed {closed} components no longer used after reload.")
@@ -0,0 +1,122 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/startup_profiler.py
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+def current_rss():
+    """
+    Return the resident set size of the current process in bytes.
+
+    Uses psutil when it is installed, /proc on Linux, and falls back to the
+    peak RSS reported by the resource module elsewhere.
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux.
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except ImportError:
+        return 0
+
+class StartupProfiler:
+    """
+    Records wall time and RSS delta for each startup phase and component.
+    """
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, name, kind='phase'):
+        """
+        Context manager that records how long the enclosed block took and how much
+        the process RSS grew while it ran.
+
+        :param name: Name of the phase or component.
+        :param kind: Category of the record (e.g., 'phase', 'agent', 'plugin', 'tool').
+        :return: Yields the record dictionary so callers can annotate it (e.g., with an 'error').
+        """
+        record = {'name': name, 'kind': kind}
+        rss_before = current_rss()
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record['error'] = str(e)
+            raise
+        finally:
+            record['wall_time_s'] = time.perf_counter() - start
+            record['rss_delta_bytes'] = current_rss() - rss_before
+            with self._lock:
+                self.records.append(record)
+
+    def report(self):
+        """Return all records sorted by wall time, slowest first."""
+        with self._lock:
+            return sorted(self.records, key=lambda r: r['wall_time_s'], reverse=True)
+
+    def total_time(self):
+        """Return the summed wall time of all top-level phases."""
+        with self._lock:
+            return sum(r['wall_time_s'] for r in self.records if r['kind'] == 'phase')
+
+    def format_table(self):
+        """
+        Render the report as a plain-text table.
+
+        :return: The table as a string.
+        """
+        rows = self.report()
+        name_width = max([len(r['name']) for r in rows] + [len('name')])
+        lines = [
+            f"{'name':<{name_width}}  {'kind':<8}  {'wall (s)':>10}  {'rss delta (MB)':>14}",
+            '-' * (name_width + 40)
+        ]
+        for r in rows:
+            suffix = '  [failed]' if 'error' in r else ''
+            lines.append(
+                f"{r['name']:<{name_width}}  {r['kind']:<8}  {r['wall_time_s']:>10.3f}  "
+                f"{r['rss_delta_bytes'] / (1024 * 1024):>14.1f}{suffix}"
+            )
+        lines.append('-' * (name_width + 40))
+        lines.append(f"{'total (phases)':<{name_width}}  {'':<8}  {self.total_time():>10.3f}")
+        return '\n'.join(lines)
+
+    def to_json(self, file_path=None):
+        """
+        Export the report as JSON.
+
+        :param file_path: If given, the report is also written to this file.
+        :return: The JSON string.
+        """
+        data = json.dumps({'total_time_s': self.total_time(), 'records': self.report()}, indent=2)
+        if file_path:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            logger.info(f"Startup report saved to '{file_path}'.")
+        return data
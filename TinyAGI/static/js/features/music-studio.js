@@ -25,7 +25,8 @@ function updateMusicStatus(text, isError = false) {
 function setupMusicSocket() {
     if (musicSocket) return;
 
-    musicSocket = io('/music');
+    // WebSocket only: a single connection stays on one server worker for the whole stream.
+    musicSocket = io('/music', { transports: ['websocket'] });
 
     musicSocket.on('connect', () => console.log('Connected to music server.'));
 
@@ -0,0 +1,167 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/task_graph.py
+
+import heapq
+import logging
+from collections import Counter
+from .task_template import compile_template, CompiledTask
+
+logger = logging.getLogger(__name__)
+
+class TaskGraphError(ValueError):
+    """Raised when the task list does not form a valid dependency graph."""
+
+def task_references(data):
+    """
+    Collect the ids of all tasks referenced by {{tasks.<id>.output}} placeholders.
+
+    :param data: Task input data (dict, list, string or scalar).
+    :return: Set of referenced task ids.
+    """
+    return set(compile_template(data).references)
+
+def build_task_graph(tasks, templates=None):
+    """
+    Infer the dependencies between tasks from their input placeholders and their
+    optional 'depends_on' list.
+
+    :param tasks: List of task configurations.
+    :param templates: Optional dictionary of CompiledTask by task id, to avoid compiling inputs again.
+    :return: Dictionary mapping each task id to the set of task ids it depends on.
+    :raises TaskGraphError: If task ids are duplicated or the dependencies contain a cycle.
+    """
+    ids = [task.get('task_id') for task in tasks]
+    duplicates = sorted(task_id for task_id, count in Counter(ids).items() if count > 1)
+    if duplicates:
+        raise TaskGraphError(f"Duplicate task ids: {duplicates}")
+
+    known = set(ids)
+    graph = {}
+    for task in tasks:
+        task_id = task.get('task_id')
+        depends_on = task.get('depends_on', [])
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        compiled = templates[task_id] if templates is not None else CompiledTask(task)
+        references = set(compiled.references)
+        deps = references | set(depends_on)
+        unknown = deps - known
+        if unknown:
+            logger.warning(f"Task '{task_id}' refers to tasks {sorted(unknown)} that are not in the task list; "
+                           f"they can only be resolved from earlier results.")
+        graph[task_id] = deps & known
+
+    cycle = find_cycle(graph)
+    if cycle:
+        raise TaskGraphError(f"Task dependencies contain a cycle: {' -> '.join(cycle)}")
+    return graph
+
+def find_cycle(graph):
+    """
+    Find a dependency cycle.
+
+    :param graph: Dictionary mapping each node to the set of nodes it depends on.
+    :return: List of nodes forming the cycle (first node repeated at the end), or None.
+    """
+    visiting, done = set(), set()
+    for start in graph:
+        if start in done:
+            continue
+        # Iterative depth-first search; path holds (node, remaining dependencies).
+        path = [(start, iter(sorted(graph[start])))]
+        visiting.add(start)
+        while path:
+            node, deps = path[-1]
+            dep = next(deps, None)
+            if dep is None:
+                path.pop()
+                visiting.discard(node)
+                done.add(node)
+            elif dep in visiting:
+                nodes = [n for n, _ in path]
+                return nodes[nodes.index(dep):] + [dep]
+            elif dep not in done:
+                visiting.add(dep)
+                path.append((dep, iter(sorted(graph.get(dep, ())))))
+    return None
+
+class TaskScheduler:
+    """
+    Tracks which tasks of a dependency graph are ready to run. Each task keeps a
+    count of unfinished dependencies and a reverse index lists its dependents,
+    so finishing a task costs O(out-degree). Ready tasks are handed out in their
+    original (configuration) order. Failing a task fails everything downstream of it
+    in one pass over the affected subgraph.
+    """
+    def __init__(self, graph, order=None):
+        """
+        Initialize the TaskScheduler.
+
+        :param graph: Dictionary mapping each task id to the set of task ids it depends on.
+        :param order: Task ids in the order ready tasks should be handed out. Defaults to the graph's order.
+        """
+        order = list(order) if order is not None else list(graph)
+        self._position = {task_id: i for i, task_id in enumerate(order)}
+        self._waiting_on = {task_id: len(deps) for task_id, deps in graph.items()}
+        self._dependents = {task_id: [] for task_id in graph}
+        for task_id, deps in graph.items():
+            for dep in deps:
+                self._dependents[dep].append(task_id)
+        self._ready = [self._position[t] for t, count in self._waiting_on.items() if count == 0]
+        heapq.heapify(self._ready)
+        self._order = order
+        self._failed = set()
+        self.unfinished = len(graph)
+
+    def pop_ready(self):
+        """Return every task that is ready to run, in order, and mark them as started."""
+        ready = []
+        while self._ready:
+            task_id = self._order[heapq.heappop(self._ready)]
+            if task_id not in self._failed:
+                ready.append(task_id)
+        return ready
+
+    def fail(self, task_id):
+        """
+        Mark a task as failed, along with every task that depends on it, directly or not.
+        The dependents can no longer become ready.
+
+        :param task_id: The task id.
+        :return: List of the dependents that were failed as a consequence, in discovery order.
+        """
+        if task_id in self._failed:
+            return []
+        self._failed.add(task_id)
+        self.unfinished -= 1
+        cascaded = []
+        pending = list(self._dependents.get(task_id, ()))
+        while pending:
+            dependent = pending.pop()
+            if dependent in self._failed:
+                continue
+            self._failed.add(dependent)
+            self.unfinished -= 1
+            cascaded.append(dependent)
+            pending.extend(self._dependents.get(dependent, ()))
+        return cascaded
+
+    def finish(self, task_id):
+        """
+        Mark a task as finished (successfully or not) and release its dependents.
+
+        :param task_id: The task id.
+        :return: List of dependents that became ready.
+        """
+        self.unfinished -= 1
+        released = []
+        for dependent in self._dependents.get(task_id, ()):
+            self._waiting_on[dependent] -= 1
+            if self._waiting_on[dependent] == 0 and dependent not in self._failed:
+                heapq.heappush(self._ready, self._position[dependent])
+                released.append(dependent)
+        return released
@@ -7,12 +7,24 @@
 
 import logging
 import json
-import os
+import sqlite3
+import time
+from collections import ChainMap
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait, as_completed
+from .task_graph import build_task_graph, TaskScheduler
+from .task_template import compile_template, CompiledTask
+from .result_cache import cache_key
+from .task_stream import TaskStream, is_stream, contains_stream, resolve_streams
+from .output_sinks import ConsoleSink, create_sinks
+from .run_journal import STARTED, SUCCEEDED, FAILED
+from .task_policy import TaskTimeoutError, RetryPolicy, AgentLimits, call_with_timeout, hold_until_consumed
 
 logger = logging.getLogger(__name__)
 
 class TaskManager:
-    def __init__(self, agent_manager, plugin_manager, tool_manager, tasks):
+    def __init__(self, agent_manager, plugin_manager, tool_manager, tasks, max_workers=4, result_cache=None,
+                 journal=None, quiet=False, tracer=None, batch_size=16):
         """
         Initialize the TaskManager with the provided agent manager, plugin_manager, tool manager, and command executor.
 
@@ -20,122 +32,853 @@ class TaskManager:
         :param plugin_manager: Instance of PluginManager.
         :param tool_manager: Instance of ToolManager.
         :param tasks: A list of tasks to be executed.
+        :param max_workers: Maximum number of independent tasks executed at the same time.
+        :param result_cache: Optional ResultCache. Tasks whose plugin, agent, tool, resolved input and
+                             options are unchanged since a cached run reuse the cached result.
+        :param journal: Optional RunJournal recording every task's state and output, so that an
+                        interrupted run can be resumed.
+        :param quiet: If True, results are not printed; they only go to the tasks' output sinks.
+        :param tracer: Optional TaskTracer recording timed spans of every task.
+        :param batch_size: Maximum number of ready tasks coalesced into one batched plugin call
+                           (see _plan_dispatch). 1 disables batching.
         """
         self.agent_manager = agent_manager
         self.plugin_manager = plugin_manager
         self.tool_manager = tool_manager
         self.tasks = tasks
+        self.max_workers = max(1, max_workers or 1)
         self.task_results = {}
+        self.result_cache = result_cache
+        self.force = False
+        self.journal = journal
+        self.run_id = None
+        self.quiet = quiet
+        self.tracer = tracer
+        self.graph = {}
+        self.batch_size = max(1, batch_size or 1)
+        self._plugin_started = {}
+        self._batch_support = {}
+        self._agent_limits = AgentLimits(getattr(agent_manager, 'agents_config', None))
 
     def add_task(self, task):
         """Adds a task to the task list."""
         self.tasks.append(task)
 
-    def _resolve_inputs(self, data):
-        """
-        Recursively resolve placeholders in task input data.
-        Placeholders are in the format {{tasks.task_id.output}}.
-        """
-        if isinstance(data, dict):
-            return {k: self._resolve_inputs(v) for k, v in data.items()}
-        elif isinstance(data, list):
-            return [self._resolve_inputs(i) for i in data]
-        elif isinstance(data, str) and data.startswith('{{') and data.endswith('}}'):
-            ref = data.strip('{}').strip()
-            parts = ref.split('.')
-
-            # Expecting format "tasks.task_id.output"
-            if len(parts) == 3 and parts[0] == 'tasks' and parts[2] == 'output':
-                task_id_ref = parts[1]
-                if task_id_ref in self.task_results:
-                    logger.info(f"Resolving input from previous task '{task_id_ref}'.")
-                    return self.task_results[task_id_ref]
-                else:
-                    logger.warning(f"Could not resolve reference to task '{task_id_ref}'. It may not have been executed yet.")
-                    return data  # Return placeholder if not found
-        return data
-
-    def execute_tasks(self):
-        """
-        Iterate through all tasks defined in the configuration and execute them using the appropriate agents, plugins, and tools.
+    def _resolve_inputs(self, data, results=None):
+        """
+        Resolve placeholders in task input data.
+        Placeholders are in the format {{tasks.task_id.output}} (see compile_template for paths,
+        defaults and inline interpolation). execute_tasks compiles each task's input once per
+        run instead of calling this.
+
+        :param data: The input data.
+        :param results: Task outputs to resolve from. Defaults to self.task_results.
+        """
+        results = self.task_results if results is None else results
+        return compile_template(data).render(results)
+
+    def execute_tasks(self, force=False, resume=None):
+        """
+        Execute all tasks defined in the configuration using the appropriate agents, plugins, and tools.
         Supports chaining tasks by referencing outputs of previous tasks.
+
+        Dependencies are inferred from {{tasks.<id>.output}} placeholders and optional 'depends_on'
+        lists. Tasks whose dependencies have finished run concurrently on up to max_workers threads.
+        task_results is filled in configuration order regardless of completion order.
+
+        A task run with options.stream returns a TaskStream, which releases its dependents
+        right away: plugins with accepts_stream read the chunks as they arrive, others wait
+        for the full text. task_results holds the text once the run is over.
+
+        A task with 'map_over' runs its plugin once per item of a list (see _execute_map_task).
+        Ready tasks that share a plugin, agent, tool and options are sent as one batched call
+        when the plugin and agent support it (see _plan_dispatch).
+
+        With a journal, the run's id is in run_id, and every task's state changes are recorded as
+        they happen. Resuming a run restores the outputs of the tasks it completed (see _restore_run)
+        and runs the rest.
+
+        :param force: If True, run every task even if the result cache holds its result, and refresh the cache.
+        :param resume: Id of a journaled run to continue.
+        :raises TaskGraphError: If the dependencies contain a cycle or task ids are duplicated.
+        :raises KeyError: If the run to resume is not in the journal.
+        """
+        tasks, scheduler, results, templates = self._start_run(force, resume)
+        by_id = {task.get('task_id'): task for task in tasks}
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='task') as executor:
+                running = {}
+                probing = {}
+
+                def submit(plan):
+                    for kind, task_ids, args in plan:
+                        if kind == 'map':
+                            future = executor.submit(self._execute_map_task, *args, results, self._trace_now())
+                        elif kind == 'batch':
+                            future = executor.submit(self._execute_batch, *args, self._trace_now())
+                        else:
+                            future = executor.submit(self._execute_task, *args, self._trace_now())
+                        running[future] = task_ids
+                        for task_id in task_ids:
+                            self._journal_state(task_id, STARTED)
+
+                def submit_ready():
+                    # Ready tasks come out in configuration order, so a single worker
+                    # behaves like the sequential runner.
+                    plan, probes = self._plan_dispatch(scheduler.pop_ready(), by_id, templates, results)
+                    submit(plan)
+                    for members in probes:
+                        probing[executor.submit(self._probe_batch_support, members[0][0])] = members
+
+                submit_ready()
+                while running or probing:
+                    finished, _ = wait([*running, *probing], return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        if future in probing:
+                            submit(self._group_plan(probing.pop(future)))
+                            continue
+                        task_ids = running.pop(future)
+                        for task_id, (succeeded, response) in zip(task_ids, self._outcomes(future, task_ids)):
+                            if succeeded:
+                                results[task_id] = response
+                            self._journal_result(by_id[task_id], succeeded, response)
+                            # A failed or skipped task still releases its dependents; their
+                            # placeholders stay unresolved, as with sequential execution.
+                            scheduler.finish(task_id)
+                    submit_ready()
+        finally:
+            self._commit_results(tasks, results)
+
+    @staticmethod
+    def _outcomes(future, task_ids):
+        """
+        Return the (succeeded, response) tuples of a finished future, one per task id. An
+        error that escaped the task's own handling fails its tasks instead of the run.
         """
-        logger.debug(f"Available plugins: {list(self.plugin_manager.loaded_plugins.keys())}")
-        logger.debug(f"Available agents: {list(self.agent_manager.loaded_agents.keys())}")
-        logger.debug(f"Available tools: {list(self.tool_manager.loaded_tools.keys())}")
+        try:
+            return future.result() if len(task_ids) > 1 else [future.result()]
+        except Exception as e:
+            logger.error(f"Error during task '{', '.join(map(str, task_ids))}' execution: {e}", exc_info=True)
+            return [(False, None)] * len(task_ids)
 
-        for task in self.tasks:
+    def _start_run(self, force=False, resume=None):
+        """
+        Snapshot the task list and plan a run.
+
+        :param force: If True, bypass cached results for this run.
+        :param resume: Id of a journaled run to continue, or None.
+        :return: Tuple of (tasks, TaskScheduler, results, templates). results layers this run's outputs
+                 over task_results from earlier runs; templates maps task ids to CompiledTasks.
+                 Tasks restored from the journal are in results and not in the scheduler.
+        """
+        logger.debug(f"Available plugins: {list(self.plugin_manager.get_plugin_names())}")
+        logger.debug(f"Available agents: {list(self.agent_manager.get_agent_names())}")
+        logger.debug(f"Available tools: {list(self.tool_manager.get_tool_names())}")
+
+        tasks = list(self.tasks)
+        templates = {task.get('task_id'): CompiledTask(task) for task in tasks}
+        graph = build_task_graph(tasks, templates)
+        self.graph = graph
+        order = [task.get('task_id') for task in tasks]
+        self.force = force
+        restored = {}
+        if resume is not None and self.journal is None:
+            raise ValueError("Cannot resume a run without a run journal.")
+        if self.journal is not None:
+            self.run_id = self.journal.start_run(resume)
+            if resume is not None:
+                restored = self._restore_run(tasks, graph, order)
+            logger.info(f"Run '{self.run_id}' started; continue it with 'tinyagi run --resume {self.run_id}'.")
+        if restored:
+            graph = {task_id: deps.difference(restored) for task_id, deps in graph.items() if task_id not in restored}
+            order = [task_id for task_id in order if task_id not in restored]
+        scheduler = TaskScheduler(graph, order)
+        return tasks, scheduler, ChainMap(restored, self.task_results), templates
+
+    def _restore_run(self, tasks, graph, order):
+        """
+        Load the outputs a resumed run already produced. A task is restored if its last journaled
+        state is succeeded, its configuration is unchanged, and every task it depends on is
+        restored too; anything downstream of a task that runs again runs again as well.
+
+        :return: Dictionary mapping restored task ids to their outputs.
+        """
+        completed = self.journal.completed(self.run_id)
+        by_id = {task.get('task_id'): task for task in tasks}
+        restored = {}
+        # Walk the graph in dependency order so each task is checked after its dependencies.
+        walk = TaskScheduler(graph, order)
+        ready = walk.pop_ready()
+        while ready:
+            for task_id in ready:
+                entry = completed.get(task_id)
+                if (entry is not None and entry[1] == self._fingerprint(by_id[task_id])
+                        and all(dep in restored for dep in graph[task_id])):
+                    restored[task_id] = entry[0]
+                walk.finish(task_id)
+            ready = walk.pop_ready()
+        logger.info(f"Resuming run '{self.run_id}': restored {len(restored)} of {len(tasks)} tasks.")
+        return restored
+
+    @staticmethod
+    def _fingerprint(task):
+        """Hash of a task's configuration, to tell whether a journaled output still applies."""
+        return cache_key('task-config-v1', task)
+
+    def _journal_state(self, task_id, state):
+        """Record a task state change in the journal, if there is one."""
+        if self.journal is None:
+            return
+        try:
+            self.journal.record(self.run_id, task_id, state)
+        except Exception as e:
+            logger.error(f"Could not journal task '{task_id}': {e}")
+
+    def _journal_result(self, task, succeeded, response):
+        """Record how a task ended. A streamed result is recorded once its stream ends."""
+        if self.journal is None:
+            return
+        task_id = task.get('task_id')
+        if not succeeded:
+            self._journal_state(task_id, FAILED)
+        elif isinstance(response, TaskStream):
+            response.add_done_callback(lambda stream: self._journal_result(
+                task, stream.error is None, stream.text() if stream.error is None else None))
+        else:
+            try:
+                self.journal.record(self.run_id, task_id, SUCCEEDED, response, self._fingerprint(task))
+            except Exception as e:
+                logger.error(f"Could not journal task '{task_id}': {e}")
+
+    def _commit_results(self, tasks, results):
+        """Copy this run's outputs into task_results in configuration order, waiting for streams to end."""
+        succeeded = 0
+        for task in tasks:
             task_id = task.get('task_id')
-            plugin_name = task.get('plugin')
-            agent_name = task.get('agent')  # Specify which agent to use
-            tool_name = task.get('tool')    # Specify which tool to use (optional)
-            input_data = self._resolve_inputs(task.get('input', {}))
-            output_config = task.get('output', {})
-            options = task.get('options', {})
-
-            if plugin_name:
-                logger.info(f"Executing task: {task_id} using plugin: {plugin_name}, agent: {agent_name}, tool: {tool_name}")
-
-                # Validate plugin
-                if plugin_name not in self.plugin_manager.loaded_plugins:
-                    logger.error(f"Plugin '{plugin_name}' not found. Skipping task '{task_id}'.")
-                    continue
-                plugin = self.plugin_manager.get_plugin(plugin_name)
-
-                # Validate agent
-                agent = self.agent_manager.get_agent(agent_name)
-                if not agent:
-                    logger.error(f"Agent '{agent_name}' not found. Skipping task '{task_id}'.")
-                    continue
-
-                # Validate tool if specified
-                tool = None
-                if tool_name:
-                    tool = self.tool_manager.get_tool(tool_name)
-                    if not tool:
-                        logger.error(f"Tool '{tool_name}' not found. Skipping task '{task_id}'.")
+            if task_id in results.maps[0]:
+                value = results.maps[0][task_id]
+                if isinstance(value, TaskStream):
+                    value.wait()
+                    if value.error is not None:
                         continue
+                    value = value.text()
+                self.task_results.pop(task_id, None)
+                self.task_results[task_id] = value
+                succeeded += 1
+        if self.journal is not None:
+            self.journal.finish_run(self.run_id, succeeded, len(tasks))
+        if self.result_cache is not None:
+            try:
+                stats = self.result_cache.stats()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read task cache statistics: {e}")
+                return
+            logger.info(f"Task cache: {stats['hits']} hits, {stats['misses']} misses, {stats['writes']} writes, "
+                        f"{stats['evictions']} evictions; {stats['entries']} entries, {stats['bytes']} bytes.")
 
-                # Execute the plugin with the specified agent and tool
-                try:
-                    # Generic plugin execution
-                    response = plugin.execute(
-                        agent=agent,
-                        tool=tool,
-                        input_data=input_data,
-                        options=options,
-                        stream=options.get('stream', False)
-                    )
-                    print(f"\nTask: {task_id} - Response:\n{response}\n")
-
-                    # Store the result for potential use in subsequent tasks
-                    self.task_results[task_id] = response
-
-                    # Save the output if configured
-                    if output_config:
-                        self.save_output(response, output_config)
+    def _cache_key(self, task, input_data):
+        """
+        Compute the result cache key of a task: a hash of the plugin, agent and tool
+        configurations (including the agent's model and parameters), the resolved
+        input and the options. Upstream outputs are part of the resolved input, so a
+        change invalidates the task and everything downstream of it.
+
+        :param task: The task configuration.
+        :param input_data: The task input with placeholders resolved.
+        :return: The key, or None if the task's result must not be cached.
+        """
+        options = task.get('options', {})
+        if self.result_cache is None or not task.get('cache', True) or options.get('stream', False):
+            return None
+        if contains_stream(input_data):
+            return None
+        return cache_key(
+            'task-result-v1',
+            self._component_entry(getattr(self.plugin_manager, 'plugins_config', None), task.get('plugin')),
+            self._component_entry(getattr(self.agent_manager, 'agents_config', None), task.get('agent')),
+            self._component_entry(getattr(self.tool_manager, 'tools_config', None), task.get('tool')),
+            input_data,
+            options
+        )
+
+    @staticmethod
+    def _component_entry(configs, name):
+        """Return the configuration entry of a named component, or just the name if it has none."""
+        if name and isinstance(configs, list):
+            for entry in configs:
+                if isinstance(entry, dict) and entry.get('name') == name:
+                    # How long loading may take, or how many calls may run at once, does not
+                    # affect what the component computes.
+                    return {k: v for k, v in entry.items() if k not in ('load_timeout', 'max_in_flight')}
+        return name
+
+    def _cached_result(self, task, input_data):
+        """
+        Look a task's result up in the result cache. A cache that cannot be read counts as a miss.
+
+        :return: Tuple of (key, found, value). key is None if the task is not cached.
+        """
+        key = self._cache_key(task, input_data)
+        if key is None or self.force:
+            return key, False, None
+        try:
+            found, value = self.result_cache.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read the task cache for '{task.get('task_id')}': {e}. Running it uncached.")
+            return key, False, None
+        if found:
+            logger.info(f"Task '{task.get('task_id')}' is up to date; using the cached result.")
+        return key, found, value
+
+    def _cache_result(self, key, response, label):
+        """Store a result in the result cache. A cache that cannot be written is logged and skipped."""
+        if key is None:
+            return
+        try:
+            self.result_cache.put(key, response, label)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not cache the result of '{label}': {e}")
+
+    def _get_components(self, task):
+        """
+        Look up the plugin, agent and tool a task needs, logging why a task has to be skipped.
+
+        :param task: The task configuration.
+        :return: Tuple of (plugin, agent, tool), or None if the task cannot run.
+        """
+        task_id = task.get('task_id')
+        plugin_name = task.get('plugin')
+        agent_name = task.get('agent')  # Specify which agent to use
+        tool_name = task.get('tool')    # Specify which tool to use (optional)
+
+        if not plugin_name:
+            return None
+
+        logger.info(f"Executing task: {task_id} using plugin: {plugin_name}, agent: {agent_name}, tool: {tool_name}")
+
+        # Validate plugin
+        plugin = self.plugin_manager.get_plugin(plugin_name)
+        if not plugin:
+            logger.error(f"Plugin '{plugin_name}' not found. Skipping task '{task_id}'.")
+            return None
+
+        # Validate agent
+        agent = self.agent_manager.get_agent(agent_name)
+        if not agent:
+            logger.error(f"Agent '{agent_name}' not found. Skipping task '{task_id}'.")
+            return None
+
+        # Validate tool if specified
+        tool = None
+        if tool_name:
+            tool = self.tool_manager.get_tool(tool_name)
+            if not tool:
+                logger.error(f"Tool '{tool_name}' not found. Skipping task '{task_id}'.")
+                return None
+        return plugin, agent, tool
+
+    def _open_sinks(self, task):
+        """Build the sinks a task's result goes to: the console unless quiet, and those of its 'output'."""
+        sinks = create_sinks(task.get('task_id'), task.get('output'))
+        if not self.quiet:
+            sinks.insert(0, ConsoleSink(task.get('task_id')))
+        return sinks
+
+    @staticmethod
+    def _write_sinks(sinks, method, *args):
+        """Call a method on every sink; a failing sink is logged and does not affect the others."""
+        for sink in sinks:
+            try:
+                getattr(sink, method)(*args)
+            except Exception as e:
+                logger.error(f"Error writing output of task '{sink.task_id}' ({type(sink).__name__}): {e}")
+
+    def _finish_task(self, task, response):
+        """Report a task's response and write it to the task's output sinks."""
+        with self._trace('save', task.get('task_id')):
+            sinks = self._open_sinks(task)
+            self._write_sinks(sinks, 'write', response)
+            self._write_sinks(sinks, 'close')
+
+    def _trace(self, name, task_id, **args):
+        """Context manager recording a span if the run is traced."""
+        if self.tracer is None:
+            return nullcontext(args)
+        return self.tracer.span(name, task_id, **args)
+
+    def _trace_now(self):
+        return self.tracer.now() if self.tracer is not None else None
+
+    def _trace_queue(self, task_id, queued_at):
+        """Record how long a task waited between being ready and starting to run."""
+        if self.tracer is not None and queued_at is not None:
+            self.tracer.add_span('queue', task_id, queued_at, self.tracer.now())
+
+    def _trace_stream(self, task_id, stream):
+        """Record the first and last chunk of a streamed result, and the stream's chunk rate."""
+        tracer = self.tracer
+        started = self._plugin_started.get(task_id, tracer.now())
+        seen = {'first': None, 'chunks': 0}
+
+        def on_chunk(chunk):
+            if seen['first'] is None:
+                seen['first'] = tracer.instant('first_chunk', task_id)
+            seen['chunks'] += 1
+
+        def on_done(stream):
+            last = tracer.instant('last_chunk', task_id)
+            first, chunks = seen['first'], seen['chunks']
+            ttft = first - started if first is not None else None
+            rate = (chunks - 1) / (last - first) if chunks > 1 and last > first else None
+            tracer.add_span('stream', task_id, started, last, ttft_s=ttft, chunks=chunks, chunks_per_s=rate,
+                            **({'error': str(stream.error)} if stream.error is not None else {}))
+
+        stream.subscribe(on_chunk)
+        stream.add_done_callback(on_done)
+
+    def _handle_response(self, task, key, response):
+        """
+        Cache and report a plugin's response. A stream is wrapped in a TaskStream and
+        reported once it ends.
+
+        :param task: The task configuration.
+        :param key: The task's result cache key, or None.
+        :param response: The plugin's response.
+        :return: The task result: the response, or a TaskStream.
+        """
+        if is_stream(response):
+            response = TaskStream(response, task.get('task_id'))
+        if isinstance(response, TaskStream):
+            if self.tracer is not None:
+                self._trace_stream(task.get('task_id'), response)
+            # Sinks receive the chunks as they arrive, so a failed stream leaves its partial output.
+            sinks = self._open_sinks(task)
+            if sinks:
+                response.subscribe(lambda chunk: self._write_sinks(sinks, 'write_chunk', chunk))
+            response.add_done_callback(lambda stream: self._write_sinks(sinks, 'close', stream.error))
+            return response
+        self._cache_result(key, response, task.get('task_id'))
+        self._finish_task(task, response)
+        return response
+
+    def _stream_inputs(self, task, input_data, components):
+        """
+        Prepare input that contains upstream streams. Plugins that set accepts_stream receive the
+        TaskStreams; for the others each stream is replaced by its full text, waiting for it to end.
+
+        :return: The input data, or None if an upstream stream failed.
+        """
+        if getattr(components[0], 'accepts_stream', False):
+            return input_data
+        try:
+            return resolve_streams(input_data)
+        except RuntimeError as e:
+            logger.error(f"Skipping task '{task.get('task_id')}': {e}")
+            return None
+
+    def _execute_task(self, task, input_data, queued_at=None):
+        """
+        Execute a single task.
+
+        :param task: The task configuration.
+        :param input_data: The task input with placeholders resolved.
+        :param queued_at: When the task became ready, from the tracer's clock.
+        :return: Tuple of (succeeded, response).
+        """
+        self._trace_queue(task.get('task_id'), queued_at)
+        components = None
+        if contains_stream(input_data):
+            components = self._get_components(task)
+            if components is None:
+                return False, None
+            input_data = self._stream_inputs(task, input_data, components)
+            if input_data is None:
+                return False, None
+
+        key, found, cached = self._cached_result(task, input_data)
+        if found:
+            self._finish_task(task, cached)
+            return True, cached
+
+        components = components or self._get_components(task)
+        if components is None:
+            return False, None
+        return self._run_plugin(task, key, components, input_data)
+
+    def _run_plugin(self, task, key, components, input_data):
+        """Run a task's plugin and handle its response. Returns (succeeded, response)."""
+        try:
+            response = self._call_plugin(task, components, input_data)
+            return True, self._handle_response(task, key, response)
+
+        except Exception as e:
+            logger.error(f"Error during task '{task.get('task_id')}' execution: {e}")
+            return False, None
+
+    def _plan_dispatch(self, task_ids, by_id, templates, results):
+        """
+        Resolve the inputs of ready tasks and decide how each is run. Tasks with the same
+        plugin, agent, tool, options and retry policy form a batch (of up to batch_size) when
+        the plugin's supports_batch(agent) returns True. Map tasks, streamed tasks and tasks
+        whose input holds an upstream stream always run on their own.
+
+        Looking components up may build them, so it never happens here: whether a plugin can
+        batch for an agent is remembered per (plugin, agent, tool), and groups whose answer is
+        not known yet are returned as probes. The caller runs _probe_batch_support for them on
+        a worker, then dispatches the group with _group_plan.
+
+        :param task_ids: The ready task ids, in order.
+        :return: Tuple of (plan, probes). plan is a list of (kind, task_ids, args):
+                 ('task', (id,), (task, input_data)), ('map', (id,), (task, compiled)) or
+                 ('batch', ids, (tasks, inputs)). probes is a list of groups of (task, input_data).
+        """
+        plan, probes, groups = [], [], {}
+        for task_id in task_ids:
+            task = by_id[task_id]
+            compiled = templates[task_id]
+            if compiled.map_over is not None:
+                plan.append(('map', (task_id,), (task, compiled)))
+                continue
+            with self._trace('resolve', task_id):
+                input_data = compiled.input.render(results)
+            group = self._batch_group(task, input_data)
+            if group is None:
+                plan.append(('task', (task_id,), (task, input_data)))
+            else:
+                groups.setdefault(group, []).append((task, input_data))
+
+        for members in groups.values():
+            if len(members) > 1 and self._batch_support.get(self._component_names(members[0][0])) is None:
+                probes.append(members)
+            else:
+                plan.extend(self._group_plan(members))
+        return plan, probes
+
+    def _group_plan(self, members):
+        """Split a group of (task, input_data) into batches, or single tasks if its plugin cannot batch."""
+        if len(members) < 2 or not self._batch_support.get(self._component_names(members[0][0])):
+            return [('task', (task.get('task_id'),), (task, input_data)) for task, input_data in members]
+        plan = []
+        for start in range(0, len(members), self.batch_size):
+            chunk = members[start:start + self.batch_size]
+            if len(chunk) == 1:
+                plan.append(('task', (chunk[0][0].get('task_id'),), chunk[0]))
+                continue
+            tasks = [task for task, _ in chunk]
+            plan.append(('batch', tuple(task.get('task_id') for task in tasks),
+                         (tasks, [input_data for _, input_data in chunk])))
+        return plan
+
+    def _batch_group(self, task, input_data):
+        """Return the key of the batch a task can join, or None if it must run on its own."""
+        options = task.get('options', {})
+        if self.batch_size < 2 or options.get('stream') or contains_stream(input_data):
+            return None
+        return (task.get('plugin'), task.get('agent'), task.get('tool'),
+                json.dumps(options, sort_keys=True, default=str), RetryPolicy.from_task(task))
+
+    @staticmethod
+    def _component_names(task):
+        return task.get('plugin'), task.get('agent'), task.get('tool')
+
+    def _probe_batch_support(self, task):
+        """
+        Look up a task's components (building them if needed) and remember whether its plugin
+        can batch for its agent. Runs on a worker, see _plan_dispatch.
+        """
+        names = self._component_names(task)
+        supported = False
+        try:
+            components = self._get_components(task)
+            if components is not None:
+                plugin, agent, _ = components
+                supports = getattr(plugin, 'supports_batch', None)
+                supported = callable(supports) and supports(agent) is True
+        except Exception as e:
+            logger.error(f"Could not check batch support of '{names[0]}' for agent '{names[1]}': {e}")
+        self._batch_support[names] = supported
+        return supported
+
+    def _execute_batch(self, tasks, inputs, queued_at=None):
+        """
+        Execute several tasks with one batched plugin call and fan the results back out.
+        Cached results are reused per task. If the batched call fails, or returns the wrong
+        number of results, each task is run on its own instead.
+
+        :param tasks: The task configurations, sharing plugin, agent and tool.
+        :param inputs: Their resolved inputs, in the same order.
+        :param queued_at: When the tasks became ready, from the tracer's clock.
+        :return: List of (succeeded, response) tuples, one per task.
+        """
+        components = self._get_components(tasks[0])
+        if components is None:
+            return [(False, None)] * len(tasks)
+        outcomes = [None] * len(tasks)
+        pending = []
+        for index, (task, input_data) in enumerate(zip(tasks, inputs)):
+            self._trace_queue(task.get('task_id'), queued_at)
+            key, found, cached = self._cached_result(task, input_data)
+            if found:
+                self._finish_task(task, cached)
+                outcomes[index] = (True, cached)
+            else:
+                pending.append((index, key))
+
+        if len(pending) > 1:
+            lead = tasks[pending[0][0]]
+            batch_task = {k: v for k, v in lead.items() if k not in ('task_id', 'input', 'output')}
+            batch_task['task_id'] = f"{lead.get('task_id')}+{len(pending) - 1}"
+            try:
+                responses = self._call_plugin(batch_task, components, [inputs[i] for i, _ in pending], batch=True)
+                if len(responses) != len(pending):
+                    raise ValueError(f"expected {len(pending)} results, got {len(responses)}")
+            except Exception as e:
+                logger.warning(f"Batched call for {len(pending)} '{lead.get('plugin')}' tasks failed ({e}); "
+                               f"running them one by one.")
+            else:
+                logger.info(f"Ran {len(pending)} '{lead.get('plugin')}' tasks in one batched call.")
+                for (index, key), response in zip(pending, responses):
+                    outcomes[index] = (True, self._handle_response(tasks[index], key, response))
+                return outcomes
+
+        for index, key in pending:
+            outcomes[index] = self._run_plugin(tasks[index], key, components, inputs[index])
+        return outcomes
+
+    def _call_plugin(self, task, components, input_data, batch=False):
+        """
+        Run a task's plugin. Every plugin invocation, including the items and reduce step
+        of map tasks, goes through here.
+
+        Each attempt may take up to the task's 'timeout_s' seconds, and a failed attempt is
+        retried up to 'retries' times, 'backoff' * 2**attempt seconds apart (see RetryPolicy).
+        Calls to an agent with 'max_in_flight' in its configuration wait for a free slot.
 
+        :param task: The task configuration (provides options and the retry policy).
+        :param components: Tuple of (plugin, agent, tool).
+        :param input_data: The resolved input, or with batch a list of inputs.
+        :param batch: If True, call the plugin's execute_batch with a list of inputs.
+        :return: The plugin's response (a list of responses with batch).
+        :raises Exception: The error of the last attempt, TaskTimeoutError if it timed out.
+        """
+        components = self._traced_components(task, components)
+        policy = RetryPolicy.from_task(task)
+        for attempt in range(policy.retries + 1):
+            try:
+                with self._trace('plugin', task.get('task_id'), attempt=attempt + 1):
+                    return self._call_plugin_once(task, components, input_data, policy.timeout_s, batch)
+            except Exception as e:
+                if attempt == policy.retries:
+                    raise
+                delay = policy.delay(attempt)
+                logger.warning(f"Task '{task.get('task_id')}' failed (attempt {attempt + 1} of "
+                               f"{policy.retries + 1}): {e}. Retrying in {delay:g}s.")
+                time.sleep(delay)
+
+    def _traced_components(self, task, components):
+        """With tracing, wrap the agent and tool so their calls are recorded as spans."""
+        if self.tracer is None:
+            return components
+        plugin, agent, tool = components
+        task_id = task.get('task_id')
+        self._plugin_started[task_id] = self.tracer.now()
+        return plugin, self.tracer.wrap(agent, 'agent', task_id), self.tracer.wrap(tool, 'tool', task_id)
+
+    def _call_plugin_once(self, task, components, input_data, timeout=None, batch=False):
+        """
+        Make one plugin call, holding a slot of the task's agent while it runs. A streamed
+        response keeps the slot until it has been read to its end, and a call that times
+        out keeps it until the abandoned call returns. Waiting for a free slot counts
+        against the timeout.
+        """
+        plugin, agent, tool = components
+        options = task.get('options', {})
+
+        def execute():
+            if batch:
+                return plugin.execute_batch(agent=agent, tool=tool, inputs=input_data, options=options)
+            return plugin.execute(
+                agent=agent,
+                tool=tool,
+                input_data=input_data,
+                options=options,
+                stream=options.get('stream', False)
+            )
+
+        slot = self._agent_limits.get(task.get('agent'))
+        if slot is None:
+            return call_with_timeout(execute, timeout, task.get('task_id'), self._discard_abandoned)
+
+        def release_abandoned(future):
+            self._discard_abandoned(future)
+            slot.release()
+
+        started = time.monotonic()
+        if not slot.acquire(timeout=timeout):
+            raise TaskTimeoutError(f"'{task.get('task_id')}' found no free slot of agent "
+                                   f"'{task.get('agent')}' within {timeout}s.")
+        if timeout is not None:
+            timeout = max(0.0, timeout - (time.monotonic() - started))
+        try:
+            response = call_with_timeout(execute, timeout, task.get('task_id'), release_abandoned)
+        except TaskTimeoutError:
+            raise
+        except BaseException:
+            slot.release()
+            raise
+        response, held = hold_until_consumed(response, slot.release)
+        if not held:
+            slot.release()
+        return response
+
+    @staticmethod
+    def _discard_abandoned(future):
+        """Close the stream returned by a plugin call that timed out, if any."""
+        if future.exception() is None:
+            close = getattr(future.result(), 'close', None)
+            if callable(close):
+                close()
+
+    def _map_items(self, task, items):
+        """
+        Check the value a map task maps over. JSON text is parsed and a stream is read to its end.
+
+        :return: The list of items, or None if the value is not a list.
+        """
+        if isinstance(items, TaskStream):
+            items = items.text()
+        if isinstance(items, str):
+            try:
+                items = json.loads(items)
+            except ValueError:
+                pass
+        if not isinstance(items, list):
+            logger.error(f"Task '{task.get('task_id')}' can only map over a list, got {type(items).__name__}.")
+            return None
+        return items
+
+    def _run_map_item(self, task, components, compiled, results, index, item):
+        """Run a map task's plugin on one item, with result caching. Streams are read to their end."""
+        with self._trace('resolve', task.get('task_id'), index=index):
+            input_data = resolve_streams(compiled.input.render(results, {'item': item, 'index': index}))
+        key, found, cached = self._cached_result(task, input_data)
+        if found:
+            return cached
+        response = self._call_plugin(task, components, input_data)
+        if is_stream(response):
+            response = ''.join(str(chunk) for chunk in response)
+        self._cache_result(key, response, f"{task.get('task_id')}[{index}]")
+        return response
+
+    def _execute_map_task(self, task, compiled, results, queued_at=None):
+        """
+        Execute a map task: run its plugin on every item of the list given by 'map_over',
+        on up to 'max_concurrency' threads (default max_workers). The input template can use
+        {{item}} and {{index}}. The result is the list of item results, in item order, or,
+        with a 'reduce' step, the output of the reduce plugin run on that list.
+
+        'on_item_error' decides what a failed item does: 'fail' (default) fails the task,
+        'skip' leaves the item out of the results and 'null' puts None in its place.
+
+        :param task: The task configuration.
+        :param compiled: The task's CompiledTask.
+        :param results: Outputs of the tasks run so far.
+        :param queued_at: When the task became ready, from the tracer's clock.
+        :return: Tuple of (succeeded, response).
+        """
+        task_id = task.get('task_id')
+        self._trace_queue(task_id, queued_at)
+        try:
+            with self._trace('resolve', task_id):
+                items = self._map_items(task, compiled.map_over.render(results))
+        except RuntimeError as e:
+            logger.error(f"Skipping task '{task_id}': {e}")
+            return False, None
+        if items is None:
+            return False, None
+        components = self._get_components(task)
+        if components is None:
+            return False, None
+
+        policy = task.get('on_item_error', 'fail')
+        workers = max(1, min(task.get('max_concurrency') or self.max_workers, len(items) or 1))
+        outputs = [None] * len(items)
+        failed = set()
+        logger.info(f"Mapping task '{task_id}' over {len(items)} items on {workers} threads.")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'map-{task_id}') as executor:
+            futures = {executor.submit(self._run_map_item, task, components, compiled, results, index, item): index
+                       for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    outputs[index] = future.result()
                 except Exception as e:
-                    logger.error(f"Error during task '{task_id}' execution: {e}")
+                    logger.error(f"Item {index} of task '{task_id}' failed: {e}")
+                    failed.add(index)
+                    if policy == 'fail':
+                        for pending in futures:
+                            pending.cancel()
+                        break
+        if failed and policy == 'fail':
+            return False, None
+        if policy == 'skip':
+            outputs = [output for index, output in enumerate(outputs) if index not in failed]
 
-    def save_output(self, data, output_config):
+        response = outputs
+        if task.get('reduce'):
+            try:
+                response = self._reduce(task, compiled, results, outputs)
+            except Exception as e:
+                logger.error(f"Reduce step of task '{task_id}' failed: {e}")
+                return False, None
+        self._finish_task(task, response)
+        return True, response
+
+    def _reduce(self, task, compiled, results, outputs):
+        """
+        Run a map task's reduce step. 'reduce' names the plugin and, optionally, the agent,
+        tool, options and an input template, which defaults to {"items": "{{items}}"}.
+
+        :return: The reduce plugin's response.
+        :raises ValueError: If a component of the reduce step is not available.
+        """
+        reduce = task['reduce']
+        reduce_task = {
+            'task_id': f"{task.get('task_id')}.reduce",
+            'plugin': reduce.get('plugin'),
+            'agent': reduce.get('agent', task.get('agent')),
+            'tool': reduce.get('tool'),
+            'options': reduce.get('options', {}),
+            'cache': task.get('cache', True)
+        }
+        for key in ('timeout_s', 'retries', 'backoff'):
+            if key in reduce or key in task:
+                reduce_task[key] = reduce.get(key, task.get(key))
+        input_data = compiled.reduce.render(results, {'items': outputs})
+        key, found, cached = self._cached_result(reduce_task, input_data)
+        if found:
+            return cached
+        components = self._get_components(reduce_task)
+        if components is None:
+            raise ValueError("its plugin, agent or tool is not available")
+        response = self._call_plugin(reduce_task, components, input_data)
+        if is_stream(response):
+            response = ''.join(str(chunk) for chunk in response)
+        self._cache_result(key, response, reduce_task['task_id'])
+        return response
+
+    def save_output(self, data, output_config, task_id=None):
         """
         Save the output data based on the output configuration.
 
         :param data: Data to save.
-        :param output_config: Dictionary containing output configuration.
+        :param output_config: The 'output' configuration: one sink entry or a list of them (see create_sinks).
+        :param task_id: Id of the task the data belongs to, for sinks that record it.
         """
-        if output_config.get('save_to_file', False):
-            try:
-                file_path = output_config.get('file_path', 'output.json')
-                # Ensure the output directory exists
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    # Check if data is already a JSON string, otherwise dump it
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                logger.info(f"Output saved to '{file_path}'.")
-            except Exception as e:
-                logger.error(f"Error saving output to file: {e}")
+        sinks = create_sinks(task_id, output_config)
+        self._write_sinks(sinks, 'write', data)
+        self._write_sinks(sinks, 'close')
 
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
@@ -0,0 +1,243 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/task_policy.py
+
+import asyncio
+import logging
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+class TaskTimeoutError(TimeoutError):
+    """Raised when a plugin call takes longer than its task's timeout_s."""
+
+class RetryPolicy(namedtuple('RetryPolicy', 'timeout_s retries backoff')):
+    """
+    How a task's plugin calls are bounded and retried: each attempt may take up to
+    timeout_s seconds (None for no limit), and a failed attempt is retried up to
+    retries times, waiting backoff * 2**attempt seconds in between.
+    """
+    @classmethod
+    def from_task(cls, task):
+        """
+        Read the policy from a task's 'timeout_s', 'retries' and 'backoff' keys.
+
+        :param task: The task configuration.
+        :return: A RetryPolicy.
+        """
+        return cls(task.get('timeout_s'), max(0, task.get('retries', 0)), max(0.0, task.get('backoff', 1.0)))
+
+    def delay(self, attempt):
+        """Seconds to wait after the given failed attempt (0-based)."""
+        return self.backoff * (2 ** attempt)
+
+class AgentSlot:
+    """
+    Counts the free slots of one agent. Threads and asyncio tasks wait in one FIFO queue,
+    and a waiting coroutine holds no thread: its slot is handed over on its own loop.
+    """
+    def __init__(self, limit):
+        """
+        Initialize the AgentSlot.
+
+        :param limit: Maximum number of concurrent holders.
+        """
+        self.limit = limit
+        self._free = limit
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking=True, timeout=None):
+        """
+        Take a slot, waiting for one if necessary.
+
+        :param blocking: If False, return at once when no slot is free.
+        :param timeout: Seconds to wait at most, or None to wait indefinitely.
+        :return: True if a slot was taken.
+        """
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return True
+            if not blocking:
+                return False
+            granted = threading.Event()
+            self._waiters.append(granted)
+        if granted.wait(timeout):
+            return True
+        with self._lock:
+            if granted.is_set():
+                return True
+            self._waiters.remove(granted)
+            return False
+
+    async def acquire_async(self):
+        """Take a slot from a coroutine, waiting on the running loop. Cancelling the wait gives up its turn."""
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            granted = asyncio.get_running_loop().create_future()
+            self._waiters.append(granted)
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                if granted in self._waiters:
+                    self._waiters.remove(granted)
+                    raise
+            # Already handed over: either _grant will find the future cancelled and pass the
+            # slot on, or the slot was granted before the cancellation and is ours to return.
+            if not granted.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """Return a slot, handing it to the longest waiting thread or coroutine."""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                try:
+                    waiter.get_loop().call_soon_threadsafe(self._grant, waiter)
+                    return
+                except RuntimeError:
+                    # The waiter's loop is closed.
+                    continue
+            if self._free >= self.limit:
+                raise ValueError("AgentSlot released too many times.")
+            self._free += 1
+
+    def _grant(self, waiter):
+        if waiter.done():
+            self.release()
+        else:
+            waiter.set_result(None)
+
+class AgentLimits:
+    """
+    Per-agent caps on concurrent plugin calls, read from the 'max_in_flight' key of each
+    agent's configuration entry. Agents without the key are not limited.
+    """
+    def __init__(self, agents_config):
+        """
+        Initialize the AgentLimits.
+
+        :param agents_config: List of agent configuration entries.
+        """
+        self._limits = {}
+        for entry in agents_config if isinstance(agents_config, list) else []:
+            if isinstance(entry, dict) and entry.get('max_in_flight'):
+                self._limits[entry.get('name')] = AgentSlot(entry['max_in_flight'])
+
+    def get(self, agent_name):
+        """
+        :param agent_name: The agent's name.
+        :return: The agent's AgentSlot, or None if it is not limited.
+        """
+        return self._limits.get(agent_name)
+
+def call_with_timeout(fn, timeout, name, on_abandoned=None):
+    """
+    Call fn() and wait at most timeout seconds for it. Python cannot interrupt a thread,
+    so a call that times out is abandoned: it keeps running on a daemon thread, and
+    on_abandoned (if given) is called with its Future once it eventually ends.
+
+    :param fn: Callable taking no arguments.
+    :param timeout: Seconds to wait, or None to call fn directly.
+    :param name: Name used for the thread and in the error message.
+    :param on_abandoned: Optional callable taking the Future of a call that timed out.
+    :return: fn's return value.
+    :raises TaskTimeoutError: If fn did not return in time.
+    """
+    if timeout is None:
+        return fn()
+
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f'call-{name}', daemon=True).start()
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        if on_abandoned is not None:
+            future.add_done_callback(on_abandoned)
+        raise TaskTimeoutError(f"'{name}' did not finish within {timeout}s.") from None
+
+async def run_in_thread(fn, *args, **kwargs):
+    """
+    Call fn in a worker thread. A thread cannot be interrupted, so if the awaiting task is
+    cancelled this still waits for fn to return before raising CancelledError; whatever is
+    held for the call (such as an agent slot) stays held until the work is really done.
+
+    :param fn: The callable.
+    :return: fn's return value.
+    """
+    call = asyncio.ensure_future(asyncio.to_thread(fn, *args, **kwargs))
+    try:
+        return await asyncio.shield(call)
+    except asyncio.CancelledError:
+        while not call.done():
+            try:
+                await asyncio.wait({call})
+            except asyncio.CancelledError:
+                pass
+        raise
+
+def hold_until_consumed(response, release):
+    """
+    Keep a slot held while a streamed response is being read.
+
+    :param response: A plugin response.
+    :param release: Callable releasing the slot.
+    :return: Tuple of (response, held). If the response is a stream, it is wrapped so that
+             release runs when the stream ends and held is True; otherwise held is False.
+    """
+    if isinstance(response, Iterator):
+        return _release_after(response, release), True
+    if hasattr(response, '__anext__'):
+        return _release_after_async(response, release), True
+    return response, False
+
+def _release_after(chunks, release):
+    try:
+        yield from chunks
+    finally:
+        release()
+
+async def _release_after_async(chunks, release):
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        release()
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
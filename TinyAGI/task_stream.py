@@ -0,0 +1,232 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/task_stream.py
+
+import asyncio
+import logging
+import threading
+from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+class TaskStream:
+    """
+    A streamed task result that several consumers can read at the same time.
+
+    The source is drained in the background into a buffer as chunks arrive.
+    Every iteration over the stream starts at the first chunk, replays what is
+    buffered and then waits for more, so downstream tasks, output saving and
+    printing each see the whole stream without racing for chunks. text()
+    waits for the end and returns the chunks joined together.
+    """
+    def __init__(self, source=None, task_id=None):
+        """
+        Initialize the TaskStream.
+
+        :param source: Iterator (or async iterator) of chunks, drained on a background thread.
+                       Pass None and call pump_async to feed the stream from the caller's event loop.
+        :param task_id: Id of the task producing the stream, used in log messages.
+        """
+        self.task_id = task_id
+        self.error = None
+        self._chunks = []
+        self._done = False
+        self._callbacks = []
+        self._listeners = []
+        self._cond = threading.Condition()
+        self._settled = threading.Event()
+        if source is not None:
+            threading.Thread(target=self._pump, args=(source,), name=f'stream-{task_id}', daemon=True).start()
+
+    @property
+    def done(self):
+        """True once the source is exhausted (or failed)."""
+        return self._done
+
+    def _put(self, chunk):
+        with self._cond:
+            self._chunks.append(chunk)
+            listeners = self._listeners
+            self._cond.notify_all()
+        for listener in listeners:
+            self._run_listener(listener, chunk)
+
+    def _close(self, error=None):
+        if error is not None:
+            logger.error(f"Stream of task '{self.task_id}' failed: {error}")
+        with self._cond:
+            self.error = error
+            self._done = True
+            callbacks, self._callbacks = self._callbacks, []
+            self._cond.notify_all()
+        for callback in callbacks:
+            self._run_callback(callback)
+        self._settled.set()
+
+    def _pump(self, source):
+        if hasattr(source, '__anext__'):
+            asyncio.run(self.pump_async(source))
+            return
+        try:
+            for chunk in source:
+                self._put(chunk)
+        except Exception as e:
+            self._close(e)
+        else:
+            self._close()
+
+    async def pump_async(self, source):
+        """
+        Drain an async iterator into the stream.
+
+        :param source: Async iterator of chunks.
+        """
+        try:
+            async for chunk in source:
+                self._put(chunk)
+        except Exception as e:
+            self._close(e)
+        except asyncio.CancelledError as e:
+            self._close(e)
+            raise
+        else:
+            self._close()
+
+    def _run_callback(self, callback):
+        try:
+            callback(self)
+        except Exception as e:
+            logger.error(f"Error in completion callback of stream '{self.task_id}': {e}")
+
+    def _run_listener(self, listener, chunk):
+        try:
+            listener(chunk)
+        except Exception as e:
+            logger.error(f"Error in chunk listener of stream '{self.task_id}': {e}")
+
+    def subscribe(self, listener):
+        """
+        Call listener(chunk) for every chunk, on the thread feeding the stream, as chunks arrive.
+        Chunks received before subscribing are passed first, in order.
+
+        :param listener: Callable taking a chunk.
+        """
+        with self._cond:
+            for chunk in self._chunks:
+                self._run_listener(listener, chunk)
+            if not self._done:
+                self._listeners = self._listeners + [listener]
+
+    def add_done_callback(self, callback):
+        """
+        Call callback(stream) once the stream has ended. Runs immediately if it already has.
+
+        :param callback: Callable taking the TaskStream.
+        """
+        with self._cond:
+            if not self._done:
+                self._callbacks.append(callback)
+                return
+        self._run_callback(callback)
+
+    def __iter__(self):
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self._chunks) and not self._done:
+                    self._cond.wait()
+                if index < len(self._chunks):
+                    chunk = self._chunks[index]
+                elif self.error is not None:
+                    raise RuntimeError(f"Stream of task '{self.task_id}' failed: {self.error}") from self.error
+                else:
+                    return
+            index += 1
+            yield chunk
+
+    async def __aiter__(self):
+        chunks = iter(self)
+        end = object()
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, end)
+            if chunk is end:
+                return
+            yield chunk
+
+    def text(self, timeout=None):
+        """
+        Wait for the stream to end and return its chunks joined as a string.
+
+        :param timeout: Seconds to wait. None waits indefinitely.
+        :return: The full text.
+        :raises RuntimeError: If the source failed.
+        :raises TimeoutError: If the stream did not end in time.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._done, timeout):
+                raise TimeoutError(f"Stream of task '{self.task_id}' did not finish in time.")
+            if self.error is not None:
+                raise RuntimeError(f"Stream of task '{self.task_id}' failed: {self.error}") from self.error
+            return ''.join(str(chunk) for chunk in self._chunks)
+
+    def wait(self, timeout=None):
+        """
+        Wait until the stream has ended and its completion callbacks have run.
+
+        :param timeout: Seconds to wait. None waits indefinitely.
+        :return: True if the stream settled in time.
+        """
+        return self._settled.wait(timeout)
+
+    def __str__(self):
+        return self.text()
+
+def is_stream(value):
+    """Return True if a plugin returned a stream of chunks rather than a finished result."""
+    if isinstance(value, TaskStream):
+        return False
+    return isinstance(value, Iterator) or hasattr(value, '__anext__')
+
+def contains_stream(data):
+    """Return True if task input data contains a TaskStream."""
+    if isinstance(data, TaskStream):
+        return True
+    if isinstance(data, dict):
+        return any(contains_stream(v) for v in data.values())
+    if isinstance(data, list):
+        return any(contains_stream(v) for v in data)
+    return False
+
+def resolve_streams(data):
+    """
+    Replace every TaskStream in task input data by its full text, waiting for the streams to end.
+
+    :param data: Task input data.
+    :return: The data with streams resolved.
+    """
+    if isinstance(data, TaskStream):
+        return data.text()
+    if isinstance(data, dict):
+        return {k: resolve_streams(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [resolve_streams(v) for v in data]
+    return data
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
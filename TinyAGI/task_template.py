@@ -0,0 +1,286 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/task_template.py
+
+import json
+import logging
+import re
+from .task_stream import TaskStream
+
+logger = logging.getLogger(__name__)
+
+# A placeholder is anything between {{ and }}. Only those that parse as task references are
+# replaced; any other text in braces is kept as it is.
+PLACEHOLDER = re.compile(r'\{\{(.*?)\}\}', re.S)
+
+# tasks.<task_id>.output, or one of the SCOPE_NAMES, then an optional path such as
+# .items[0].title or ["a key"], and an optional default after a '|'.
+REFERENCE = re.compile(
+    r'''^\s*(?:tasks\.(?P<task_id>[^.\s\[\]{}|]+)\.output|(?P<scope>item|index|items)\b)'''
+    r'''(?P<path>(?:\.[^.\s\[\]{}|]+|\[\s*-?\d+\s*\]|\[\s*"[^"]*"\s*\]|\[\s*'[^']*'\s*\])*)'''
+    r'''\s*(?:\|(?P<default>.*))?$''',
+    re.S
+)
+
+# Names bound while rendering map tasks: the current item and its index, and the list of
+# item results for a reduce step.
+SCOPE_NAMES = ('item', 'index', 'items')
+
+PATH_STEP = re.compile(r'''\.([^.\s\[\]{}|]+)|\[\s*(-?\d+)\s*\]|\[\s*"([^"]*)"\s*\]|\[\s*'([^']*)'\s*\]''')
+
+_MISSING = object()
+
+class Template:
+    """
+    Task input compiled once, so that resolving it against task outputs only visits
+    its placeholders. Parts of the input without placeholders are returned as they
+    are, and a value that is exactly one placeholder resolves to the referenced
+    output itself rather than a copy.
+    """
+    references = frozenset()
+
+    def render(self, results, scope=None):
+        """
+        Resolve the template.
+
+        :param results: Mapping of task id to output.
+        :param scope: Optional mapping for {{item}}, {{index}} and {{items}} placeholders (map tasks).
+        :return: The resolved input data.
+        """
+        raise NotImplementedError
+
+class _Constant(Template):
+    def __init__(self, value):
+        self.value = value
+
+    def render(self, results, scope=None):
+        return self.value
+
+class _Reference(Template):
+    def __init__(self, source, task_id, path, default=_MISSING):
+        self.source = source
+        self.task_id = task_id
+        self.path = path
+        self.default = default
+        self.references = frozenset([task_id])
+        self._parsed = (None, None)
+
+    def lookup(self, results, scope=None):
+        """Return the referenced value, or _MISSING."""
+        if self.task_id not in results:
+            return _MISSING
+        return self.follow(results[self.task_id])
+
+    def follow(self, value):
+        """Follow the path into a value. Returns _MISSING if a step does not exist."""
+        if not self.path:
+            return value
+        if isinstance(value, TaskStream):
+            logger.warning(f"Cannot follow '{self.source}' into a streamed output; "
+                           f"run the task without streaming to access its fields.")
+            return _MISSING
+        if isinstance(value, str):
+            # Model output is often JSON text; parse it (once per output) to follow the path.
+            text, parsed = self._parsed
+            if text is not value:
+                try:
+                    parsed = json.loads(value)
+                except ValueError:
+                    parsed = _MISSING
+                self._parsed = (value, parsed)
+            if parsed is _MISSING:
+                return _MISSING
+            value = parsed
+        for step in self.path:
+            try:
+                if isinstance(step, int):
+                    value = value[step]
+                elif isinstance(value, dict):
+                    value = value[step]
+                else:
+                    value = getattr(value, step)
+            except (KeyError, IndexError, TypeError, AttributeError):
+                return _MISSING
+        return value
+
+    def render(self, results, scope=None):
+        value = self.lookup(results, scope)
+        if value is not _MISSING:
+            return value
+        if self.default is not _MISSING:
+            return self.default
+        self.warn_unresolved()
+        return self.source
+
+    def warn_unresolved(self):
+        logger.warning(f"Could not resolve '{self.source}'. Task '{self.task_id}' may not have been executed yet.")
+
+class _ScopeReference(_Reference):
+    def __init__(self, source, name, path, default=_MISSING):
+        super().__init__(source, None, path, default)
+        self.name = name
+        self.references = frozenset()
+
+    def lookup(self, results, scope=None):
+        if not scope or self.name not in scope:
+            return _MISSING
+        return self.follow(scope[self.name])
+
+    def warn_unresolved(self):
+        logger.warning(f"Could not resolve '{self.source}'. '{self.name}' is only set inside map and reduce steps.")
+
+class _Interpolation(Template):
+    def __init__(self, parts):
+        self.parts = parts
+        self.references = frozenset().union(*(p.references for p in parts if isinstance(p, _Reference)))
+
+    def render(self, results, scope=None):
+        values = [part if isinstance(part, str) else part.render(results, scope) for part in self.parts]
+        if any(isinstance(value, TaskStream) for value in values):
+            # Interpolating a stream yields a stream, so consumers still see chunks as they arrive.
+            return TaskStream(_chain(values))
+        return ''.join(to_text(value) for value in values)
+
+class _Dict(Template):
+    def __init__(self, items):
+        self.items = items
+        self.references = frozenset().union(*(t.references for _, t in items))
+
+    def render(self, results, scope=None):
+        return {key: template.render(results, scope) for key, template in self.items}
+
+class _List(Template):
+    def __init__(self, items):
+        self.items = items
+        self.references = frozenset().union(*(t.references for t in items))
+
+    def render(self, results, scope=None):
+        return [template.render(results, scope) for template in self.items]
+
+def to_text(value):
+    """
+    Render a value as text: strings as they are, dicts and lists as JSON, anything else with str().
+
+    :param value: The value to render.
+    :return: The text.
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+def _chain(values):
+    for value in values:
+        if isinstance(value, TaskStream):
+            yield from value
+        else:
+            yield to_text(value)
+
+def _parse_default(text):
+    text = text.strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def _parse_reference(source, body):
+    match = REFERENCE.match(body)
+    if not match:
+        return None
+    path = []
+    for name, index, double_quoted, single_quoted in PATH_STEP.findall(match.group('path')):
+        if index:
+            path.append(int(index))
+        else:
+            path.append(name or double_quoted or single_quoted)
+    default = match.group('default')
+    default = _parse_default(default) if default is not None else _MISSING
+    if match.group('scope'):
+        return _ScopeReference(source, match.group('scope'), tuple(path), default)
+    return _Reference(source, match.group('task_id'), tuple(path), default)
+
+def _compile_string(text):
+    if '{{' not in text:
+        return _Constant(text)
+    parts, position = [], 0
+    for match in PLACEHOLDER.finditer(text):
+        reference = _parse_reference(match.group(0), match.group(1))
+        if reference is None:
+            continue
+        if match.start() > position:
+            parts.append(text[position:match.start()])
+        parts.append(reference)
+        position = match.end()
+    if not parts:
+        return _Constant(text)
+    if position < len(text):
+        parts.append(text[position:])
+    if len(parts) == 1 and isinstance(parts[0], _Reference):
+        return parts[0]
+    return _Interpolation(parts)
+
+class CompiledTask:
+    """
+    The compiled templates of one task: its input, and for map tasks the list to map over
+    and the reduce step's input.
+    """
+    def __init__(self, task):
+        """
+        Initialize the CompiledTask.
+
+        :param task: The task configuration.
+        """
+        self.input = compile_template(task.get('input', {}))
+        self.map_over = compile_template(task['map_over']) if 'map_over' in task else None
+        reduce = task.get('reduce')
+        self.reduce = compile_template(reduce.get('input', {'items': '{{items}}'})) if reduce else None
+        self.references = self.input.references.union(
+            *(t.references for t in (self.map_over, self.reduce) if t is not None))
+
+def compile_template(data):
+    """
+    Compile task input data.
+
+    Placeholders have the form {{tasks.<task_id>.output}}, optionally followed by a path
+    into the output (.field, [index] or ["key"]) and a default after '|', which is parsed
+    as JSON when possible: {{tasks.search.output.items[0].title | "untitled"}}. A string
+    that is a single placeholder resolves to the referenced value; placeholders inside
+    longer strings are interpolated as text. In map tasks, {{item}}, {{index}} and (for
+    the reduce step) {{items}} take the same paths and defaults.
+
+    :param data: Task input data (dict, list, string or scalar).
+    :return: A Template.
+    """
+    if isinstance(data, dict):
+        items = [(key, compile_template(value)) for key, value in data.items()]
+        if all(isinstance(t, _Constant) for _, t in items):
+            return _Constant(data)
+        return _Dict(items)
+    if isinstance(data, list):
+        items = [compile_template(value) for value in data]
+        if all(isinstance(t, _Constant) for t in items):
+            return _Constant(data)
+        return _List(items)
+    if isinstance(data, str):
+        return _compile_string(data)
+    return _Constant(data)
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
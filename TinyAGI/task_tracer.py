@@ -0,0 +1,233 @@
+# MIT License
+# Copyright (c) 2024 Sully Greene
+# Repository: https://github.com/SullyGreene
+# Profile: https://x.com/@SullyGreene
+
+# TinyAGI/task_tracer.py
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Span names recorded by the task engines, in the order of the summary table's columns.
+SPAN_KINDS = ('queue', 'resolve', 'plugin', 'agent', 'tool', 'save')
+
+class TaskTracer:
+    """
+    Collects timed spans of a task run: how long each task waited for a worker, resolved
+    its input, ran its plugin, spent in agent and tool calls, and wrote its output. For
+    streamed results it also records the first and last chunk. The spans export to the
+    Chrome trace-event format (chrome://tracing, Perfetto), one row per task, and a
+    summary table reports per-task timings and the run's critical path.
+    """
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+        self._epoch = time.perf_counter()
+
+    def now(self):
+        """Seconds since the tracer was created."""
+        return time.perf_counter() - self._epoch
+
+    def add_span(self, name, task_id, start, end, **args):
+        """
+        Record a finished span.
+
+        :param name: The span name, e.g. one of SPAN_KINDS.
+        :param task_id: The task it belongs to.
+        :param start: Start time, from now().
+        :param end: End time, from now().
+        :param args: Extra values shown with the span.
+        """
+        with self._lock:
+            self.events.append({'name': name, 'task_id': task_id, 'start': start, 'end': end,
+                                'thread': threading.current_thread().name, 'args': args})
+
+    def instant(self, name, task_id, **args):
+        """Record a point in time, e.g. the first chunk of a stream."""
+        at = self.now()
+        self.add_span(name, task_id, at, None, **args)
+        return at
+
+    @contextmanager
+    def span(self, name, task_id, **args):
+        """
+        Context manager timing the enclosed block as a span.
+
+        :return: Yields the span's args dictionary, so the caller can annotate it.
+        """
+        start = self.now()
+        try:
+            yield args
+        except BaseException as e:
+            args['error'] = str(e) or type(e).__name__
+            raise
+        finally:
+            self.add_span(name, task_id, start, self.now(), **args)
+
+    def wrap(self, component, kind, task_id):
+        """
+        Return a proxy of an agent or tool that records a span for each call of its public methods.
+
+        :param component: The agent or tool (None is returned as is).
+        :param kind: 'agent' or 'tool'.
+        :param task_id: The task making the calls.
+        """
+        return None if component is None else _TracedComponent(component, self, kind, task_id)
+
+    def to_chrome_trace(self, file_path=None):
+        """
+        Export the spans in the Chrome trace-event JSON format. Each task is shown as its own thread.
+
+        :param file_path: If given, the trace is also written to this file.
+        :return: The trace as a dictionary.
+        """
+        with self._lock:
+            events = list(self.events)
+        lanes = {}
+        trace = []
+        for event in events:
+            lane = lanes.setdefault(event['task_id'], len(lanes) + 1)
+            entry = {'name': event['name'], 'cat': 'task', 'pid': 1, 'tid': lane,
+                     'ts': round(event['start'] * 1e6, 3),
+                     'args': dict(event['args'], thread=event['thread'])}
+            if event['end'] is None:
+                entry.update(ph='i', s='t')
+            else:
+                entry.update(ph='X', dur=round((event['end'] - event['start']) * 1e6, 3))
+            trace.append(entry)
+        for task_id, lane in lanes.items():
+            trace.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': lane, 'args': {'name': str(task_id)}})
+        data = {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+        if file_path:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            logger.info(f"Trace saved to '{file_path}'.")
+        return data
+
+    def summary(self, graph=None):
+        """
+        Summarize each task's timings.
+
+        :param graph: Optional dictionary mapping task ids to the ids they depend on, for the critical path.
+        :return: Tuple of (rows, critical_path). Each row is a dictionary with the task id, its start
+                 and end, the summed duration of each SPAN_KINDS span in seconds, 'ttft' (seconds from
+                 the start of the plugin call to the first streamed chunk), 'chunks_per_s' and 'critical'.
+        """
+        with self._lock:
+            events = list(self.events)
+        rows = {}
+        for event in events:
+            row = rows.setdefault(event['task_id'], {'task_id': event['task_id'], 'start': event['start'],
+                                                     'end': event['start'], 'ttft': None, 'chunks_per_s': None,
+                                                     **{kind: 0.0 for kind in SPAN_KINDS}})
+            end = event['end'] if event['end'] is not None else event['start']
+            row['start'] = min(row['start'], event['start'])
+            row['end'] = max(row['end'], end)
+            if event['name'] in SPAN_KINDS and event['end'] is not None:
+                row[event['name']] += event['end'] - event['start']
+            elif event['name'] == 'stream':
+                row['ttft'] = event['args'].get('ttft_s')
+                row['chunks_per_s'] = event['args'].get('chunks_per_s')
+        path = critical_path(rows, graph or {})
+        for row in rows.values():
+            row['critical'] = row['task_id'] in path
+        return sorted(rows.values(), key=lambda r: r['start']), path
+
+    def format_summary(self, graph=None):
+        """
+        Render the summary as a plain-text table, followed by the critical path.
+
+        :param graph: Optional task dependency graph (see summary).
+        :return: The table as a string.
+        """
+        rows, path = self.summary(graph)
+        name_width = max([len(str(r['task_id'])) for r in rows] + [len('task')])
+        columns = SPAN_KINDS + ('total', 'ttft', 'chunks/s')
+        header = f"  {'task':<{name_width}}  " + '  '.join(f"{c + (' (ms)' if c != 'chunks/s' else ''):>11}" for c in columns)
+        lines = [header, '-' * len(header)]
+
+        def ms(value):
+            return f"{value * 1000:>11.1f}" if value is not None else f"{'-':>11}"
+
+        for r in rows:
+            values = [ms(r[kind]) for kind in SPAN_KINDS] + [ms(r['end'] - r['start']), ms(r['ttft'])]
+            values.append(f"{r['chunks_per_s']:>11.1f}" if r['chunks_per_s'] is not None else f"{'-':>11}")
+            marker = '*' if r['critical'] else ' '
+            lines.append(f"{marker} {str(r['task_id']):<{name_width}}  " + '  '.join(values))
+        lines.append('-' * len(header))
+        if path:
+            by_id = {r['task_id']: r for r in rows}
+            span = by_id[path[-1]]['end'] - by_id[path[0]]['start']
+            lines.append(f"Critical path (*): {' -> '.join(str(t) for t in path)} ({span * 1000:.1f} ms)")
+        return '\n'.join(lines)
+
+def critical_path(rows, graph):
+    """
+    Find the chain of tasks that determined when the run ended: start from the task that
+    finished last and repeatedly step to the dependency that finished last.
+
+    :param rows: Dictionary mapping task id to a row with 'end'.
+    :param graph: Dictionary mapping task ids to the ids they depend on.
+    :return: List of task ids, first to last.
+    """
+    if not rows:
+        return []
+    task_id = max(rows, key=lambda t: rows[t]['end'])
+    path = [task_id]
+    while True:
+        deps = [dep for dep in graph.get(task_id, ()) if dep in rows]
+        if not deps:
+            break
+        task_id = max(deps, key=lambda t: rows[t]['end'])
+        path.append(task_id)
+    return path[::-1]
+
+class _TracedComponent:
+    """Proxy recording a span for every call of a component's public methods."""
+    def __init__(self, component, tracer, kind, task_id):
+        self._component = component
+        self._tracer = tracer
+        self._kind = kind
+        self._task_id = task_id
+
+    def __getattr__(self, name):
+        value = getattr(self._component, name)
+        if name.startswith('_') or not callable(value):
+            return value
+        tracer, kind, task_id = self._tracer, self._kind, self._task_id
+        if asyncio.iscoroutinefunction(value):
+            async def traced_async(*args, **kwargs):
+                with tracer.span(kind, task_id, method=name):
+                    return await value(*args, **kwargs)
+            return traced_async
+
+        def traced(*args, **kwargs):
+            with tracer.span(kind, task_id, method=name):
+                return value(*args, **kwargs)
+        return traced
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
@@ -5,15 +5,16 @@
 
 # TinyAGI/tools/__init__.py
 
-from .tool_manager import ToolManager
-from .wikipedia_tool import WikipediaTool
-from .base_tool import BaseTool
+from ..core.lazy_registry import lazy_exports
 
-__all__ = [
-    'ToolManager',
-    'WikipediaTool',
-    'BaseTool'
-]
+_LAZY_EXPORTS = {
+    'ToolManager': '.tool_manager',
+    'WikipediaTool': '.wikipedia_tool',
+    'BaseTool': '.base_tool'
+}
+
+__all__ = list(_LAZY_EXPORTS)
+__getattr__ = lazy_exports(__name__, _LAZY_EXPORTS)
 
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
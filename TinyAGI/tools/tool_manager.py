@@ -10,56 +10,74 @@ import importlib
 import os
 import sys
 import git  # Requires gitpython
+from ..core.lazy_registry import LazyRegistry
 
 logger = logging.getLogger(__name__)
 
 class ToolManager:
-    def __init__(self, tools_config, base_path=None):
+    def __init__(self, tools_config, base_path=None, lazy=False, profiler=None, load_options=None,
+                 instances=None):
         """
         Initialize the ToolManager.
 
         :param tools_config: List of tool configurations.
         :param base_path: The base path for resolving local modules.
+        :param lazy: If True, tools are only imported and constructed on their first get_tool call.
+        :param profiler: Optional StartupProfiler that records how long each tool takes to build.
+        :param load_options: Optional LazyRegistry settings for building tools (max_workers, timeout, retries, retry_delay).
+        :param instances: Already-built tools to adopt by name instead of constructing them again.
         """
         self.tools_config = tools_config
         self.base_path = base_path or os.path.dirname(__file__)
-        self.loaded_tools = self.load_tools()
+        self.lazy = lazy
+        self.registry = LazyRegistry('tool', tools_config, self.load_tool, profiler=profiler,
+                                     **(load_options or {}), instances=instances)
+        self.loaded_tools = self.registry.instances
+        if not lazy:
+            self.load_tools()
 
     def load_tools(self):
         """
         Load all tools based on the configuration.
         """
-        loaded_tools = {}
-        for tool_info in self.tools_config:
-            name = tool_info.get('name')
-            module_name = tool_info.get('module')
-            class_name = tool_info.get('class')
-            source = tool_info.get('source', 'local')
-            config = tool_info.get('config', {})
-
-            logger.info(f"Loading tool '{name}' from module '{module_name}' with source '{source}'.")
-
-            if source == 'github':
-                repo_url = tool_info.get('repo_url')
-                if not repo_url:
-                    logger.error(f"Repo URL not provided for tool '{name}'. Skipping.")
-                    continue
-                self.load_tool_from_github(module_name, repo_url)
+        self.registry.preload()
+        logger.debug(f"All loaded tools: {list(self.loaded_tools.keys())}")
+        return self.loaded_tools
 
-            try:
-                # Dynamically import the module from the tools directory
-                module = importlib.import_module(f'TinyAGI.tools.{module_name}')
-                tool_class = getattr(module, class_name)
-                tool_instance = tool_class(config)
-                loaded_tools[name] = tool_instance
-                logger.info(f"Successfully loaded tool: {name}")
-            except AttributeError:
-                logger.error(f"Tool class '{class_name}' not found in module '{module_name}'.")
-            except Exception as e:
-                logger.error(f"Failed to load tool '{name}': {e}", exc_info=True)
+    def load_tool(self, tool_info):
+        """
+        Import and construct a single tool.
+
+        :param tool_info: Dictionary containing the tool configuration.
+        :return: The tool instance, or None if it could not be loaded.
+        """
+        name = tool_info.get('name')
+        module_name = tool_info.get('module')
+        class_name = tool_info.get('class')
+        source = tool_info.get('source', 'local')
+        config = tool_info.get('config', {})
 
-        logger.debug(f"All loaded tools: {list(loaded_tools.keys())}")
-        return loaded_tools
+        logger.info(f"Loading tool '{name}' from module '{module_name}' with source '{source}'.")
+
+        if source == 'github':
+            repo_url = tool_info.get('repo_url')
+            if not repo_url:
+                logger.error(f"Repo URL not provided for tool '{name}'. Skipping.")
+                return None
+            self.load_tool_from_github(module_name, repo_url)
+
+        try:
+            # Dynamically import the module from the tools directory
+            module = importlib.import_module(f'TinyAGI.tools.{module_name}')
+            tool_class = getattr(module, class_name)
+            tool_instance = tool_class(config)
+            logger.info(f"Successfully loaded tool: {name}")
+            return tool_instance
+        except AttributeError:
+            logger.error(f"Tool class '{class_name}' not found in module '{module_name}'.")
+        except Exception as e:
+            logger.error(f"Failed to load tool '{name}': {e}", exc_info=True)
+        return None
 
     def load_tool_from_github(self, module_name, repo_url):
         """
@@ -82,9 +100,19 @@ class ToolManager:
 
     def get_tool(self, tool_name):
         """
-        Retrieve a loaded tool by its name.
+        Retrieve a tool by its name, loading it first if it has not been built yet.
+        """
+        return self.registry.get(tool_name)
+
+    def get_tool_names(self):
+        """
+        Retrieve the names of the tools.
+        In lazy mode these are all configured tools, whether built yet or not; otherwise
+        only the tools that loaded successfully.
         """
-        return self.loaded_tools.get(tool_name)
+        if self.lazy:
+            return self.registry.names()
+        return self.registry.loaded_names()
 
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
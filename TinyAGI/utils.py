@@ -7,7 +7,6 @@
 
 import json
 import re
-import nltk
 import os
 import logging
 from dotenv import load_dotenv
@@ -63,14 +62,31 @@ def sanitize_filename(title):
 
 def download_nltk_resources():
     """
-    Ensure NLTK resources are available.
+    Ensure NLTK resources are available, downloading only the ones missing locally.
     """
+    from .resource_manager import nltk_resources
+    failed = nltk_resources.pull()
+    if failed:
+        logging.error(f"Error downloading NLTK resources: {failed}")
+    else:
+        logging.info("NLTK resources are available.")
+
+def close_component(instance):
+    """
+    Call an agent's, plugin's or tool's close() method if it has one, logging any error.
+
+    :param instance: The component instance.
+    :return: True if close() was called successfully.
+    """
+    close = getattr(instance, 'close', None)
+    if not callable(close):
+        return False
     try:
-        nltk.download('punkt', quiet=True)
-        nltk.download('stopwords', quiet=True)
-        logging.info("NLTK resources downloaded successfully.")
+        close()
+        return True
     except Exception as e:
-        logging.error(f"Error downloading NLTK resources: {e}")
+        logging.error(f"Error closing {instance.__class__.__name__}: {e}")
+        return False
 
 
 # Permission is hereby granted, free of charge, to any person obtaining a copy
@@ -1,4 +1,22 @@
+import json
 import pytest
+from unittest.mock import MagicMock, patch
+from TinyAGI.agent import AgentSystem
+from TinyAGI.task_manager import TaskManager
+
+def pytest_addoption(parser):
+    parser.addoption('--benchmark', action='store_true', help="Also run the timing benchmarks marked 'benchmark'.")
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "benchmark: wall-clock timing test, skipped unless --benchmark is given")
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason="timing benchmark; run with --benchmark")
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
 
 @pytest.fixture
 def mock_config():
@@ -51,4 +69,37 @@ def mock_config():
             }
         ],
         "modules": []
-    }
\ No newline at end of file
+    }
+
+@pytest.fixture
+def make_task_manager():
+    """
+    Factory for task engines wired to mocked agent, plugin and tool managers.
+
+    Call it with the plugin every task resolves to (or a dict of plugins by name) and the
+    tasks. Optional arguments: engine (TaskManager or AsyncTaskManager), agent (returned by
+    get_agent), agents_config, and any keyword arguments of the engine.
+    """
+    def make(plugin, tasks, engine=TaskManager, agent=None, agents_config=None, **kwargs):
+        plugin_manager, agent_manager, tool_manager = MagicMock(), MagicMock(), MagicMock()
+        if isinstance(plugin, dict):
+            plugin_manager.get_plugin.side_effect = plugin.get
+        else:
+            plugin_manager.get_plugin.return_value = plugin
+        if agent is not None:
+            agent_manager.get_agent.return_value = agent
+        agent_manager.agents_config = agents_config or []
+        return engine(agent_manager, plugin_manager, tool_manager, tasks, **kwargs)
+    return make
+
+@pytest.fixture
+def built_system(tmp_path, mock_config):
+    """An AgentSystem built from mock_config with every component import mocked out."""
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps(mock_config))
+    module = MagicMock()
+    for attr in ('MockAgent', 'mock_plugin', 'MockTool'):
+        getattr(module, attr).side_effect = lambda *args, **kwargs: MagicMock()
+    with patch('importlib.import_module', return_value=module):
+        system = AgentSystem(config_files=str(config_file))
+        yield system, config_file, module
@@ -32,4 +32,27 @@ def test_agent_manager_initialization_and_loading(mock_config, mock_module_manag
         mock_agent_class.assert_called_with(agent_configs[0]['config'])
         # Verify that the loaded agent is available
         assert 'mock_agent' in agent_manager.loaded_agents
-        assert agent_manager.get_agent('mock_agent') is mock_agent_instance
\ No newline at end of file
+        assert agent_manager.get_agent('mock_agent') is mock_agent_instance
+
+def test_agent_manager_lazy_loading(mock_config, mock_module_manager):
+    """Test that a lazy AgentManager only imports and builds an agent on first use, and only once."""
+    agent_configs = mock_config['agents']
+
+    with patch('importlib.import_module') as mock_import:
+        mock_agent_module = MagicMock()
+        mock_agent_class = MagicMock()
+        setattr(mock_agent_module, 'MockAgent', mock_agent_class)
+        mock_import.return_value = mock_agent_module
+
+        agent_manager = AgentManager(agent_configs, mock_module_manager, lazy=True)
+
+        # Nothing is imported at construction time, but the agent is still listed
+        mock_import.assert_not_called()
+        assert agent_manager.get_agent_names() == ['mock_agent']
+
+        first = agent_manager.get_agent('mock_agent')
+        second = agent_manager.get_agent('mock_agent')
+
+        assert first is second is mock_agent_class.return_value
+        assert mock_agent_class.call_count == 1
+        assert agent_manager.get_agent('unknown_agent') is None
@@ -0,0 +1,51 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from TinyAGI.agents.base_agent import BaseAgent
+from TinyAGI.core.client_pool import ClientPool
+
+class BlockingAgent(BaseAgent):
+    def generate_text(self, prompt, stream=False):
+        return iter(prompt.split()) if stream else prompt.upper()
+
+    def embed(self, input_data):
+        return [len(input_data)]
+
+def test_thread_fallback_and_async_streams():
+    """Test that agents without an async SDK get awaitable calls and async iterator streams."""
+    agent = BlockingAgent({})
+
+    async def run():
+        stream = await agent.agenerate_text('a b c', stream=True)
+        return await agent.agenerate_text('hi'), [chunk async for chunk in stream], await agent.aembed('abc')
+
+    assert asyncio.run(run()) == ('HI', ['a', 'b', 'c'], [3])
+
+def test_ollama_uses_one_async_client_per_loop():
+    """Test that Ollama agents await a pooled AsyncClient, shared on a loop and renewed on a new loop."""
+    from TinyAGI.agents import ollama_agent
+
+    async def chunks():
+        for text in ('x', 'y'):
+            yield {'message': {'content': text}}
+
+    def make_client(**kwargs):
+        client = MagicMock()
+        client.chat = AsyncMock(side_effect=lambda stream=False, **kw: chunks() if stream else
+                                {'message': {'content': kw['messages'][-1]['content'] + '!'}})
+        client.embed = AsyncMock(return_value={'embeddings': [[0.5]]})
+        return client
+
+    with patch.object(ollama_agent, 'client_pool', ClientPool()), \
+         patch.object(ollama_agent.ollama, 'Client'), \
+         patch.object(ollama_agent.ollama, 'AsyncClient', side_effect=make_client) as create:
+        agents = [ollama_agent.OllamaAgent({'name': 'm'}) for _ in range(2)]
+
+        async def run():
+            stream = await agents[1].achat([{'role': 'user', 'content': 'q'}], stream=True)
+            return (await agents[0].agenerate_text('hello'), [chunk async for chunk in stream],
+                    await agents[0].aembed('t'))
+
+        assert asyncio.run(run()) == ('hello!', ['x', 'y'], [0.5])
+        assert create.call_count == 1
+        asyncio.run(run())
+        assert create.call_count == 2
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import time
+from TinyAGI.async_task_manager import AsyncTaskManager
+from TinyAGI.plugins.base_plugin import BasePlugin
+
+def _task(task_id, prompt):
+    return {'task_id': task_id, 'plugin': 'p', 'agent': 'a', 'input': {'prompt': prompt}}
+
+class SleepyPlugin(BasePlugin):
+    def __init__(self, delay):
+        super().__init__({})
+        self.delay = delay
+        self.threads = set()
+
+    def execute(self, agent, tool, input_data, options, stream=False):
+        raise AssertionError("execute_async should be awaited instead")
+
+    async def execute_async(self, agent, tool, input_data, options, stream=False):
+        self.threads.add(threading.get_ident())
+        await asyncio.sleep(self.delay)
+        return f"out:{input_data['prompt']}"
+
+def test_async_engine_runs_many_tasks_on_one_loop(make_task_manager):
+    """Test that hundreds of awaiting tasks overlap on a single thread and feed their dependents."""
+    plugin = SleepyPlugin(0.2)
+    tasks = [_task(f't{i}', f'p{i}') for i in range(300)] + [_task('join', '{{tasks.t7.output}}')]
+    manager = make_task_manager(plugin, tasks, engine=AsyncTaskManager)
+    start = time.perf_counter()
+    manager.execute_tasks()
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.5
+    assert len(plugin.threads) == 1
+    assert len(manager.task_results) == 301
+    assert manager.task_results['join'] == 'out:out:p7'
+
+def test_async_engine_cancels_a_running_task(make_task_manager):
+    """Test that a cancelled task is left out of the results while its siblings complete."""
+    plugin = SleepyPlugin(0.3)
+    manager = make_task_manager(plugin, [_task('slow', 'a'), _task('fast', 'b')], engine=AsyncTaskManager)
+
+    async def run():
+        asyncio.get_running_loop().call_later(0.1, manager.cancel, 'slow')
+        await manager.execute_tasks_async()
+    asyncio.run(run())
+
+    assert manager.task_results == {'fast': 'out:b'}
@@ -0,0 +1,72 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+from TinyAGI.core.client_pool import ClientPool
+
+def test_clients_are_shared_per_host_and_closed_with_last_user():
+    """Test that the pool hands out one client per host and settings, and closes it after the last release."""
+    pool = ClientPool()
+    factory = MagicMock(side_effect=lambda: MagicMock())
+    first = pool.acquire('ollama', 'http://a:11434', factory, params={'pool_size': 4})
+    second = pool.acquire('ollama', 'http://a:11434', factory, params={'pool_size': 4})
+    other = pool.acquire('ollama', 'http://b:11434', factory, params={'pool_size': 4})
+
+    assert first.client is second.client and other.client is not first.client
+    assert factory.call_count == 2
+    first.release()
+    first.release()
+    first.client.close.assert_not_called()
+    second.release()
+    first.client.close.assert_called_once()
+    assert [entry['host'] for entry in pool.stats()] == ['http://b:11434']
+
+def test_async_clients_are_closed_when_last_loop_user_releases():
+    """Test that a loop's async clients stay open while another user retains the loop and are closed after."""
+    pool = ClientPool()
+    client = MagicMock(aclose=AsyncMock())
+
+    async def run():
+        pool.retain_loop()
+        pool.retain_loop()
+        assert pool.acquire_async('openai', 'api', lambda: client) is client
+        await pool.release_loop()
+        client.aclose.assert_not_awaited()
+        await pool.release_loop()
+        client.aclose.assert_awaited_once()
+        return pool.acquire_async('openai', 'api', MagicMock)
+    assert asyncio.run(run()) is not client
+
+def test_ollama_agents_share_client_for_chat_and_embed():
+    """Test that Ollama agents on one host share a pooled client that also serves embeddings."""
+    from TinyAGI.agents import ollama_agent
+    pool = ClientPool()
+    client = MagicMock()
+    client.embed.return_value = {'embeddings': [[1.0], [2.0]]}
+    with patch.object(ollama_agent, 'client_pool', pool), \
+         patch.object(ollama_agent.ollama, 'Client', return_value=client) as create:
+        agents = [ollama_agent.OllamaAgent({'name': 'm', 'host': 'http://gpu:11434', 'client': {'pool_size': 2}})
+                  for _ in range(2)]
+        assert create.call_count == 1
+        assert agents[0].embed(['x', 'y']) == [[1.0], [2.0]]
+        client.embed.assert_called_once_with(model='m', input=['x', 'y'])
+        assert create.call_args.kwargs['host'] == 'http://gpu:11434'
+        assert create.call_args.kwargs['limits'].max_keepalive_connections == 2
+        for agent in agents:
+            agent.close()
+    client.close.assert_called_once()
+
+def test_openai_agents_share_sync_client_per_api_base(monkeypatch):
+    """Test that OpenAI agents on one API base share a pooled sync client, closed with the last agent."""
+    from TinyAGI.agents import openai_agent
+    monkeypatch.setenv('OPENAI_API_KEY', 'key')
+    pool = ClientPool()
+    with patch.object(openai_agent, 'client_pool', pool), \
+         patch.object(openai_agent.openai, 'OpenAI', side_effect=lambda **kwargs: MagicMock()) as create:
+        agents = [openai_agent.OpenAIAgent({}) for _ in range(2)]
+        other = openai_agent.OpenAIAgent({'base_url': 'http://proxy:8000/v1'})
+        assert create.call_count == 2
+        assert agents[0].client is agents[1].client and other.client is not agents[0].client
+        assert create.call_args.kwargs['base_url'] == 'http://proxy:8000/v1'
+        for agent in agents:
+            agent.close()
+        agents[0].client.close.assert_called_once()
+        assert [entry['host'] for entry in pool.stats()] == ['http://proxy:8000/v1']
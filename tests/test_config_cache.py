@@ -0,0 +1,57 @@
+import json
+import os
+from unittest.mock import MagicMock
+from TinyAGI.config_cache import ConfigCache
+
+def _write(path, data):
+    path.write_text(json.dumps(data))
+
+def test_config_cache_skips_parsing_and_validation_when_unchanged(tmp_path, mock_config):
+    """Test that an unchanged config file is served from the cache as an independent copy."""
+    config_file = tmp_path / 'config.json'
+    _write(config_file, mock_config)
+    cache = ConfigCache()
+    loader = MagicMock(side_effect=lambda files: json.loads(config_file.read_text()))
+    validator = MagicMock(return_value=True)
+
+    first, valid = cache.load([str(config_file)], loader, validator)
+    first['agents'].append({'name': 'mutated'})
+    second, valid_again = cache.load([str(config_file)], loader, validator)
+
+    assert valid and valid_again
+    assert loader.call_count == 1
+    assert validator.call_count == 1
+    assert second == mock_config
+
+def test_config_cache_reloads_changed_files_and_hits_on_touch(tmp_path, mock_config):
+    """Test that content changes invalidate the cache while a bare mtime change does not."""
+    config_file = tmp_path / 'config.json'
+    _write(config_file, mock_config)
+    cache = ConfigCache()
+    loader = MagicMock(side_effect=lambda files: json.loads(config_file.read_text()))
+    validator = MagicMock(return_value=True)
+
+    cache.load([str(config_file)], loader, validator)
+
+    stat = os.stat(config_file)
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    cache.load([str(config_file)], loader, validator)
+    assert loader.call_count == 1
+
+    mock_config['agents'][0]['name'] = 'renamed_agent'
+    _write(config_file, mock_config)
+    reloaded, _ = cache.load([str(config_file)], loader, validator)
+    assert loader.call_count == 2
+    assert reloaded['agents'][0]['name'] == 'renamed_agent'
+
+def test_config_cache_does_not_cache_invalid_configs(tmp_path, mock_config):
+    """Test that invalid configurations are re-validated (and their errors re-reported) on every load."""
+    config_file = tmp_path / 'config.json'
+    _write(config_file, mock_config)
+    cache = ConfigCache()
+    validator = MagicMock(return_value=False)
+
+    for _ in range(2):
+        _, valid = cache.load([str(config_file)], lambda files: json.loads(config_file.read_text()), validator)
+        assert not valid
+    assert validator.call_count == 2
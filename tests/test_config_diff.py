@@ -0,0 +1,46 @@
+import copy
+import json
+from TinyAGI.agent import AgentSystem
+from TinyAGI.config_diff import diff_components, diff_configs
+
+def test_diff_components_classifies_by_name(mock_config):
+    """Test that components are compared by name and only build-relevant keys count as changes."""
+    old = mock_config['agents'] + [{'name': 'gone', 'module': 'm', 'class': 'C', 'source': 'local', 'config': {}}]
+    new = copy.deepcopy(mock_config['agents'])
+    new[0]['description'] = 'cosmetic change only'
+    new.append({'name': 'fresh', 'module': 'm', 'class': 'C', 'source': 'local', 'config': {}})
+
+    diff = diff_components('agents', old, new)
+    assert diff == {'added': ['fresh'], 'removed': ['gone'], 'changed': [], 'unchanged': ['mock_agent']}
+
+    new[0]['config'] = {'temperature': 0.1}
+    assert diff_components('agents', old, new)['changed'] == ['mock_agent']
+
+def test_diff_configs_flags_module_changes(mock_config):
+    """Test that a change to the shared modules is reported."""
+    new_config = copy.deepcopy(mock_config)
+    new_config['modules'] = [{'name': 'TabithaModule', 'module': 'tabitha_module'}]
+    assert diff_configs(mock_config, new_config)['modules_changed'] is True
+
+def test_reload_rebuilds_only_changed_components(built_system, mock_config):
+    """Test that a system built with previous= adopts untouched instances and rebuilds the changed one."""
+    system, config_file, module = built_system
+    agent_before = system.agent_manager.get_agent('mock_agent')
+    plugin_before = system.plugin_manager.get_plugin('mock_plugin')
+
+    new_config = copy.deepcopy(mock_config)
+    new_config['agents'][0]['config'] = {'temperature': 0.2}
+    new_config['tools'] = []
+    config_file.write_text(json.dumps(new_config))
+
+    diff = diff_configs(system.config, new_config)
+    new = AgentSystem(config_files=str(config_file), previous=system)
+
+    assert diff['agents']['changed'] == ['mock_agent']
+    assert diff['tools']['removed'] == ['mock_tool']
+    assert new.agent_manager.get_agent('mock_agent') is not agent_before
+    assert new.plugin_manager.get_plugin('mock_plugin') is plugin_before
+    assert new.tool_manager.get_tool('mock_tool') is None
+    assert new.config == new_config
+    # The previous system is left as it was.
+    assert system.agent_manager.get_agent('mock_agent') is agent_before
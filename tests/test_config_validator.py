@@ -1,5 +1,5 @@
 import pytest
-from TinyAGI.config_validator import validate_config
+from TinyAGI.config_validator import validate_config, get_config_errors
 import copy
 
 def test_validate_config_valid(mock_config):
@@ -28,4 +28,13 @@ def test_validate_config_wrong_type(mock_config):
     """Test that a property with the wrong data type fails validation."""
     invalid_config = copy.deepcopy(mock_config)
     invalid_config['agents'] = "this should be a list"
-    assert validate_config(invalid_config) is False
\ No newline at end of file
+    assert validate_config(invalid_config) is False
+
+def test_get_config_errors_reports_every_problem(mock_config):
+    """Test that all validation errors are collected, not only the first one."""
+    invalid_config = copy.deepcopy(mock_config)
+    invalid_config['agents'][0]['source'] = 'invalid_source'
+    del invalid_config['tasks'][0]['task_id']
+    errors = get_config_errors(invalid_config)
+    assert len(errors) == 2
+    assert ['agents', 0, 'source'] in [path for path, _ in errors]
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+import time
+import numpy as np
+import pytest
+from TinyAGI.agents.base_agent import BaseAgent
+from TinyAGI.plugins.generate_embeddings import GenerateEmbeddings
+
+class BatchEmbedder(BaseAgent):
+    supports_batch_embedding = True
+    embed_batch_size = 3
+
+    def __init__(self):
+        super().__init__({})
+        self.calls = []
+        self.in_flight = self.peak = 0
+        self._lock = threading.Lock()
+
+    def embed(self, input_data):
+        with self._lock:
+            self.calls.append(list(input_data))
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        # Later sub-batches finish first, so results arrive out of order.
+        time.sleep(0.05 / (len(self.calls) + 1))
+        with self._lock:
+            self.in_flight -= 1
+        return [[float(text), -float(text)] for text in input_data]
+
+class SingleEmbedder(BaseAgent):
+    def embed(self, input_data):
+        return [float(len(input_data))] if input_data != 'bad' else []
+
+def test_embed_batch_splits_and_keeps_order():
+    """Test that embed_batch respects the batch size, runs sub-batches concurrently and keeps input order."""
+    agent = BatchEmbedder()
+    texts = [str(n) for n in range(10)]
+    matrix = agent.embed_batch(texts, concurrency=4)
+
+    assert matrix.dtype == np.float32 and matrix.shape == (10, 2) and matrix.flags['C_CONTIGUOUS']
+    assert matrix[:, 0].tolist() == list(range(10))
+    assert sorted(len(call) for call in agent.calls) == [1, 3, 3, 3]
+    assert agent.peak > 1
+
+def test_embed_batch_without_batch_support():
+    """Test that agents without batch embedding are called once per text, and a failed call raises."""
+    agent = SingleEmbedder({})
+    assert agent.embed_batch(['a', 'bb', 'ccc'], batch_size=10).tolist() == [[1.0], [2.0], [3.0]]
+    assert agent.embed_batch([]).shape == (0, 0)
+    with pytest.raises(RuntimeError):
+        agent.embed_batch(['a', 'bad'])
+
+def test_generate_embeddings_reports_failed_agent_call():
+    """Test that an empty result from a failing provider raises a RuntimeError naming the agent."""
+    class Failing(BaseAgent):
+        supports_batch_embedding = True
+
+        def embed(self, input_data):
+            return []
+
+        async def aembed(self, input_data):
+            return []
+    plugin = GenerateEmbeddings({})
+    with pytest.raises(RuntimeError, match='Failing returned no embedding'):
+        plugin.execute(Failing({}), None, {'text': 'x'}, {})
+    with pytest.raises(RuntimeError, match='Failing returned no embedding'):
+        asyncio.run(plugin.execute_async(Failing({}), None, {'text': 'x'}, {}))
+    with pytest.raises(RuntimeError, match='one embedding per text'):
+        plugin.execute_batch(Failing({}), None, [{'text': 'x'}, {'text': 'y'}], {})
@@ -0,0 +1,89 @@
+import threading
+import time
+from TinyAGI.core.lazy_registry import LazyRegistry
+
+def test_lazy_registry_builds_each_component_once_under_concurrency():
+    """Test that concurrent first accesses share a single construction."""
+    calls = []
+
+    def factory(spec):
+        calls.append(spec['name'])
+        time.sleep(0.05)
+        return object()
+
+    registry = LazyRegistry('agent', [{'name': 'slow_agent'}], factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('slow_agent'))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ['slow_agent']
+    assert len(set(map(id, results))) == 1
+
+def test_lazy_registry_remembers_failures_and_preloads():
+    """Test that failed components are not rebuilt on every access and that preload builds ahead of use."""
+    calls = []
+
+    def factory(spec):
+        calls.append(spec['name'])
+        return None if spec['name'] == 'broken' else spec['name']
+
+    registry = LazyRegistry('tool', [{'name': 'broken'}, {'name': 'hot'}], factory)
+    registry.preload(['hot'])
+    assert registry.is_loaded('hot')
+
+    assert registry.get('broken') is None
+    assert registry.get('broken') is None
+    assert calls == ['hot', 'broken']
+
+def test_preload_builds_concurrently_and_times_out_slow_components():
+    """Test that preload runs builds in parallel and marks a component that exceeds its timeout unavailable."""
+    release_stuck = threading.Event()
+
+    def factory(spec):
+        if spec['name'] == 'stuck':
+            release_stuck.wait(5)
+        else:
+            time.sleep(0.1)
+        return spec['name']
+
+    specs = [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}, {'name': 'stuck', 'load_timeout': 0.2}]
+    registry = LazyRegistry('agent', specs, factory, max_workers=4)
+
+    start = time.monotonic()
+    registry.preload()
+    elapsed = time.monotonic() - start
+
+    # Three 0.1s builds in parallel plus a 0.2s timeout, rather than 0.3s + an unbounded wait.
+    assert elapsed < 1.0
+    assert registry.loaded_names() == ['a', 'b', 'c']
+    assert registry.status()['stuck'] == 'unavailable'
+    assert registry.get('stuck') is None
+
+    # Once the slow build finishes, the component becomes available without another preload.
+    release_stuck.set()
+    for _ in range(100):
+        if registry.is_loaded('stuck'):
+            break
+        time.sleep(0.01)
+    assert registry.get('stuck') == 'stuck'
+
+def test_failed_components_are_retried_in_the_background():
+    """Test that a component that fails to load is retried until it succeeds."""
+    attempts = []
+
+    def factory(spec):
+        attempts.append(spec['name'])
+        return None if len(attempts) < 3 else 'ready'
+
+    registry = LazyRegistry('tool', [{'name': 'flaky'}], factory, retries=3, retry_delay=0.01)
+    assert registry.get('flaky') is None
+
+    for _ in range(200):
+        if registry.is_loaded('flaky'):
+            break
+        time.sleep(0.01)
+    assert registry.get('flaky') == 'ready'
+    assert len(attempts) == 3
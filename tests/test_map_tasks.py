@@ -0,0 +1,55 @@
+import threading
+import time
+
+class References:
+    def execute(self, agent, tool, input_data, options, stream=False):
+        return [{'id': str(i), 'source': f'source {i}'} for i in range(6)]
+
+class Summarize:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def execute(self, agent, tool, input_data, options, stream=False):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.05)
+            if input_data['text'] == 'source 3':
+                raise RuntimeError('backend error')
+            return f"{input_data['index']}:{input_data['text']}"
+        finally:
+            with self.lock:
+                self.active -= 1
+
+class Join:
+    def execute(self, agent, tool, input_data, options, stream=False):
+        return ' | '.join(input_data['items'])
+
+def _run(make_task_manager, map_task):
+    plugins = {'refs': References(), 'summarize': Summarize(), 'join': Join()}
+    tasks = [{'task_id': 'refs', 'plugin': 'refs', 'agent': 'a', 'input': {}},
+             {'task_id': 'summaries', 'plugin': 'summarize', 'agent': 'a',
+              'map_over': '{{tasks.refs.output}}', 'max_concurrency': 2,
+              'input': {'text': '{{item.source}}', 'index': '{{index}}'}, **map_task}]
+    manager = make_task_manager(plugins, tasks, max_workers=4)
+    manager.execute_tasks()
+    return manager, plugins['summarize']
+
+def test_map_task_fans_out_with_bounded_concurrency_and_reduces(make_task_manager):
+    """Test that items run in parallel up to max_concurrency, failed items are skipped, and reduce combines them."""
+    manager, summarize = _run(make_task_manager, {'on_item_error': 'skip', 'reduce': {'plugin': 'join'}})
+
+    assert summarize.peak == 2
+    assert manager.task_results['summaries'] == '0:source 0 | 1:source 1 | 2:source 2 | 4:source 4 | 5:source 5'
+
+def test_map_task_error_policies(make_task_manager):
+    """Test that a failed item fails the task by default and becomes None with the 'null' policy."""
+    manager, _ = _run(make_task_manager, {})
+    assert 'summaries' not in manager.task_results
+
+    manager, _ = _run(make_task_manager, {'on_item_error': 'null'})
+    assert manager.task_results['summaries'][3] is None
+    assert manager.task_results['summaries'][5] == '5:source 5'
@@ -0,0 +1,71 @@
+from unittest.mock import MagicMock
+from TinyAGI.core.model_cache import ModelCache
+
+def test_model_cache_shares_and_frees_by_reference_count():
+    """Test that identical models are loaded once and freed only when the last handle is released."""
+    cache = ModelCache()
+    loader = MagicMock(side_effect=lambda: MagicMock())
+
+    first = cache.acquire('llama_cpp', '/models/a.gguf', loader, params={'n_ctx': 2048})
+    second = cache.acquire('llama_cpp', '/models/a.gguf', loader, params={'n_ctx': 2048})
+    other = cache.acquire('llama_cpp', '/models/a.gguf', loader, params={'n_ctx': 4096})
+
+    assert loader.call_count == 2
+    assert first.model is second.model
+    assert other.model is not first.model
+    model = first.model
+
+    first.release()
+    first.release()  # releasing twice must not drop the other agent's reference
+    model.close.assert_not_called()
+    assert [m['refs'] for m in cache.stats()['models']] == [1, 1]
+
+    second.release()
+    model.close.assert_called_once()
+    assert len(cache.stats()['models']) == 1
+
+    # A new borrower after the last release loads the weights again.
+    cache.acquire('llama_cpp', '/models/a.gguf', loader, params={'n_ctx': 2048})
+    assert loader.call_count == 3
+
+def test_model_cache_evicts_least_recently_used_idle_model():
+    """Test that loading past the memory budget unloads the least recently used idle model,
+    never one that is in use, and that an unloaded model is loaded again on its next use."""
+    cache = ModelCache(budget_bytes=250)
+    loader = MagicMock(side_effect=lambda: MagicMock())
+    a = cache.acquire('llama_cpp', 'a', loader, size=100)
+    b = cache.acquire('llama_cpp', 'b', loader, size=100)
+    with a.use():
+        pass  # a is now more recently used than b
+
+    with b.use() as model_b:
+        c = cache.acquire('llama_cpp', 'c', loader, size=100)
+        # b is in use, so a has to go even though it was used more recently.
+        model_b.close.assert_not_called()
+    residency = {m['identity']: m for m in cache.stats()['models']}
+    assert not residency['a']['resident'] and residency['a']['evictions'] == 1
+    assert residency['b']['resident'] and residency['c']['resident']
+    assert cache.stats()['resident_bytes'] == 200
+
+    with a.use():
+        pass
+    residency = {m['identity']: m for m in cache.stats()['models']}
+    assert residency['a']['load_count'] == 2
+    # b was checked in after c was loaded, so c is the least recently used idle model.
+    assert residency['b']['resident'] and not residency['c']['resident']
+
+    assert cache.unload_idle(max_idle=0) == 2
+    assert cache.stats()['resident_bytes'] == 0
+
+def test_model_cache_makes_room_before_first_load_of_known_size():
+    """Test that a model with a constant size evicts idle models before it is loaded, not after."""
+    cache = ModelCache(budget_bytes=250)
+    resident_at_load = []
+
+    def loader():
+        resident_at_load.append(cache.stats()['resident_bytes'])
+        return MagicMock()
+    cache.acquire('llama_cpp', 'a', loader, size=100)
+    cache.acquire('llama_cpp', 'b', loader, size=100)
+    cache.acquire('llama_cpp', 'c', loader, size=100)
+    assert resident_at_load == [0, 100, 100]
@@ -0,0 +1,50 @@
+import json
+from TinyAGI.output_sinks import create_sinks
+
+class Failing:
+    def execute(self, agent, tool, input_data, options, stream=False):
+        def chunks():
+            yield 'first '
+            yield 'second'
+            raise RuntimeError('connection reset')
+        return chunks()
+
+class Listing:
+    def execute(self, agent, tool, input_data, options, stream=False):
+        return [{'n': n} for n in range(3)]
+
+def _run(make_task_manager, plugin, task, quiet=True):
+    manager = make_task_manager(plugin, [task], quiet=quiet)
+    manager.execute_tasks()
+    return manager
+
+def test_stream_chunks_reach_sinks_before_failure(tmp_path, capsys, make_task_manager):
+    """Test that a failing stream leaves its partial output in every sink, and quiet mode prints nothing."""
+    jsonl, text = tmp_path / 'out.jsonl', tmp_path / 'out.txt'
+    _run(make_task_manager, Failing(), {
+        'task_id': 'story', 'plugin': 'p', 'agent': 'a', 'input': {}, 'options': {'stream': True},
+        'output': [{'sink': 'jsonl', 'path': str(jsonl)}, {'sink': 'text', 'path': str(text)}]})
+
+    records = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert [r.get('chunk') for r in records[:2]] == ['first ', 'second']
+    assert records[-1] == {'task_id': 'story', 'error': 'connection reset'}
+    assert text.read_text() == 'first second\n'
+    assert capsys.readouterr().out == ''
+
+def test_list_results_and_rotation(tmp_path, capsys, make_task_manager):
+    """Test that list results are written one record per item, and that files rotate at max_bytes."""
+    jsonl = tmp_path / 'items.jsonl'
+    _run(make_task_manager, Listing(), {'task_id': 'items', 'plugin': 'p', 'agent': 'a', 'input': {},
+                               'output': {'sink': 'jsonl', 'path': str(jsonl)}}, quiet=False)
+    assert [json.loads(line) for line in jsonl.read_text().splitlines()] == [
+        {'task_id': 'items', 'index': n, 'output': {'n': n}} for n in range(3)]
+    assert 'Task: items' in capsys.readouterr().out
+
+    rotating = tmp_path / 'log.txt'
+    for n in range(10):
+        sinks = create_sinks('t', {'sink': 'text', 'path': str(rotating), 'max_bytes': 20, 'backups': 2})
+        sinks[0].write(f'line {n:04d}')
+        sinks[0].close()
+    assert rotating.read_text() == 'line 0008\nline 0009\n'
+    assert (tmp_path / 'log.txt.1').read_text() == 'line 0006\nline 0007\n'
+    assert (tmp_path / 'log.txt.2').exists() and not (tmp_path / 'log.txt.3').exists()
@@ -0,0 +1,78 @@
+import gc
+import os
+import multiprocessing
+import weakref
+from unittest.mock import patch
+import socket
+import time
+import urllib.request
+import pytest
+from TinyAGI.services.prefork_server import PreforkServer
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+
+def _pid_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [str(os.getpid()).encode()]
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _get(port):
+    for _ in range(50):
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5) as response:
+                return int(response.read())
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('server did not answer')
+
+def test_prefork_server_recycles_workers_and_stops_gracefully():
+    """Test that preloaded workers serve requests, are replaced after max_requests, and stop on SIGTERM."""
+    port = _free_port()
+    server = PreforkServer(lambda: _pid_app, host='127.0.0.1', port=port, workers=1, preload=True,
+                           max_requests=2, graceful_timeout=5)
+    parent = multiprocessing.get_context('fork').Process(target=server.run)
+    parent.start()
+    try:
+        pids = [_get(port) for _ in range(4)]
+        assert parent.pid not in pids
+        # The single worker is recycled after two requests.
+        assert pids[0] == pids[1]
+        assert len(set(pids)) >= 2
+    finally:
+        parent.terminate()
+        parent.join(15)
+    assert parent.exitcode == 0
+
+def test_forked_worker_restarts_sweeper_and_gets_fresh_locks():
+    """Test that a forked child restarts the model cache sweeper and is not blocked by locks held at fork time."""
+    from TinyAGI.core.model_cache import ModelCache
+    cache = ModelCache(idle_timeout=60)
+    read, write = os.pipe()
+    with cache._lock:
+        pid = os.fork()
+        if pid == 0:
+            ok = cache._sweeper.is_alive() and cache._lock.acquire(timeout=1)
+            os.write(write, b'1' if ok else b'0')
+            os._exit(0)
+    os.waitpid(pid, 0)
+    result = os.read(read, 1)
+    os.close(read)
+    os.close(write)
+    assert result == b'1'
+
+def test_fork_hook_is_installed_once_and_holds_instances_weakly():
+    """Test that registering components adds no fork hooks and does not keep retired ones alive."""
+    from TinyAGI.core import fork_safety
+    from TinyAGI.core.lazy_registry import LazyRegistry
+    fork_safety.register_after_fork(LazyRegistry('agent', [], lambda info: info))
+    with patch.object(fork_safety.os, 'register_at_fork') as register_at_fork:
+        registries = [LazyRegistry('agent', [], lambda info: info) for _ in range(5)]
+        refs = [weakref.ref(registry) for registry in registries]
+        register_at_fork.assert_not_called()
+    del registries
+    gc.collect()
+    assert all(ref() is None for ref in refs)
@@ -0,0 +1,56 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from TinyAGI.plugins.generate_tags import GenerateTags
+from TinyAGI.resource_manager import NLTKResourceManager, nltk_resources
+
+def test_missing_resources_are_reported_without_downloading(tmp_path):
+    """Test that checking for resources never triggers a download."""
+    manager = NLTKResourceManager(resources=['stopwords'], download_dir=str(tmp_path))
+    with patch('nltk.data.find', side_effect=LookupError), patch('nltk.download') as mock_download:
+        assert manager.missing() == ['stopwords']
+        mock_download.assert_not_called()
+
+def test_pull_downloads_only_missing_resources_and_writes_marker(tmp_path):
+    """Test that pull fetches missing resources once and later checks are served from the version marker."""
+    manager = NLTKResourceManager(resources=['punkt_tab', 'stopwords'], download_dir=str(tmp_path))
+    present = {'tokenizers/punkt_tab'}
+
+    def fake_find(path):
+        if path not in present:
+            raise LookupError(path)
+
+    with patch('nltk.data.find', side_effect=fake_find), patch('nltk.download', return_value=True) as mock_download:
+        assert manager.pull() == []
+        mock_download.assert_called_once_with('stopwords', download_dir=str(tmp_path), quiet=True)
+
+    assert (tmp_path / 'tinyagi_resources.json').exists()
+
+    # A fresh manager trusts the marker and does not scan the data paths again.
+    fresh = NLTKResourceManager(resources=['punkt_tab', 'stopwords'], download_dir=str(tmp_path))
+    with patch('nltk.data.find', side_effect=LookupError) as mock_find:
+        assert fresh.missing() == []
+        mock_find.assert_not_called()
+
+def test_require_raises_when_offline(tmp_path, monkeypatch):
+    """Test that a missing resource fails fast with a helpful error when downloads are disabled."""
+    monkeypatch.setenv('TINYAGI_OFFLINE', '1')
+    manager = NLTKResourceManager(resources=['stopwords'], download_dir=str(tmp_path))
+    with patch('nltk.data.find', side_effect=LookupError), patch('nltk.download') as mock_download:
+        with pytest.raises(LookupError, match='tinyagi resources pull'):
+            manager.require()
+        mock_download.assert_not_called()
+
+def test_generate_tags_fails_fast_when_download_stalls():
+    """Test that GenerateTags waits only resource_timeout seconds for a stalled background download."""
+    stalled = threading.Event()
+    background = threading.Thread(target=stalled.wait, args=(10,), daemon=True)
+    background.start()
+    plugin = GenerateTags({'resource_timeout': 0.1})
+    with patch.object(nltk_resources, 'missing', return_value=['stopwords']), \
+         patch.object(nltk_resources, 'prefetch', return_value=background):
+        start = time.perf_counter()
+        assert plugin.execute(None, None, {'text': 'some words'}, {}) == []
+        assert time.perf_counter() - start < 5
+    stalled.set()
@@ -0,0 +1,65 @@
+import sqlite3
+from unittest.mock import MagicMock
+from TinyAGI.result_cache import ResultCache
+
+def _task(task_id, prompt):
+    return {'task_id': task_id, 'plugin': 'p', 'agent': 'a', 'input': {'prompt': prompt}}
+
+def _manager(make_task_manager, tasks, cache):
+    plugin = MagicMock()
+    plugin.execute.side_effect = lambda agent, tool, input_data, options, stream: f"out:{input_data['prompt']}"
+    agents_config = [{'name': 'a', 'module': 'm', 'class': 'C', 'config': {'model_name': 'x'}}]
+    return make_task_manager(plugin, tasks, agents_config=agents_config, result_cache=cache), plugin
+
+def _executed(plugin):
+    return sorted(call.kwargs['input_data']['prompt'] for call in plugin.execute.call_args_list)
+
+def test_cached_results_rerun_only_changed_tasks_and_their_dependents(tmp_path, make_task_manager):
+    """Test that a re-run reuses cached results and a changed input invalidates only its downstream."""
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'))
+    tasks = [_task('a', 'one'), _task('b', 'two'), _task('c', '{{tasks.b.output}}')]
+    manager, plugin = _manager(make_task_manager, tasks, cache)
+    manager.execute_tasks()
+    assert len(plugin.execute.call_args_list) == 3
+
+    tasks[1]['input']['prompt'] = 'TWO'
+    manager, plugin = _manager(make_task_manager, tasks, cache)
+    manager.execute_tasks()
+    assert _executed(plugin) == ['TWO', 'out:TWO']
+    assert manager.task_results == {'a': 'out:one', 'b': 'out:TWO', 'c': 'out:out:TWO'}
+
+    manager, plugin = _manager(make_task_manager, tasks, cache)
+    manager.execute_tasks(force=True)
+    assert len(plugin.execute.call_args_list) == 3
+    assert cache.stats()['hits'] == 1
+
+    # A different model is a different result.
+    manager, plugin = _manager(make_task_manager, tasks, cache)
+    manager.agent_manager.agents_config[0]['config']['model_name'] = 'y'
+    manager.execute_tasks()
+    assert len(plugin.execute.call_args_list) == 3
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    """Test that the cache stays within max_entries by dropping the least recently read entries."""
+    cache = ResultCache(str(tmp_path / 'cache.sqlite'), max_entries=2)
+    cache.put('k1', 'v1')
+    cache.put('k2', 'v2')
+    assert cache.get('k1') == (True, 'v1')
+    cache.put('k3', 'v3')
+
+    assert cache.get('k2') == (False, None)
+    assert cache.get('k1') == (True, 'v1')
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['evictions'] == 1
+    assert cache.put('k4', object()) is False
+
+def test_unavailable_cache_degrades_to_misses(tmp_path, make_task_manager):
+    """Test that cache read and write errors are logged and the tasks run uncached."""
+    cache = MagicMock()
+    cache.get.side_effect = sqlite3.OperationalError('database is locked')
+    cache.put.side_effect = sqlite3.OperationalError('database is locked')
+    cache.stats.side_effect = sqlite3.OperationalError('database is locked')
+    tasks = [_task('a', 'one'), {**_task('b', 'two'), 'cache': False}]
+    manager, plugin = _manager(make_task_manager, tasks, cache)
+    manager.execute_tasks()
+    assert manager.task_results == {'a': 'out:one', 'b': 'out:two'}
@@ -0,0 +1,68 @@
+import threading
+import pytest
+from TinyAGI.run_journal import RunJournal, SUCCEEDED
+
+class Step:
+    def __init__(self, crash_on=None):
+        self.crash_on = crash_on
+        self.calls = []
+
+    def execute(self, agent, tool, input_data, options, stream=False):
+        self.calls.append(input_data['name'])
+        if input_data['name'] == self.crash_on:
+            raise RuntimeError('backend crashed')
+        return f"{input_data['name']}({input_data.get('prev', '')})"
+
+TASKS = [
+    {'task_id': 'a', 'plugin': 'p', 'agent': 'x', 'input': {'name': 'a'}},
+    {'task_id': 'b', 'plugin': 'p', 'agent': 'x', 'input': {'name': 'b', 'prev': '{{tasks.a.output}}'}},
+    {'task_id': 'c', 'plugin': 'p', 'agent': 'x', 'input': {'name': 'c', 'prev': '{{tasks.b.output}}'}},
+    {'task_id': 'd', 'plugin': 'p', 'agent': 'x', 'input': {'name': 'd'}},
+]
+
+def _copy(tasks=TASKS):
+    return [dict(t) for t in tasks]
+
+def test_resume_skips_completed_tasks(tmp_path, make_task_manager):
+    """Test that a resumed run restores completed outputs and runs only the unfinished tasks."""
+    journal = RunJournal(str(tmp_path / 'runs.sqlite'))
+    first = make_task_manager(Step(crash_on='b'), _copy(), journal=journal)
+    first.execute_tasks()
+    # 'c' still runs, with its placeholder unresolved, so it must run again on resume.
+    assert set(first.task_results) == {'a', 'c', 'd'}
+
+    step = Step()
+    second = make_task_manager(step, _copy(), journal=RunJournal(journal.path))
+    second.execute_tasks(resume=first.run_id)
+
+    assert second.run_id == first.run_id
+    assert sorted(step.calls) == ['b', 'c']
+    assert second.task_results == {'a': 'a()', 'b': 'b(a())', 'c': 'c(b(a()))', 'd': 'd()'}
+    assert journal.runs()[0]['succeeded'] == 4
+
+def test_changed_task_reruns_with_dependents(tmp_path, make_task_manager):
+    """Test that a task whose configuration changed runs again along with everything downstream."""
+    journal = RunJournal(str(tmp_path / 'runs.sqlite'))
+    first = make_task_manager(Step(), _copy(), journal=journal)
+    first.execute_tasks()
+
+    changed = [dict(t) for t in TASKS]
+    changed[0] = {**changed[0], 'options': {'temperature': 0.1}}
+    step = Step()
+    make_task_manager(step, _copy(changed), journal=journal).execute_tasks(resume=first.run_id)
+    assert sorted(step.calls) == ['a', 'b', 'c']
+
+def test_unknown_run_and_concurrent_records(tmp_path, make_task_manager):
+    """Test that resuming an unknown run fails, and that concurrent writers lose no events."""
+    journal = RunJournal(str(tmp_path / 'runs.sqlite'))
+    with pytest.raises(KeyError):
+        make_task_manager(Step(), _copy(), journal=journal).execute_tasks(resume='missing')
+
+    run_id = journal.start_run()
+    threads = [threading.Thread(target=lambda n=n: [journal.record(run_id, f't{n}-{i}', SUCCEEDED, i, 'f')
+                                                    for i in range(50)]) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(journal.completed(run_id)) == 400
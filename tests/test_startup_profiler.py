@@ -0,0 +1,63 @@
+import copy
+import json
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from TinyAGI.agent import AgentSystem
+from TinyAGI.startup_profiler import StartupProfiler
+
+def test_startup_profiler_records_and_sorts_phases():
+    """Test that measured phases are recorded and reported slowest first."""
+    profiler = StartupProfiler()
+    with profiler.measure('fast'):
+        pass
+    with profiler.measure('slow'):
+        time.sleep(0.02)
+    with profiler.measure('mock_agent', kind='agent'):
+        pass
+
+    report = profiler.report()
+    assert report[0]['name'] == 'slow'
+    assert {r['kind'] for r in report} == {'phase', 'agent'}
+    assert all('rss_delta_bytes' in r for r in report)
+    assert 'slow' in profiler.format_table()
+
+def test_startup_profiler_records_failures_and_exports_json(tmp_path):
+    """Test that a failing phase is still recorded and the report exports as JSON."""
+    profiler = StartupProfiler()
+    with pytest.raises(RuntimeError):
+        with profiler.measure('broken'):
+            raise RuntimeError("boom")
+
+    output_file = tmp_path / 'report.json'
+    profiler.to_json(str(output_file))
+    data = json.loads(output_file.read_text())
+    assert data['records'][0]['name'] == 'broken'
+    assert data['records'][0]['error'] == 'boom'
+
+def test_profiled_startup_builds_components_one_at_a_time(tmp_path, mock_config):
+    """Test that profiling builds components serially so their RSS deltas do not overlap."""
+    config = copy.deepcopy(mock_config)
+    config['agents'] = [dict(config['agents'][0], name=f'agent{n}') for n in range(4)]
+    config['load_workers'] = 4
+    config_file = tmp_path / 'config.json'
+    config_file.write_text(json.dumps(config))
+    lock, active, peak = threading.Lock(), [0], [0]
+
+    def build(*args, **kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return MagicMock()
+    module = MagicMock()
+    module.MockAgent.side_effect = build
+    with patch('importlib.import_module', return_value=module):
+        system = AgentSystem(config_files=str(config_file), profile_startup=True)
+
+    assert peak[0] == 1
+    assert sorted(r['name'] for r in system.profiler.report() if r['kind'] == 'agent') == [
+        f'agent{n}' for n in range(4)]
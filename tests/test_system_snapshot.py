@@ -0,0 +1,43 @@
+import copy
+import json
+import pytest
+from TinyAGI.services.system_snapshot import SystemHolder, SystemSnapshot
+
+def test_reload_swaps_snapshot_and_drains_old_one(built_system, mock_config):
+    """Test that a reload publishes a new system, adopts unchanged components and closes
+    the replaced ones only after the last request pinned to the old snapshot finishes."""
+    system, config_file, module = built_system
+    holder = SystemHolder()
+    holder.current = SystemSnapshot(system, str(config_file))
+    agent_before = system.agent_manager.get_agent('mock_agent')
+    plugin_before = system.plugin_manager.get_plugin('mock_plugin')
+
+    in_flight = holder.acquire()
+
+    new_config = copy.deepcopy(mock_config)
+    new_config['agents'][0]['config'] = {'temperature': 0.2}
+    config_file.write_text(json.dumps(new_config))
+    new = holder.reload(str(config_file))
+
+    assert holder.current is new
+    assert new.agent_system is not system
+    assert new.plugin_manager.get_plugin('mock_plugin') is plugin_before
+    assert new.agent_manager.get_agent('mock_agent') is not agent_before
+    # The in-flight request still sees the old, fully working system.
+    assert in_flight.agent_manager.get_agent('mock_agent') is agent_before
+    agent_before.close.assert_not_called()
+
+    in_flight.release()
+    agent_before.close.assert_called_once()
+    plugin_before.close.assert_not_called()
+
+def test_failed_reload_keeps_current_snapshot(built_system):
+    """Test that a system that fails to build is never published."""
+    system, config_file, module = built_system
+    holder = SystemHolder()
+    holder.current = current = SystemSnapshot(system, str(config_file))
+    config_file.write_text('{"agents": "not a list"}')
+
+    with pytest.raises(ValueError):
+        holder.reload(str(config_file))
+    assert holder.current is current
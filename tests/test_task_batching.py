@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from TinyAGI.async_task_manager import AsyncTaskManager
+from TinyAGI.plugins.generate_embeddings import GenerateEmbeddings
+from TinyAGI.plugins.generate_text import GenerateText
+from TinyAGI.task_manager import TaskManager
+
+class Agent:
+    supports_batch_generation = True
+    supports_batch_embedding = True
+
+    def __init__(self, fail_batches=False):
+        self.fail_batches = fail_batches
+        self.calls = []
+
+    def generate_text(self, prompt, stream=False):
+        self.calls.append(prompt)
+        return prompt.upper()
+
+    def generate_batch(self, prompts):
+        self.calls.append(list(prompts))
+        if self.fail_batches:
+            raise RuntimeError('batch rejected')
+        return [prompt.upper() for prompt in prompts]
+
+    def embed(self, texts):
+        self.calls.append(texts)
+        return [[float(len(text))] for text in texts]
+
+def _tasks(n, **extra):
+    return [{'task_id': f't{i}', 'plugin': 'p', 'agent': 'a', 'input': {'prompt': f'p{i}', 'text': 'x' * i}, **extra}
+            for i in range(n)]
+
+def test_ready_tasks_share_one_batched_call(make_task_manager):
+    """Test that ready tasks with the same plugin and agent run as batches and get their own results."""
+    agent = Agent()
+    tasks = _tasks(5) + [{'task_id': 'after', 'plugin': 'p', 'agent': 'a',
+                          'input': {'prompt': '{{tasks.t0.output}}'}}]
+    manager = make_task_manager(GenerateText({}), tasks, agent=agent, quiet=True, batch_size=3)
+    manager.execute_tasks()
+
+    assert agent.calls == [['p0', 'p1', 'p2'], ['p3', 'p4'], 'P0']
+    assert manager.task_results == {**{f't{i}': f'P{i}' for i in range(5)}, 'after': 'P0'}
+
+    embed_agent = Agent()
+    manager = make_task_manager(GenerateEmbeddings({}), _tasks(3), engine=AsyncTaskManager, agent=embed_agent,
+                                quiet=True)
+    asyncio.run(manager.execute_tasks_async())
+    assert embed_agent.calls == [['', 'x', 'xx']]
+    assert manager.task_results == {'t0': [0.0], 't1': [1.0], 't2': [2.0]}
+
+def test_fallback_to_single_calls(make_task_manager):
+    """Test that unsupported agents, streamed tasks and failed batches use one call per task."""
+    agent = Agent()
+    agent.supports_batch_generation = False
+    make_task_manager(GenerateText({}), _tasks(3), agent=agent, quiet=True, max_workers=1).execute_tasks()
+    assert agent.calls == ['p0', 'p1', 'p2']
+
+    agent = Agent()
+    tasks = _tasks(2, options={'stream': True})
+    make_task_manager(GenerateText({}), tasks, agent=agent, quiet=True, max_workers=1).execute_tasks()
+    assert agent.calls == ['p0', 'p1']
+
+    agent = Agent(fail_batches=True)
+    manager = make_task_manager(GenerateText({}), _tasks(3), agent=agent, quiet=True, max_workers=1)
+    manager.execute_tasks()
+    assert agent.calls == [['p0', 'p1', 'p2'], 'p0', 'p1', 'p2']
+    assert manager.task_results == {'t0': 'P0', 't1': 'P1', 't2': 'P2'}
+
+def test_components_are_not_looked_up_on_the_scheduler(make_task_manager):
+    """Test that checking batch support builds components on workers, never on the scheduler or event loop."""
+    for engine in (TaskManager, AsyncTaskManager):
+        agent = Agent()
+        manager = make_task_manager(GenerateText({}), _tasks(4), engine=engine, agent=agent, quiet=True)
+        lookups = []
+        manager.agent_manager.get_agent.side_effect = lambda name: lookups.append(threading.current_thread()) or agent
+        manager.execute_tasks()
+        assert agent.calls == [['p0', 'p1', 'p2', 'p3']]
+        assert lookups and threading.main_thread() not in lookups
@@ -0,0 +1,56 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from TinyAGI.task_graph import TaskGraphError, build_task_graph
+
+def _task(task_id, prompt, **extra):
+    return {'task_id': task_id, 'plugin': 'p', 'agent': 'a', 'input': {'prompt': prompt}, **extra}
+
+def test_build_task_graph_infers_dependencies_and_rejects_cycles():
+    """Test that placeholders and depends_on become edges and that cycles fail fast."""
+    tasks = [
+        _task('a', 'start'),
+        _task('b', 'Summarize {{tasks.a.output}}'),
+        _task('c', {'nested': ['{{tasks.b.output}}']}, depends_on='a'),
+    ]
+    assert build_task_graph(tasks) == {'a': set(), 'b': {'a'}, 'c': {'a', 'b'}}
+
+    tasks[0]['depends_on'] = ['c']
+    with pytest.raises(TaskGraphError, match='cycle'):
+        build_task_graph(tasks)
+
+def test_execute_tasks_runs_independent_tasks_concurrently(make_task_manager):
+    """Test that wall time follows the critical path and task_results keep config order."""
+    plugin = MagicMock()
+
+    def execute(agent, tool, input_data, options, stream):
+        time.sleep(0.2)
+        return f"out:{input_data['prompt']}"
+    plugin.execute.side_effect = execute
+
+    tasks = [_task('join', '{{tasks.x3.output}}')] + [_task(f'x{i}', f'p{i}') for i in range(1, 5)]
+    manager = make_task_manager(plugin, tasks, max_workers=4)
+    start = time.perf_counter()
+    manager.execute_tasks()
+    elapsed = time.perf_counter() - start
+
+    # Four independent tasks in parallel, then the one that depends on x3: two rounds, not five.
+    assert elapsed < 0.7
+    assert list(manager.task_results) == ['join', 'x1', 'x2', 'x3', 'x4']
+    assert manager.task_results['join'] == 'out:out:p3'
+
+def test_unexpected_error_fails_only_its_task(make_task_manager):
+    """Test that an error escaping a task's own handling fails that task and the other results are kept."""
+    plugin = MagicMock()
+    plugin.execute.side_effect = lambda agent, tool, input_data, options, stream: input_data['prompt']
+    tasks = [_task('ok', 'fine'), _task('bad', 'boom'), _task('after', '{{tasks.ok.output}}!')]
+    manager = make_task_manager(plugin, tasks, max_workers=2)
+    cached_result = manager._cached_result
+
+    def lookup(task, input_data):
+        if task['task_id'] == 'bad':
+            raise RuntimeError('unexpected')
+        return cached_result(task, input_data)
+    manager._cached_result = lookup
+    manager.execute_tasks()
+    assert manager.task_results == {'ok': 'fine', 'after': 'fine!'}
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+from TinyAGI.task_manager import TaskManager
+from TinyAGI.async_task_manager import AsyncTaskManager
+from TinyAGI.plugins.base_plugin import BasePlugin
+from TinyAGI.task_policy import AgentSlot
+
+class Hang:
+    def __init__(self):
+        self.release = threading.Event()
+
+    def execute(self, agent, tool, input_data, options, stream=False):
+        self.release.wait(5)
+        return 'late'
+
+class Flaky:
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def execute(self, agent, tool, input_data, options, stream=False):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError('backend unavailable')
+        return f'ok after {self.calls}'
+
+class Busy:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def leave(self):
+        with self.lock:
+            self.active -= 1
+
+    def execute(self, agent, tool, input_data, options, stream=False):
+        self.enter()
+        time.sleep(0.03)
+        self.leave()
+        return input_data['n']
+
+class SlowBusy(Busy, BasePlugin):
+    def execute(self, agent, tool, input_data, options, stream=False):
+        self.enter()
+        time.sleep(0.3)
+        self.leave()
+        return input_data['n']
+
+class AsyncBusy(Busy):
+    async def execute_async(self, agent, tool, input_data, options, stream=False):
+        self.enter()
+        await asyncio.sleep(0.03)
+        self.leave()
+        return input_data['n']
+
+def test_timeout_fails_hung_task(make_task_manager):
+    """Test that a task exceeding timeout_s fails without holding up the run."""
+    hang = Hang()
+    manager = make_task_manager(hang, [{'task_id': 'slow', 'plugin': 'p', 'agent': 'a', 'input': {}, 'timeout_s': 0.1}])
+
+    start = time.perf_counter()
+    manager.execute_tasks()
+    hang.release.set()
+
+    assert time.perf_counter() - start < 2
+    assert 'slow' not in manager.task_results
+
+def test_retries_with_backoff(make_task_manager):
+    """Test that transient failures are retried, and that a task fails once retries are used up."""
+    flaky = Flaky(failures=2)
+    manager = make_task_manager(flaky, [{'task_id': 't', 'plugin': 'p', 'agent': 'a', 'input': {}, 'retries': 2, 'backoff': 0.01}])
+    manager.execute_tasks()
+    assert manager.task_results['t'] == 'ok after 3'
+
+    flaky = Flaky(failures=2)
+    manager = make_task_manager(flaky, [{'task_id': 't', 'plugin': 'p', 'agent': 'a', 'input': {}, 'retries': 1, 'backoff': 0.01}])
+    manager.execute_tasks()
+    assert 't' not in manager.task_results
+    assert flaky.calls == 2
+
+def test_agent_max_in_flight(make_task_manager):
+    """Test that an agent never runs more calls than its max_in_flight, on both task engines."""
+    tasks = [{'task_id': f't{n}', 'plugin': 'p', 'agent': 'local', 'input': {'n': n}} for n in range(8)]
+    agents_config = [{'name': 'local', 'max_in_flight': 2}]
+
+    busy = Busy()
+    manager = make_task_manager(busy, tasks, agents_config=agents_config, max_workers=8)
+    manager.execute_tasks()
+    assert busy.peak == 2
+    assert len(manager.task_results) == 8
+
+    busy = AsyncBusy()
+    manager = make_task_manager(busy, tasks, engine=AsyncTaskManager, agents_config=agents_config)
+    manager.execute_tasks()
+    assert busy.peak == 2
+    assert len(manager.task_results) == 8
+
+def test_timeout_covers_waiting_for_agent_slot(make_task_manager):
+    """Test that a task waiting on a busy agent's slot times out instead of blocking until the slot frees."""
+    hang = Hang()
+    tasks = [{'task_id': f't{n}', 'plugin': 'p', 'agent': 'local', 'input': {}, 'timeout_s': 0.2,
+              'retries': 1, 'backoff': 0.01} for n in range(3)]
+    for cls in (TaskManager, AsyncTaskManager):
+        manager = make_task_manager(hang, tasks, engine=cls, agents_config=[{'name': 'local', 'max_in_flight': 1}])
+        start = time.perf_counter()
+        manager.execute_tasks()
+        assert time.perf_counter() - start < 3
+        assert manager.task_results == {}
+    hang.release.set()
+
+def test_timed_out_thread_keeps_agent_slot_on_async_engine(make_task_manager):
+    """Test that a timed-out call still running on a thread holds its slot, and waiting tasks hold no thread."""
+    busy = SlowBusy()
+    tasks = [{'task_id': f't{n}', 'plugin': 'p', 'agent': 'local', 'input': {'n': n}, 'timeout_s': 0.1}
+             for n in range(4)]
+    manager = make_task_manager(busy, tasks, engine=AsyncTaskManager,
+                                agents_config=[{'name': 'local', 'max_in_flight': 1}])
+    manager.execute_tasks()
+    assert busy.peak == 1
+
+    # Coroutines waiting for a slot hold no thread and get it in turn, also from a thread.
+    slot = AgentSlot(1)
+    order = []
+
+    async def wait(n):
+        await slot.acquire_async()
+        order.append(n)
+        slot.release()
+
+    async def run():
+        assert slot.acquire(blocking=False)
+        threads = threading.active_count()
+        waiters = [asyncio.ensure_future(wait(n)) for n in range(50)]
+        await asyncio.sleep(0.05)
+        assert threading.active_count() == threads and order == []
+        threading.Thread(target=slot.release).start()
+        await asyncio.gather(*waiters)
+    asyncio.run(run())
+    assert order == list(range(50))
@@ -0,0 +1,50 @@
+import json
+import time
+from unittest.mock import MagicMock
+from TinyAGI.task_manager import TaskManager
+from TinyAGI.task_stream import TaskStream
+
+class Producer:
+    def execute(self, agent, tool, input_data, options, stream=False):
+        def chunks():
+            for word in ['alpha ', 'beta ', 'gamma ', 'delta']:
+                time.sleep(0.1)
+                yield word
+        return chunks()
+
+class Consumer:
+    accepts_stream = True
+
+    def execute(self, agent, tool, input_data, options, stream=False):
+        text = input_data['text']
+        assert isinstance(text, TaskStream)
+        chunks = []
+        for chunk in text:
+            chunks.append((chunk, text.done))
+        self.first_seen_before_end = not chunks[0][1]
+        return ''.join(chunk for chunk, _ in chunks).upper()
+
+class TextOnly:
+    def execute(self, agent, tool, input_data, options, stream=False):
+        self.received = input_data['text']
+        return len(self.received)
+
+def test_streamed_results_are_teed_to_consumers_and_outputs(tmp_path):
+    """Test that a stream-aware consumer overlaps its producer while other consumers and outputs get text."""
+    plugins = {'producer': Producer(), 'consumer': Consumer(), 'text_only': TextOnly()}
+    plugin_manager, agent_manager, tool_manager = MagicMock(), MagicMock(), MagicMock()
+    plugin_manager.get_plugin.side_effect = plugins.get
+    output = tmp_path / 'out' / 'up.json'
+    tasks = [
+        {'task_id': 'up', 'plugin': 'producer', 'agent': 'a', 'input': {}, 'options': {'stream': True},
+         'output': {'save_to_file': True, 'file_path': str(output)}},
+        {'task_id': 'shout', 'plugin': 'consumer', 'agent': 'a', 'input': {'text': '{{tasks.up.output}}'}},
+        {'task_id': 'count', 'plugin': 'text_only', 'agent': 'a', 'input': {'text': '{{tasks.up.output}}'}},
+    ]
+    manager = TaskManager(agent_manager, plugin_manager, tool_manager, tasks)
+    manager.execute_tasks()
+
+    assert plugins['consumer'].first_seen_before_end
+    assert plugins['text_only'].received == 'alpha beta gamma delta'
+    assert manager.task_results == {'up': 'alpha beta gamma delta', 'shout': 'ALPHA BETA GAMMA DELTA', 'count': 22}
+    assert json.loads(output.read_text(encoding='utf-8')) == 'alpha beta gamma delta'
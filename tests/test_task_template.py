@@ -0,0 +1,48 @@
+from TinyAGI.task_graph import build_task_graph
+from TinyAGI.task_template import compile_template
+
+def test_templates_interpolate_follow_paths_and_apply_defaults():
+    """Test inline interpolation, nested field access, JSON-text outputs and default values."""
+    results = {
+        'search': {'items': [{'title': 'First'}, {'title': 'Second'}]},
+        'json': '{"score": 0.9, "tags": ["a", "b"]}',
+        'text': 'hello',
+    }
+    template = compile_template({
+        'prompt': 'Summarize: {{tasks.text.output}} ({{ tasks.search.output.items[1].title }})',
+        'score': '{{tasks.json.output.score}}',
+        'tag': '{{tasks.json.output["tags"][-1]}}',
+        'missing': '{{tasks.search.output.items[5].title | "untitled"}}',
+        'count': '{{tasks.nope.output | 0}}',
+        'pending': '{{tasks.later.output}}',
+        'literal': '{{not a reference}}',
+    })
+
+    assert template.references == {'text', 'search', 'json', 'nope', 'later'}
+    assert template.render(results) == {
+        'prompt': 'Summarize: hello (Second)',
+        'score': 0.9,
+        'tag': 'b',
+        'missing': 'untitled',
+        'count': 0,
+        'pending': '{{tasks.later.output}}',
+        'literal': '{{not a reference}}',
+    }
+
+def test_templates_reference_outputs_and_constants_without_copying():
+    """Test that whole-placeholder values and constant subtrees are passed by reference."""
+    big = {'rows': list(range(1000))}
+    constant = {'nested': ['a', 'b']}
+    template = compile_template({'data': '{{tasks.load.output}}', 'config': constant})
+    rendered = template.render({'load': big})
+
+    assert rendered['data'] is big
+    assert rendered['config'] is constant
+
+def test_build_task_graph_uses_inline_references():
+    """Test that placeholders inside longer strings become dependencies."""
+    tasks = [
+        {'task_id': 'a', 'input': {}},
+        {'task_id': 'b', 'input': {'prompt': 'Use {{tasks.a.output.body}} please'}},
+    ]
+    assert build_task_graph(tasks) == {'a': set(), 'b': {'a'}}
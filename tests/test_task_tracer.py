@@ -0,0 +1,48 @@
+import json
+import time
+from unittest.mock import MagicMock
+from TinyAGI.task_manager import TaskManager
+from TinyAGI.task_tracer import TaskTracer
+
+class Agent:
+    def generate_text(self, prompt, stream=False):
+        time.sleep(0.02)
+        if stream:
+            def chunks():
+                for word in prompt.split():
+                    time.sleep(0.01)
+                    yield word + ' '
+            return chunks()
+        return prompt.upper()
+
+class Generate:
+    def execute(self, agent, tool, input_data, options, stream=False):
+        return agent.generate_text(input_data['prompt'], stream=stream)
+
+def test_run_is_traced_with_spans_stream_marks_and_critical_path(tmp_path):
+    """Test that a traced run records per-task spans, stream timings, a Chrome trace and the critical path."""
+    plugin_manager, agent_manager = MagicMock(), MagicMock()
+    plugin_manager.get_plugin.return_value = Generate()
+    agent_manager.get_agent.return_value = Agent()
+    tasks = [
+        {'task_id': 'slow', 'plugin': 'p', 'agent': 'a', 'input': {'prompt': 'one two three four'},
+         'options': {'stream': True}},
+        {'task_id': 'fast', 'plugin': 'p', 'agent': 'a', 'input': {'prompt': 'x'}},
+        {'task_id': 'after', 'plugin': 'p', 'agent': 'a', 'input': {'prompt': '{{tasks.slow.output}}'}},
+    ]
+    tracer = TaskTracer()
+    manager = TaskManager(agent_manager, plugin_manager, MagicMock(), tasks, quiet=True, tracer=tracer)
+    manager.execute_tasks()
+
+    rows, path = tracer.summary(manager.graph)
+    by_id = {row['task_id']: row for row in rows}
+    assert path == ['slow', 'after']
+    assert by_id['fast']['agent'] >= 0.02 and by_id['fast']['plugin'] >= by_id['fast']['agent']
+    assert by_id['slow']['ttft'] >= 0.02
+    assert by_id['slow']['chunks_per_s'] > 0
+    assert 'Critical path (*): slow -> after' in tracer.format_summary(manager.graph)
+
+    trace = tracer.to_chrome_trace(str(tmp_path / 'trace.json'))
+    names = {e['name'] for e in json.loads((tmp_path / 'trace.json').read_text())['traceEvents']}
+    assert {'queue', 'resolve', 'plugin', 'agent', 'save', 'first_chunk', 'last_chunk', 'thread_name'} <= names
+    assert all(e['ph'] in ('X', 'i', 'M') for e in trace['traceEvents'])